@@ -1,18 +1,43 @@
-# pip install screeninfo
-
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QSizePolicy)
+from PyQt5.QtGui import QGuiApplication
 from settings import Settings
-from styles import STYLES
-from visual_elements import TopPanel,  BottomPanel
+from styles import apply_theme
+from visual_elements import TopPanel,  BottomPanel, AttractPanel
 from scroll_panel import ScrollPanel
-from vertical_scroll_panel import VerticalScrollPanel
 from database import Database
+from db_worker import AsyncDatabase
+from catalog import CatalogTree
+from discounts import DiscountEngine
+from stock import StockCounter
+from allocation import UnitAllocator
+from sales_journal import SalesJournal
+import time
 from constants import Constants as const
-from product_description import ProductDescription
-from screeninfo import get_monitors
-from payment_metods import PaymentMetods
+from thumbnail_cache import get_thumbnail_cache
+from asset_bundle import load_asset_bundle
+from screen_cache import ScreenCache
+from navigation import NavigationStack
+from idle_mode import IdleMode
+from scheduler import get_scheduler, INACTIVITY
+from instrumentation import get_instrumentation, span, mark_input, PaintWatcher, format_summary
+from startup_profile import phase
+
+# Отложенная постройка экранов в простое после запуска
+BUILD_SCREENS = "screens.build"
 
 class MainWindow(QMainWindow):
+    # Переход, которым заново открывается экран из истории
+    STEP_ACTIONS = {
+        const.ST_WAIT: const.GO_HOME,
+        const.ST_SUBCATEGORY: const.GO_SUBCATEGORY,
+        const.ST_PRODUCT_LIST: const.GO_PRODUCTS_LIST,
+        const.ST_PRODUCT_DETAILS: const.GO_PRODUCT_DETAILS,
+        const.ST_SEARCH: const.GO_SEARCH,
+        const.ST_PAYMET_METODS: const.GO_PAYMENT_METODS,
+    }
+    # Экраны, которые строятся при первом переходе на них или в простое, в порядке расположения в окне
+    LAZY_SCREENS = (const.ITEM_SEARCH, const.ITEM_PRODUCTS_LIST, const.ITEM_PRODUCT_DETAILS, const.PAYMET_METODS)
+    LAZY_SCREENS_STEP = 0.05  # секунд между постройками экранов в простое
     previous_status = const.ST_WAIT
     display_height = None
     display_width = None
@@ -22,40 +47,75 @@ class MainWindow(QMainWindow):
         super().__init__()
 
         self.db = Database()
+        self.catalog = CatalogTree(self.db)
+        self.catalog.rebuild()
+        self.stock = StockCounter(self.db, self.catalog)
+        self.allocator = UnitAllocator(self.db, self.stock)
+        self.allocator.expired.connect(self.on_units_expired)
+        # Счетчики наличия строит распределитель: в них только годные свободные единицы
+        self.allocator.rebuild()
+        phase("каталог и остатки")
+        self.reserved_unit = None
+        self.sales_journal = SalesJournal()
+        self.sales_journal.start()
+        self.sale_started_at = None
+        self.payment_started_at = None
+        self.async_db = AsyncDatabase()
+        self.discounts = DiscountEngine(self.db, self.catalog)
+        self.discounts.changed.connect(self.on_discounts_changed)
+        self.discounts.rebuild()
+        phase("журнал продаж и скидки")
+        self.products_category_guid = None
+        self.screen_cache = ScreenCache()
+        self.galery_screen = None  # ключ экрана, показанного в галерее категорий
+        self.products_screen = None  # ключ экрана, показанного в списке товаров (None - поиск)
+        self.navigation = NavigationStack(const.ST_WAIT, "Главная")
+        self.current_entry = self.navigation.root()  # показанный экран, ему принадлежит текущая прокрутка
         self.root_menu = True
         self.category_guid = None
         self.product_guid = None
         self.product_price = None
         self.workflow_step = const.ST_WAIT
         self.settings = Settings()
-        self.setStyleSheet(STYLES)
-        for monitor in get_monitors():
-            if monitor.is_primary:
-                print(f"Primary display {monitor.name}, height {monitor.height}, width {monitor.width}")
-                self.display_height = monitor.height
-                self.display_width = monitor.width
+        apply_theme(Settings.THEME)
+        screen = QGuiApplication.primaryScreen()
+        geometry = screen.geometry()
+        print(f"Primary display {screen.name()}, height {geometry.height()}, width {geometry.width()}")
+        self.display_height = geometry.height()
+        self.display_width = geometry.width()
+        get_thumbnail_cache().bundle = load_asset_bundle(self.display_width, self.display_height)
+        phase("экран и набор картинок")
 
         self.setup_ui()
-        self.workflow(const.GO_HOME, None)
+        phase("виджеты главного экрана")
+        self.restore_navigation()
+        phase("данные главного экрана")
+        if Settings.LAZY_SCREENS_DELAY is not None:
+            get_scheduler().schedule(BUILD_SCREENS, Settings.LAZY_SCREENS_DELAY, self.build_next_screen)
         #self.workflow(const.GO_PAYMENT_METODS, None)
 
 
     def enableInactiveTimer(self, item_panel):
-        self.galery.stop_inactivity_timer()
-        self.products.stop_inactivity_timer()
-        self.product_description.stop_inactivity_timer()
+        # Срок бездействия в планировщике один: показанная панель переставляет его на себя.
+        # Экран еще не построен (build_screen) - значит, он и не показан
+        if item_panel in self.LAZY_SCREENS and self.screen_panel(item_panel) is None:
+            get_scheduler().cancel(INACTIVITY)
+            return
         match item_panel:
             case const.ITEM_CATEGORY:
                 self.galery.reset_inactivity_timer()
-            case const.ITEM_PRODUCTS_LIST:
+            case const.ITEM_PRODUCTS_LIST | const.ITEM_SEARCH:
                 self.products.reset_inactivity_timer()
             case const.ITEM_PRODUCT_DETAILS:
                 self.product_description.reset_inactivity_timer()
             case const.PAYMET_METODS:
                 self.payment_metods.setup_inactivity_timer()
+            case _:
+                get_scheduler().cancel(INACTIVITY)
 
 
     def setVisibleItems(self, navigation_panel, bottom_panel, item_panel):
+        self.build_screen(item_panel)
         self.top_panel.setVisible(navigation_panel)
         self.bottom_panel.setVisible(bottom_panel)
         if item_panel == const.ITEM_CATEGORY:
@@ -65,26 +125,36 @@ class MainWindow(QMainWindow):
             self.galery.setVisible(False)
         if item_panel == const.ITEM_PRODUCTS_LIST:
             self.top_panel.title_label.setText("Выберите блюдо")
-            self.products.setVisible(True)
-        else:
-            self.products.setVisible(False)
+        if item_panel == const.ITEM_SEARCH:
+            self.top_panel.title_label.setText("Поиск блюда")
+        self.set_screen_visible(self.search_panel, item_panel == const.ITEM_SEARCH)
+        self.set_screen_visible(self.products, item_panel in (const.ITEM_PRODUCTS_LIST, const.ITEM_SEARCH))
         if item_panel == const.ITEM_PRODUCT_DETAILS:
             self.top_panel.title_label.setText("Наименование блюда")
-            self.product_description.setVisible(True)
-        else:
-            self.product_description.setVisible(False)
+        self.set_screen_visible(self.product_description, item_panel == const.ITEM_PRODUCT_DETAILS)
         if item_panel == const.PAYMET_METODS:
             self.top_panel.title_label.setText("Выберите способ оплаты")
-            self.payment_metods.setVisible(True)
-        else:
-            self.payment_metods.setVisible(False)
+        self.set_screen_visible(self.payment_metods, item_panel == const.PAYMET_METODS)
         self.visible_item = item_panel
         self.enableInactiveTimer(item_panel)
 
     def workflow(self, step, guid):
+        mark_input(f"workflow.{step}")
+        with span(f"workflow.{step}"):
+            self.run_workflow(step, guid)
+
+    def run_workflow(self, step, guid):
+        self.idle_mode.exit()
+        self.remember_scroll_positions()
+        if step != const.GO_PAYMENT_METODS:
+            # Ушли с экрана оплаты без покупки - возвращаем единицу товара в продажу
+            self.release_reserved_unit()
         match step:
             case const.GO_HOME:
-                self.load_category(None)
+                self.async_db.cancel()
+                self.stop_products_population()
+                entry = self.navigation.pop_to_root()
+                self.load_category(None, entry.scroll)
                 self.category_guid = None
                 self.setVisibleItems(True, True, const.ITEM_CATEGORY)
                 self.top_panel.home_button.setEnabled(False)
@@ -92,7 +162,9 @@ class MainWindow(QMainWindow):
                 self.workflow_step = const.ST_WAIT
 
             case const.GO_PRODUCTS_LIST:
-                self.load_products(guid)
+                self.async_db.cancel("product")
+                entry = self.navigation.enter(const.ST_PRODUCT_LIST, guid, self.category_title(guid))
+                self.load_products(guid, entry.scroll)
                 self.setVisibleItems(True, False, const.ITEM_PRODUCTS_LIST)
                 self.top_panel.home_button.setEnabled(True)
                 self.top_panel.back_button.setEnabled(True)
@@ -102,52 +174,230 @@ class MainWindow(QMainWindow):
                 if guid is None:
                     self.workflow(const.GO_HOME, None)
                 else:
-                    self.load_category(guid)
+                    self.async_db.cancel()
+                    self.stop_products_population()
+                    entry = self.navigation.enter(const.ST_SUBCATEGORY, guid, self.category_title(guid))
+                    self.load_category(guid, entry.scroll)
                     self.setVisibleItems(True, False, const.ITEM_CATEGORY)
                     self.top_panel.home_button.setEnabled(True)
                     self.top_panel.back_button.setEnabled(True)
                     self.workflow_step = const.ST_SUBCATEGORY
 
             case const.GO_BACK:
-                match self.workflow_step:
-                    case const.ST_PRODUCT_LIST:
-                        self.workflow(const.GO_SUBCATEGORY, self.category_guid)
-                    case const.ST_SUBCATEGORY:
-                        self.workflow(const.GO_SUBCATEGORY, self.db.get_parent_category(self.category_guid))
-                    case const.ST_PRODUCT_DETAILS:
-                        self.workflow(const.GO_PRODUCTS_LIST, self.category_guid)
-                    case const.ST_PAYMET_METODS:
-                        self.workflow(const.GO_PRODUCT_DETAILS, self.product_guid)
+                entry = self.navigation.pop()
+                if entry is not None:
+                    # Предыдущий экран уже на вершине стека - переход на него не добавляет запись
+                    self.workflow(self.STEP_ACTIONS[entry.step], entry.guid)
+                return
 
             case const.GO_PRODUCT_DETAILS:
                 if guid:
+                    # Поток списка товаров не отменяем: он дозаполнится в фоне и попадет в кэш к возврату
+                    self.product_guid = guid
+                    self.navigation.enter(const.ST_PRODUCT_DETAILS, guid, self.product_title(guid))
                     self.setVisibleItems(True, False, const.ITEM_PRODUCT_DETAILS)
-                    data = self.db.get_product_by_id(guid)
-                    self.product_description.load_data(data)
-                    self.top_panel.title_label.setText(data["name"])
+                    state = self.screen_cache.get(const.ITEM_PRODUCT_DETAILS, guid)
+                    if state:
+                        self.async_db.cancel("product")
+                        self.on_product_loaded(state.data)
+                    else:
+                        self.product_description.show_placeholder()
+                        self.async_db.request("product", "get_product_by_id", guid, callback=self.on_product_loaded,
+                                              empty={})
                     self.top_panel.home_button.setEnabled(True)
                     self.top_panel.back_button.setEnabled(True)
                     self.workflow_step = const.ST_PRODUCT_DETAILS
 
+            case const.GO_SEARCH:
+                self.async_db.cancel()
+                self.stop_products_population()
+                self.navigation.enter(const.ST_SEARCH, None, "Поиск")
+                self.setVisibleItems(True, False, const.ITEM_SEARCH)
+                self.on_search_query_changed(self.search_panel.query)
+                self.top_panel.home_button.setEnabled(True)
+                self.top_panel.back_button.setEnabled(True)
+                self.workflow_step = const.ST_SEARCH
+
             case const.GO_PAYMENT_METODS:
+                self.navigation.enter(const.ST_PAYMET_METODS, None, "Оплата")
+                self.build_screen(const.PAYMET_METODS)
                 self.payment_metods.set_price(self.product_price)
                 self.setVisibleItems(True, False, const.PAYMET_METODS)
                 self.top_panel.home_button.setEnabled(True)
                 self.top_panel.back_button.setEnabled(True)
                 self.workflow_step = const.ST_PAYMET_METODS
 
-    def load_category(self, guid):
-        data = self.db.get_categories_with_products_hierarchy(guid)
-        if len(data['items']) != 0:
-            self.galery.gallery_data = data
-            self.galery.load_gallery_data()
+        self.current_entry = self.navigation.top()
+        self.top_panel.set_breadcrumbs(self.navigation.breadcrumbs())
+        self.navigation.save()
+
+    def category_title(self, guid):
+        category = self.catalog.get_category(guid)
+        return category["name"] if category else ""
+
+    def product_title(self, guid):
+        """Название товара из уже загруженного списка (уточняется после загрузки карточки)"""
+        if self.products is None:
+            return ""
+        item_data = self.products.find_item_data_by_guid(guid)
+        return item_data[1] if item_data else ""
+
+    def restore_navigation(self):
+        """Открывает экран, на котором приложение было до аварийного завершения"""
+        if not self.navigation.load():
+            self.workflow(const.GO_HOME, None)
+            return
+        for length, entry in enumerate(self.navigation.entries):
+            # Оплату не восстанавливаем (резерв товара потерян), пропавшие из каталога категории - тоже
+            if entry.step == const.ST_PAYMET_METODS or (
+                    entry.step in (const.ST_SUBCATEGORY, const.ST_PRODUCT_LIST) and
+                    self.catalog.get_category(entry.guid) is None):
+                self.navigation.truncate(length)
+                break
+        entry = self.navigation.top()
+        print(f"Восстановлен экран {entry.step} {entry.guid or ''} (глубина {len(self.navigation)})")
+        self.workflow(self.STEP_ACTIONS[entry.step], entry.guid)
+
+    def remember_scroll_positions(self):
+        """Запоминает прокрутку показанного экрана в его записи истории, чтобы вернуться на то же место"""
+        match self.current_entry.step:
+            case const.ST_WAIT | const.ST_SUBCATEGORY:
+                self.current_entry.scroll = self.galery.scroll_position()
+            case const.ST_PRODUCT_LIST | const.ST_SEARCH:
+                if self.products is not None:
+                    self.current_entry.scroll = self.products.scroll_position()
+
+    def invalidate_screens(self, screen=None):
+        """Сбрасывает кэш экранов (после изменения каталога, наличия или цен)"""
+        self.screen_cache.invalidate(screen)
+        if screen in (None, const.ITEM_CATEGORY):
+            self.galery_screen = None
+        if screen in (None, const.ITEM_PRODUCTS_LIST):
+            self.products_screen = None
+
+    def load_category(self, guid, scroll=0):
+        key = (const.ITEM_CATEGORY, guid)
+        if self.galery_screen == key and self.screen_cache.get(*key):
+            # Галерея уже показывает эту категорию
+            self.galery.restore_scroll_position(scroll)
             self.category_guid = guid
+            return
+        state = self.screen_cache.get(*key)
+        if state is None:
+            data = self.stock.get_categories_with_products_hierarchy(guid)
+            if len(data['items']) == 0:
+                return
+            state = self.screen_cache.put(*key, data)
+        self.galery.gallery_data = state.data
+        self.galery.load_gallery_data()
+        self.galery.restore_scroll_position(scroll)
+        self.galery_screen = key
+        self.category_guid = guid
+
+    def load_products(self, guid, scroll=0):
+        self.build_screen(const.ITEM_PRODUCTS_LIST)
+        if self.products.population_started is not None and self.products_screen is None \
+                and guid == self.products_category_guid:
+            # Список этой категории еще заполняется (возврат из карточки товара) - поток продолжается
+            self.products.restore_scroll_position(scroll)
+            return
+        self.products_category_guid = guid
+        key = (const.ITEM_PRODUCTS_LIST, guid)
+        state = self.screen_cache.get(*key)
+        if state is not None:
+            self.async_db.cancel("products")
+            self.stop_products_population()
+            if self.products_screen != key:
+                self.products.gallery_data = state.data
+                self.products.load_gallery_data()
+                self.products_screen = key
+            self.products.restore_scroll_position(scroll)
+            return
+        self.products_screen = None
+        self.products.begin_population()
+        # Позиция применится, когда список дорастет до нее
+        self.products.restore_scroll_position(scroll)
+        self.async_db.stream("products", "iter_items_by_category", guid,
+                             on_batch=self.on_products_batch, callback=self.on_products_loaded)
+
+    def on_products_batch(self, rows):
+        self.products.append_rows(self.stock.apply_items(self.discounts.apply_items(rows, self.products_category_guid)))
+
+    def on_products_loaded(self, count):
+        if count is None:
+            # Поток прервался ошибкой - показываем то, что успели получить, и не кэшируем неполный список
+            self.products.load_gallery_data()
+            return
+        self.products.end_population()
+
+    def on_products_built(self, count, elapsed):
+        """Список товаров заполнен целиком - сохраняем экран для быстрого возврата"""
+        self.screen_cache.put(const.ITEM_PRODUCTS_LIST, self.products_category_guid, self.products.gallery_data)
+        self.products_screen = (const.ITEM_PRODUCTS_LIST, self.products_category_guid)
 
-    def load_products(self, guid):
-        data = self.db.get_items_by_category(guid)
-        if len(data) != 0:
-            self.products.gallery_data = data
+    def on_product_loaded(self, data):
+        if data:
+            self.screen_cache.put(const.ITEM_PRODUCT_DETAILS, data["guid"], data)
+            self.product_description.load_data(self.discounts.apply_product(data))
+            self.top_panel.title_label.setText(data["name"])
+            entry = self.navigation.top()
+            if entry.matches(const.ST_PRODUCT_DETAILS, data["guid"]) and entry.title != data["name"]:
+                entry.title = data["name"]
+                self.top_panel.set_breadcrumbs(self.navigation.breadcrumbs())
+        else:
+            # Товар не найден или запрос завершился ошибкой - убираем заглушку загрузки
+            self.product_description.show_unavailable()
+
+    def on_search_clicked(self):
+        self.build_screen(const.ITEM_SEARCH)
+        self.search_panel.clear()
+        self.workflow(const.GO_SEARCH, None)
+
+    def on_search_query_changed(self, query):
+        """Поиск на каждое нажатие клавиши: новый запрос отменяет еще не выполненный предыдущий"""
+        self.products.reset_inactivity_timer()
+        self.products_screen = None
+        if not query.strip():
+            self.async_db.cancel("search")
+            self.products.gallery_data = []
             self.products.load_gallery_data()
+            return
+        self.async_db.request("search", "search_products", query, callback=self.on_search_loaded, empty=[])
+
+    def on_search_loaded(self, data):
+        self.products.gallery_data = self.stock.apply_items(
+            self.discounts.apply_items(data, product_categories=self.stock.product_category))
+        self.products.load_gallery_data()
+
+    def stop_products_population(self):
+        """Поток списка товаров отменен - недостроенный список не кэшируется и не ждет остальных строк"""
+        if self.products is not None:
+            self.products.stop_population()
+
+    def on_discounts_changed(self):
+        """Началось или закончилось окно скидки - обновляем цены в открытом списке товаров"""
+        self.invalidate_screens(const.ITEM_PRODUCTS_LIST)
+        if self.workflow_step == const.ST_PRODUCT_LIST:
+            self.async_db.cancel("products")
+            self.stop_products_population()
+            self.load_products(self.products_category_guid)
+
+    def on_units_expired(self):
+        """Истек срок годности единиц товара - признаки наличия на экранах устарели"""
+        self.invalidate_screens(const.ITEM_CATEGORY)
+        self.invalidate_screens(const.ITEM_PRODUCTS_LIST)
+        if self.workflow_step == const.ST_PRODUCT_LIST:
+            self.async_db.cancel("products")
+            self.stop_products_population()
+            self.load_products(self.products_category_guid)
+
+    def reload_catalog(self):
+        """Перестроение дерева каталога после изменения категорий или товаров"""
+        self.catalog.rebuild()
+        self.allocator.rebuild()
+        self.discounts.rebuild()
+        self.invalidate_screens()
+        self.workflow(const.GO_HOME, None)
 
     def on_click_buttons(self, tmp):
         self.workflow(tmp, None)
@@ -156,7 +406,7 @@ class MainWindow(QMainWindow):
         if guid is None:
             self.workflow(const.GO_HOME, None)
         else:
-            if self.db.subcategories(guid) == 0:
+            if self.catalog.is_leaf(guid):
                 self.workflow(const.GO_PRODUCTS_LIST, guid)
             else:
                 self.workflow(const.GO_SUBCATEGORY, guid)
@@ -165,19 +415,41 @@ class MainWindow(QMainWindow):
         if guid is None or guid == "":
             self.workflow(const.GO_HOME, None)
         else:
-            self.product_guid = guid
+            self.sale_started_at = time.time()
             self.workflow(const.GO_PRODUCT_DETAILS, guid)
 
     def on_pay_clicked(self, price: float):
         if price is None:
-            self.payment_metods.price = None
+            if self.payment_metods is not None:
+                self.payment_metods.price = None
             self.workflow(const.GO_HOME, None)
         else:
+            self.release_reserved_unit()
+            self.reserved_unit = self.allocator.reserve(self.product_guid)
+            if self.reserved_unit is None:
+                self.product_description.show_sold_out()
+                return
             self.product_price = price
+            self.payment_started_at = time.time()
             self.workflow(const.GO_PAYMENT_METODS, None)
 
+    def release_reserved_unit(self):
+        if self.reserved_unit is not None:
+            self.allocator.release(self.reserved_unit)
+            self.reserved_unit = None
+
     def on_payment_metod(self, metod: str):
         ############# Добавить обработку платежа  #############
+        if metod is not None and self.reserved_unit is not None:
+            base_price = self.product_description.price
+            self.sales_journal.record(self.product_guid, self.reserved_unit, self.product_price,
+                                      base_price - self.product_price if base_price else 0, metod,
+                                      self.sale_started_at, self.payment_started_at)
+            self.allocator.dispense(self.reserved_unit)
+            self.reserved_unit = None
+            # Изменилось наличие - экраны с признаком in_stock устарели
+            self.invalidate_screens(const.ITEM_CATEGORY)
+            self.invalidate_screens(const.ITEM_PRODUCTS_LIST)
         self.workflow(const.GO_HOME, None)
 
     def setup_ui(self):
@@ -193,34 +465,116 @@ class MainWindow(QMainWindow):
         self.top_panel = TopPanel()
         self.bottom_panel = BottomPanel()
         self.galery = ScrollPanel()
-        self.products = VerticalScrollPanel()
-        self.product_description = ProductDescription()
-        self.payment_metods = PaymentMetods(self.db.get_payments_metods())
+        # Остальные экраны строятся при первом переходе на них (build_screen) или в простое после запуска
+        self.search_panel = None
+        self.products = None
+        self.product_description = None
+        self.payment_metods = None
+        self.attract_panel = AttractPanel(self)
+        self.idle_mode = IdleMode(self.galery, self.attract_panel, self.db)
 
         self.galery.root_menu = True
         self.galery.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
         self.top_panel.home_button.clicked.connect(lambda: self.workflow(const.GO_HOME, None))
         self.top_panel.back_button.clicked.connect(lambda: self.workflow(const.GO_BACK, None))
+        self.top_panel.search_button.clicked.connect(self.on_search_clicked)
         self.bottom_panel.logo_button.clicked.connect(lambda: self.on_click_buttons(const.GO_LOGO))
         self.bottom_panel.discount_button.clicked.connect(lambda: self.on_click_buttons(const.GO_DISCONT))
         self.bottom_panel.system_button.clicked.connect(lambda: self.on_click_buttons(const.GO_SYSTEM))
         self.galery.item_clicked.connect(self.on_scroll_item_clicked)
-        self.products.item_clicked.connect(self.on_product_clicked)
-        self.product_description.closed_with_result.connect(self.on_pay_clicked)
-        self.payment_metods.closed_with_result.connect(self.on_payment_metod)
+        self.galery.idle_requested.connect(self.on_gallery_idle)
+        self.idle_mode.exited.connect(lambda: self.enableInactiveTimer(self.visible_item))
 
         self.main_layout.addWidget(self.top_panel)
         self.main_layout.addWidget(self.galery)
         self.galery.setVisible(False)
-        self.main_layout.addWidget(self.products)
-        self.products.setVisible(False)
-        self.main_layout.addWidget(self.product_description)
-        self.product_description.setVisible(False)
-        self.main_layout.addWidget(self.payment_metods)
-        self.payment_metods.setVisible(True)
         self.main_layout.addWidget(self.bottom_panel)
 
+        instrumentation = get_instrumentation()
+        self.paint_watcher = None
+        if instrumentation:
+            # Первая отрисовка панели после перехода закрывает замер задержки касание - экран
+            self.paint_watcher = PaintWatcher(instrumentation)
+            self.paint_watcher.watch(self.galery)
+
+    def screen_panel(self, item_panel):
+        """Панель экрана или None, если она еще не построена"""
+        match item_panel:
+            case const.ITEM_SEARCH:
+                return self.search_panel
+            case const.ITEM_PRODUCTS_LIST:
+                return self.products
+            case const.ITEM_PRODUCT_DETAILS:
+                return self.product_description
+            case const.PAYMET_METODS:
+                return self.payment_metods
+
+    @staticmethod
+    def set_screen_visible(panel, visible):
+        if panel is not None:
+            panel.setVisible(visible)
+
+    def build_screen(self, item_panel):
+        """Строит экран при первом обращении (модуль панели импортируется тут же)"""
+        if item_panel not in self.LAZY_SCREENS or self.screen_panel(item_panel) is not None:
+            return
+        with span("build_screen", item_panel):
+            match item_panel:
+                case const.ITEM_SEARCH:
+                    # Результаты поиска показывает список товаров
+                    self.build_screen(const.ITEM_PRODUCTS_LIST)
+                    from search_panel import SearchPanel
+                    panel = self.search_panel = SearchPanel()
+                    panel.query_changed.connect(self.on_search_query_changed)
+                case const.ITEM_PRODUCTS_LIST:
+                    from vertical_scroll_panel import VerticalScrollPanel
+                    panel = self.products = VerticalScrollPanel()
+                    panel.item_clicked.connect(self.on_product_clicked)
+                    panel.population_finished.connect(self.on_products_built)
+                case const.ITEM_PRODUCT_DETAILS:
+                    from product_description import ProductDescription
+                    panel = self.product_description = ProductDescription()
+                    panel.closed_with_result.connect(self.on_pay_clicked)
+                case const.PAYMET_METODS:
+                    from payment_metods import PaymentMetods
+                    panel = self.payment_metods = PaymentMetods(self.db.get_payments_metods())
+                    panel.closed_with_result.connect(self.on_payment_metod)
+            panel.setVisible(False)
+            # Место в окне - перед следующим по порядку уже построенным экраном
+            following = [self.screen_panel(screen) for screen in
+                         self.LAZY_SCREENS[self.LAZY_SCREENS.index(item_panel) + 1:]]
+            before = next((screen for screen in following if screen is not None), self.bottom_panel)
+            self.main_layout.insertWidget(self.main_layout.indexOf(before), panel)
+            if self.paint_watcher:
+                self.paint_watcher.watch(panel)
+
+    def build_next_screen(self):
+        """Постройка в простое: по одному экрану за пробуждение планировщика"""
+        screen = next((screen for screen in self.LAZY_SCREENS if self.screen_panel(screen) is None), None)
+        if screen is not None:
+            self.build_screen(screen)
+            get_scheduler().schedule(BUILD_SCREENS, self.LAZY_SCREENS_STEP, self.build_next_screen)
+
+
+    def on_gallery_idle(self):
+        """Бездействие в галерее: на главном экране - режим ожидания, в подкатегории - возврат на главный"""
+        if self.workflow_step == const.ST_WAIT:
+            self.idle_mode.enter()
+        else:
+            self.workflow(const.GO_HOME, None)
 
     def resizeEvent(self, event):
-        super().resizeEvent(event)
\ No newline at end of file
+        super().resizeEvent(event)
+
+    def closeEvent(self, event):
+        self.idle_mode.exit()
+        self.async_db.stop()
+        self.sales_journal.stop()
+        self.navigation.discard()
+        instrumentation = get_instrumentation()
+        if instrumentation:
+            count = instrumentation.export()
+            print(f"Замеры: {count} событий выгружено в {Settings.INSTRUMENTATION_PATH}")
+            print(format_summary(instrumentation.summary()))
+        super().closeEvent(event)
\ No newline at end of file
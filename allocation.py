@@ -0,0 +1,155 @@
+import bisect
+import time
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from scheduler import get_scheduler
+
+# Ближайшее истечение срока годности единицы товара
+EXPIRY = "stock.expiry"
+
+
+class UnitAllocator(QObject):
+    """
+    Выбор физической единицы товара (таблица goods) для продажи по принципу FIFO.
+    Единицы каждого товара хранятся в списке, отсортированном по pack_date_time:
+    просроченные единицы всегда образуют префикс списка, поэтому самая старая годная
+    единица находится одним бинарным поиском.
+    Счетчики наличия (StockCounter) получают отсюда число годных свободных единиц - тех, что
+    reserve может выдать; к ближайшему истечению срока годности счетчики пересчитываются по планировщику.
+    """
+    expired = pyqtSignal()  # истек срок годности единиц - наличие уменьшилось
+
+    def __init__(self, db, stock=None):
+        super().__init__()
+        self.db = db
+        self.stock = stock
+        self.units = {}  # guid товара -> [(pack_date_time, good_id), ...] по возрастанию
+        self.shelf_life = {}  # guid товара -> срок хранения в секундах (None - не ограничен)
+        self.reserved = {}  # good_id -> (guid товара, pack_date_time)
+        self.counted = {}  # guid товара -> число годных свободных единиц, переданное в stock
+
+    def rebuild(self):
+        # Резервы, оставшиеся после аварийного завершения, больше никому не принадлежат.
+        # Единицы, зарезервированные этим распределителем (идет оплата), остаются за ним
+        self.db.release_goods_unit(keep=self.reserved)
+        self.shelf_life = {guid: hours * 3600 if hours else None
+                           for guid, hours in self.db.get_products_shelf_life().items()}
+        units = {}
+        for good_id, product_guid, pack_date_time in self.db.get_goods_units():
+            units.setdefault(product_guid, []).append((pack_date_time or 0, good_id))
+        for product_units in units.values():
+            product_units.sort()
+        self.units = units
+        now = time.time()
+        self.counted = {product_guid: self.valid_count(product_guid, now) for product_guid in units}
+        if self.stock:
+            self.stock.rebuild(self.counted)
+        self.schedule_expiry(now)
+
+    def unit_added(self, good_id, product_guid, pack_date_time):
+        """Единица товара заложена в автомат"""
+        bisect.insort(self.units.setdefault(product_guid, []), (pack_date_time, good_id))
+        self.update_stock(product_guid)
+
+    def valid_count(self, product_guid, now):
+        """Число годных свободных единиц товара"""
+        return len(self.units.get(product_guid, [])) - self.first_valid_position(product_guid, now)
+
+    def update_stock(self, product_guid, now=None):
+        """Передает в счетчики наличия изменение числа годных свободных единиц товара"""
+        now = now or time.time()
+        count = self.valid_count(product_guid, now)
+        delta = count - self.counted.get(product_guid, 0)
+        self.counted[product_guid] = count
+        if self.stock and delta > 0:
+            self.stock.unit_added(product_guid, delta)
+        elif self.stock and delta < 0:
+            self.stock.unit_dispensed(product_guid, -delta)
+        return delta
+
+    def next_expiry(self, now):
+        """Момент, когда истечет срок самой старой годной единицы (None - сроки не ограничены)"""
+        moments = []
+        for product_guid, product_units in self.units.items():
+            shelf_life = self.shelf_life.get(product_guid)
+            position = self.first_valid_position(product_guid, now)
+            if shelf_life is not None and position < len(product_units):
+                moments.append(product_units[position][0] + shelf_life)
+        return min(moments, default=None)
+
+    def schedule_expiry(self, now):
+        moment = self.next_expiry(now)
+        if moment is None:
+            get_scheduler().cancel(EXPIRY)
+        else:
+            get_scheduler().schedule(EXPIRY, max(0.0, moment - now) + 0.001, self.on_expiry, exact=True)
+
+    def on_expiry(self):
+        now = time.time()
+        changed = False
+        for product_guid in list(self.units):
+            if self.update_stock(product_guid, now):
+                changed = True
+        self.schedule_expiry(now)
+        if changed:
+            self.expired.emit()
+
+    def first_valid_position(self, product_guid, now):
+        """Позиция первой непросроченной единицы в списке товара"""
+        shelf_life = self.shelf_life.get(product_guid)
+        if shelf_life is None:
+            return 0
+        return bisect.bisect_left(self.units.get(product_guid, []), (now - shelf_life,))
+
+    def expired_units(self, product_guid, now=None):
+        """Просроченные единицы товара (для списания)"""
+        now = now or time.time()
+        product_units = self.units.get(product_guid, [])
+        return [good_id for pack_date_time, good_id in product_units[:self.first_valid_position(product_guid, now)]]
+
+    def oldest_valid(self, product_guid, now=None):
+        """Самая старая непросроченная единица товара или None"""
+        now = now or time.time()
+        product_units = self.units.get(product_guid, [])
+        position = self.first_valid_position(product_guid, now)
+        if position < len(product_units):
+            return product_units[position][1]
+        return None
+
+    def reserve(self, product_guid, now=None):
+        """
+        Резервирует самую старую годную единицу товара.
+        Если единицу успел забрать другой писатель - она убирается из индекса и берется следующая.
+        При ошибке БД единица остается в индексе.
+        :return: good_id или None, если годных единиц нет или БД недоступна
+        """
+        now = now or time.time()
+        product_units = self.units.get(product_guid, [])
+        position = self.first_valid_position(product_guid, now)
+        while position < len(product_units):
+            pack_date_time, good_id = product_units[position]
+            result = self.db.reserve_goods_unit(good_id, int(now))
+            if result == self.db.UNIT_ERROR:
+                return None
+            del product_units[position]
+            if result == self.db.UNIT_RESERVED:
+                self.reserved[good_id] = (product_guid, pack_date_time)
+                self.update_stock(product_guid, now)
+                return good_id
+        self.update_stock(product_guid, now)
+        return None
+
+    def release(self, good_id):
+        """Возвращает зарезервированную единицу в продажу (оплата не состоялась)"""
+        unit = self.reserved.pop(good_id, None)
+        if unit is None:
+            return
+        self.db.release_goods_unit(good_id)
+        product_guid, pack_date_time = unit
+        self.unit_added(good_id, product_guid, pack_date_time)
+
+    def dispense(self, good_id):
+        """Единица выдана покупателю: удаляется из goods (из счетчиков наличия она ушла при резерве)"""
+        if self.reserved.pop(good_id, None) is None:
+            return
+        self.db.delete_goods_unit(good_id)
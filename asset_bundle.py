@@ -0,0 +1,55 @@
+import json
+import os
+
+from settings import Settings
+from thumbnail_cache import ThumbnailCache
+
+
+def profile_name(width, height):
+    return f"{width}x{height}"
+
+
+def source_key(source):
+    """Путь к исходной картинке относительно каталога приложения, с '/' в качестве разделителя"""
+    path = os.path.abspath(source.replace("\\", "/"))
+    return os.path.relpath(path, Settings.BASE_DIR).replace(os.sep, "/")
+
+
+def variant_key(size, mode):
+    width = 0 if mode == ThumbnailCache.MODE_HEIGHT else size.width()
+    return f"{width}x{size.height()}|{mode}"
+
+
+class AssetBundle:
+    """
+    Картинки, заранее подготовленные asset_pipeline под профиль экрана.
+    Картинка берется из набора, только если совпадают размер, режим масштабирования и mtime исходника,
+    иначе используется обычный путь через кэш миниатюр.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.images = {}  # путь к исходнику -> {"mtime": ..., "variants": {размер|режим: файл}}
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.images = json.load(f)["images"]
+
+    def lookup(self, source, size, mode, mtime):
+        """Путь к готовой картинке или None"""
+        entry = self.images.get(source_key(source))
+        if entry is None or entry["mtime"] != mtime:
+            return None
+        name = entry["variants"].get(variant_key(size, mode))
+        return os.path.join(self.path, name) if name else None
+
+
+def load_asset_bundle(width, height):
+    """Загружает набор картинок для экрана width x height, если он собран"""
+    path = os.path.join(Settings.ASSET_BUNDLE_PATH, profile_name(width, height))
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        print(f"Набор картинок для экрана {profile_name(width, height)} не найден, картинки масштабируются на лету")
+        return None
+    try:
+        return AssetBundle(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ошибка чтения набора картинок {path}: {e}")
+        return None
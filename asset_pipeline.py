@@ -0,0 +1,192 @@
+"""
+Подготовка картинок каталога под профиль экрана.
+Запускается после каждого обновления каталога:
+
+    python asset_pipeline.py 1080x1920 [1920x1080 ...] [--workers N] [--force]
+
+Все картинки из папок категорий, товаров и иконок перекодируются в точные размеры, в которых их показывает
+приложение на экране заданного размера, и складываются в Settings.ASSET_BUNDLE_PATH/<ширина>x<высота>
+вместе с manifest.json. Приложение загружает набор под свой экран (asset_bundle.load_asset_bundle) и
+берет из него картинки без масштабирования.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt5.QtCore import QSize
+
+from settings import Settings
+from thumbnail_cache import ThumbnailCache
+from asset_bundle import profile_name, source_key, variant_key
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Панели, с которыми MainWindow показывает галерею категорий: (верхняя, нижняя).
+# Главный экран - с обеими, подкатегории - без нижней, поэтому картинки там крупнее
+GALLERY_LAYOUTS = ((True, True), (True, False))
+
+
+def profile_variants(width, height):
+    """
+    Размеры картинок для экрана width x height
+    :return: папка с исходниками -> список (ширина, высота, режим масштабирования)
+    """
+    # Импорт виджетов только ради формул размеров - QApplication не нужен
+    from scroll_panel import ScrollPanel
+    from product_description import ProductImage
+
+    gallery_sizes = [ScrollPanel.item_size_for_height(height - Settings.TOP_PANEL_HEIGHT * top
+                                                      - Settings.BOTTOM_PANEL_HEIGHT * bottom)
+                     for top, bottom in GALLERY_LAYOUTS]
+    product_image_size = ProductImage.image_size_for_screen(height)
+    return {
+        Settings.CATEGORY_IMAGE_PATH: [
+            (gallery_size.width(), gallery_size.height(), ThumbnailCache.MODE_HEIGHT) for gallery_size in gallery_sizes
+        ],
+        Settings.PRODUCT_IMAGE_PATH: [
+            # Строка списка товаров (VerticalScrollPanel) и карточка товара (ProductImage)
+            (Settings.ITEMS_LINE_SIZE * 2, Settings.ITEMS_LINE_SIZE, ThumbnailCache.MODE_HEIGHT),
+            (product_image_size, product_image_size, ThumbnailCache.MODE_FIT),
+        ],
+        Settings.ICONS_PATH: [
+            # Кнопки верхней и нижней панелей (TextImageButton)
+            (0, Settings.TOP_PANEL_HEIGHT - 20, ThumbnailCache.MODE_HEIGHT),
+            (0, Settings.BOTTOM_PANEL_HEIGHT - 20, ThumbnailCache.MODE_HEIGHT),
+        ],
+    }
+
+
+def collect_sources(variants):
+    """Исходные картинки: путь -> список размеров"""
+    sources = {}
+    for folder, sizes in variants.items():
+        folder = os.path.join(Settings.BASE_DIR, folder.replace("\\", "/"))
+        if not os.path.isdir(folder):
+            print(f"Папка {folder} не найдена")
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                sources.setdefault(os.path.join(folder, name), []).extend(sizes)
+    return sources
+
+
+def process_image(source, output_path, sizes):
+    """
+    Перекодирует одну картинку во все нужные размеры (выполняется в отдельном процессе)
+    :return: (путь к исходнику, mtime, {размер|режим: имя файла}, ошибки)
+    """
+    mtime = os.stat(source).st_mtime_ns
+    folder = os.path.basename(os.path.dirname(source))
+    stem = os.path.splitext(os.path.basename(source))[0]
+    variants = {}
+    errors = []
+    for width, height, mode in sorted(set(sizes)):
+        size = QSize(width, height)
+        image = ThumbnailCache.render(source, size, mode)
+        if image.isNull():
+            errors.append(f"Не удалось прочитать {source}")
+            break
+        image_format = ThumbnailCache.image_format(image)
+        name = f"{folder}_{stem}_{width}x{height}_{mode}.{image_format.lower()}"
+        if not image.save(os.path.join(output_path, name), image_format, 90):
+            errors.append(f"Не удалось сохранить {name}")
+            continue
+        variants[variant_key(size, mode)] = name
+    return source, mtime, variants, errors
+
+
+def read_manifest(output_path):
+    try:
+        with open(os.path.join(output_path, "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)["images"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def is_up_to_date(entry, source, sizes, output_path):
+    if entry is None or entry["mtime"] != os.stat(source).st_mtime_ns:
+        return False
+    expected = {variant_key(QSize(width, height), mode) for width, height, mode in sizes}
+    if set(entry["variants"]) != expected:
+        return False
+    return all(os.path.exists(os.path.join(output_path, name)) for name in entry["variants"].values())
+
+
+def build_profile(width, height, workers=None, force=False):
+    """Собирает набор картинок для экрана width x height"""
+    started = time.monotonic()
+    output_path = os.path.join(Settings.ASSET_BUNDLE_PATH, profile_name(width, height))
+    os.makedirs(output_path, exist_ok=True)
+
+    sources = collect_sources(profile_variants(width, height))
+    previous = {} if force else read_manifest(output_path)
+    images = {}
+    pending = []
+    for source, sizes in sources.items():
+        entry = previous.get(source_key(source))
+        if is_up_to_date(entry, source, sizes, output_path):
+            images[source_key(source)] = entry
+        else:
+            pending.append((source, sizes))
+
+    errors = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_image, source, output_path, sizes) for source, sizes in pending]
+            for future in futures:
+                source, mtime, variants, image_errors = future.result()
+                for error in image_errors:
+                    print(error)
+                errors += len(image_errors)
+                if variants:
+                    images[source_key(source)] = {"mtime": mtime, "variants": variants}
+
+    manifest = {
+        "profile": {"width": width, "height": height},
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "images": images,
+    }
+    temp_name = os.path.join(output_path, "manifest.json.tmp")
+    with open(temp_name, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(temp_name, os.path.join(output_path, "manifest.json"))
+
+    # Файлы удаленных и замененных картинок
+    used = {name for entry in images.values() for name in entry["variants"].values()}
+    removed = 0
+    for name in os.listdir(output_path):
+        if name != "manifest.json" and name not in used:
+            os.remove(os.path.join(output_path, name))
+            removed += 1
+
+    print(f"{profile_name(width, height)}: картинок {len(images)}, перекодировано {len(pending)}, "
+          f"удалено файлов {removed}, ошибок {errors}, {time.monotonic() - started:.1f} с")
+    return errors == 0
+
+
+def parse_profile(value):
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Профиль экрана задается как ШИРИНАxВЫСОТА, получено {value}")
+    return width, height
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Подготовка картинок каталога под профиль экрана")
+    parser.add_argument("profiles", nargs="+", type=parse_profile, help="размер экрана, например 1080x1920")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию - число ядер)")
+    parser.add_argument("--force", action="store_true", help="перекодировать все картинки заново")
+    args = parser.parse_args(argv)
+
+    ok = True
+    for width, height in args.profiles:
+        ok = build_profile(width, height, args.workers, args.force) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
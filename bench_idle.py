@@ -0,0 +1,83 @@
+"""
+Замер процессорного времени главного экрана в простое.
+
+    python bench_idle.py [секунд на замер]
+
+"до" - автопрокрутка галереи как было раньше: QPropertyAnimation через всю галерею (1 с, кадры по 16 мс)
+и повтор каждые 1.7 с,
+"после" - режим ожидания (idle_mode.IdleMode, Settings.IDLE_ATTRACT = "gallery"): шаг прокрутки
+Settings.IDLE_FPS раз в секунду по планировщику.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from settings import Settings
+from styles import apply_theme
+from scroll_panel import ScrollPanel
+from visual_elements import AttractPanel
+from idle_mode import IdleMode
+
+
+def make_gallery(count=30):
+    gallery = ScrollPanel()
+    gallery.gallery_data = {"items": [{"guid": f"guid{i}", "name": f"Категория {i}", "image": None} for i in range(count)]}
+    gallery.resize(1920, 700)
+    gallery.show()
+    gallery.load_gallery_data()
+    gallery.stop_inactivity_timer()
+    return gallery
+
+
+def spin(seconds):
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+
+
+def measure(seconds):
+    """Процессорное время за seconds секунд работы цикла событий"""
+    started = time.process_time()
+    spin(seconds)
+    return time.process_time() - started
+
+
+def old_auto_scroll(gallery):
+    scrollbar = gallery.scroll_area.horizontalScrollBar()
+    target = scrollbar.minimum() if scrollbar.value() >= scrollbar.maximum() else scrollbar.maximum()
+    gallery.smooth_scroll_to(target, 1000)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    app = QApplication(sys.argv)
+    apply_theme(Settings.THEME)
+
+    gallery = make_gallery()
+    spin(0.2)
+    timer = QTimer()
+    timer.timeout.connect(lambda: old_auto_scroll(gallery))
+    timer.start(1700)
+    old_auto_scroll(gallery)
+    before = measure(seconds)
+    timer.stop()
+    gallery.stop_auto_scroll()
+
+    idle_mode = IdleMode(gallery, AttractPanel(gallery), None)
+    idle_mode.enter()
+    after = measure(seconds)
+    idle_mode.exit()
+
+    print(f"Простой {seconds:.0f} с, галерея {len(gallery.items)} категорий")
+    print(f"До (анимация на полной частоте): процессор {before:.3f} с ({before * 100 / seconds:.1f}%)")
+    print(f"После (режим ожидания, {Settings.IDLE_FPS} кадров/с): процессор {after:.3f} с ({after * 100 / seconds:.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Замер стоимости применения стилей на строку списка товаров.
+
+    python bench_styles.py [число строк]
+
+"до" - таблица STYLES задается панели и каждой метке названия (как было раньше),
+"после" - одна таблица на уровне приложения (styles.apply_theme).
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEvent
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from styles import STYLES, apply_theme
+from vertical_scroll_panel import ProductsItemWidget
+
+
+def polish_tree(widget):
+    widget.ensurePolished()
+    for child in widget.findChildren(QWidget):
+        child.ensurePolished()
+
+
+def build_rows(count, per_widget):
+    panel = QWidget()
+    if per_widget:
+        panel.setStyleSheet(STYLES)
+    started = time.perf_counter()
+    for i in range(count):
+        row = ProductsItemWidget(f"guid{i}", f"Товар {i}", None, 100.0, 90.0 if i % 2 else 0, 150)
+        row.setParent(panel)
+        if per_widget:
+            row.name_label.setStyleSheet(STYLES)
+        polish_tree(row)
+    elapsed = time.perf_counter() - started
+    panel.deleteLater()
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    app = QApplication(sys.argv)
+
+    before = build_rows(count, per_widget=True)
+    apply_theme("dark")
+    after = build_rows(count, per_widget=False)
+    print(f"Строк: {count}")
+    print(f"До (таблица на виджет):      {before * 1000 / count:.3f} мс на строку")
+    print(f"После (таблица приложения):  {after * 1000 / count:.3f} мс на строку")
+
+    # Смена темы при экране из 10 строк (столько строк живет в виртуальном списке)
+    panel = QWidget()
+    for i in range(10):
+        ProductsItemWidget(f"guid{i}", f"Товар {i}", None, 100.0, 0, 150).setParent(panel)
+    polish_tree(panel)
+    started = time.perf_counter()
+    apply_theme("light")
+    apply_theme("dark")
+    print(f"Смена темы туда и обратно:   {(time.perf_counter() - started) * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
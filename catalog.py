@@ -0,0 +1,95 @@
+class CatalogTree:
+    """
+    Дерево категорий каталога в памяти.
+    Загружается из БД один раз, навигация по нему - поиск в словаре без SQL-рекурсии.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.categories = {}      # guid -> {"guid", "name", "parent", "image"}
+        self.children = {}        # guid родителя (None - корень) -> [guid дочерних]
+        self.product_count = {}   # guid -> количество товаров непосредственно в категории
+        self.subtree_count = {}   # guid -> количество товаров в категории и всех дочерних
+        self.is_loaded = False
+
+    def invalidate(self):
+        """Помечает дерево устаревшим, перестроение произойдет при следующем обращении"""
+        self.is_loaded = False
+
+    def rebuild(self):
+        """Полное перестроение дерева из БД"""
+        categories = {}
+        children = {None: []}
+        for category_id, parent_id, name, extension in self.db.get_all_categories():
+            categories[category_id] = {
+                "guid": category_id,
+                "name": name,
+                "parent": parent_id,
+                "image": f"{category_id}.{extension}" if extension else None
+            }
+            children.setdefault(category_id, [])
+        for guid, category in categories.items():
+            parent = category["parent"] if category["parent"] in categories else None
+            category["parent"] = parent
+            children[parent].append(guid)
+
+        product_count = self.db.get_products_count_by_category()
+        subtree_count = {}
+
+        # Обход в глубину (стек) дает родителя раньше его потомков, в обратном порядке
+        # дочерние категории считаются раньше родительских
+        order = []
+        queue = list(children[None])
+        while queue:
+            guid = queue.pop()
+            order.append(guid)
+            queue.extend(children[guid])
+        for guid in reversed(order):
+            subtree_count[guid] = product_count.get(guid, 0) + sum(subtree_count[child] for child in children[guid])
+
+        self.categories = categories
+        self.children = children
+        self.product_count = {guid: product_count.get(guid, 0) for guid in categories}
+        self.subtree_count = subtree_count
+        self.is_loaded = True
+
+    def ensure_loaded(self):
+        if not self.is_loaded:
+            self.rebuild()
+
+    def get_categories_with_products_hierarchy(self, parent_guid=None):
+        """
+        Аналог Database.get_categories_with_products_hierarchy без обращения к БД
+        :param parent_guid: если None - корневые категории с товарами,
+                           если указан - дочерние категории с товарами для этого родителя
+        :return: {'items': [{"guid", "name", "image"}, ...]}
+        """
+        self.ensure_loaded()
+        items = []
+        for guid in self.children.get(parent_guid, []):
+            if self.subtree_count.get(guid, 0) > 0:
+                category = self.categories[guid]
+                items.append({
+                    "guid": guid,
+                    "name": category["name"],
+                    "image": category["image"]
+                })
+        return {'items': items}
+
+    def subcategories(self, guid):
+        """Количество дочерних категорий, в которых есть товары"""
+        self.ensure_loaded()
+        return sum(1 for child in self.children.get(guid, []) if self.subtree_count.get(child, 0) > 0)
+
+    def is_leaf(self, guid):
+        """Категория без дочерних категорий с товарами - из нее переходим к списку товаров"""
+        return self.subcategories(guid) == 0
+
+    def get_parent_category(self, guid):
+        self.ensure_loaded()
+        category = self.categories.get(guid)
+        return category["parent"] if category else None
+
+    def get_category(self, guid):
+        self.ensure_loaded()
+        return self.categories.get(guid)
@@ -8,14 +8,18 @@ class Constants:
     GO_SUBCATEGORY = 7
     GO_PRODUCT_DETAILS = 8
     GO_PAYMENT_METODS = 10
+    GO_SEARCH = 11
 
     ST_WAIT = 0
     ST_SUBCATEGORY = 1
     ST_PRODUCT_LIST = 2
     ST_PRODUCT_DETAILS = 3
     ST_PAYMET_METODS =4
+    ST_SEARCH = 5
 
     ITEM_CATEGORY = 0
     ITEM_PRODUCTS_LIST = 1
     ITEM_PRODUCT_DETAILS = 2
     PAYMET_METODS = 4
+    ITEM_SEARCH = 5
+
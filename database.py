@@ -1,8 +1,163 @@
+import re
 import sqlite3
 from settings import Settings
 
 
+# Миграции схемы БД. Номер версии = позиция в списке (начиная с 1),
+# текущая версия хранится в PRAGMA user_version.
+# Уже выпущенные миграции не изменять - только добавлять новые в конец.
+MIGRATIONS = [
+    # 1: вторичные индексы и первичные ключи для payment и goods
+    """
+    CREATE TABLE goods_new (
+        good_id TEXT PRIMARY KEY,
+        product_id TEXT,
+        pack_date_time INTEGER,
+        FOREIGN KEY (product_id) REFERENCES product (guid)
+    );
+    INSERT OR IGNORE INTO goods_new (good_id, product_id, pack_date_time)
+        SELECT good_id, product_id, pack_date_time FROM goods ORDER BY rowid;
+    DROP TABLE goods;
+    ALTER TABLE goods_new RENAME TO goods;
+
+    CREATE TABLE payment_new (
+        id INTEGER PRIMARY KEY,
+        sys_name TEXT,
+        name TEXT
+    );
+    INSERT OR IGNORE INTO payment_new (id, sys_name, name)
+        SELECT id, sys_name, name FROM payment ORDER BY rowid;
+    DROP TABLE payment;
+    ALTER TABLE payment_new RENAME TO payment;
+
+    CREATE INDEX IF NOT EXISTS idx_product_category ON product (category, name);
+    CREATE INDEX IF NOT EXISTS idx_category_parent ON category (parent_id, name);
+    CREATE INDEX IF NOT EXISTS idx_goods_product ON goods (product_id, pack_date_time);
+    CREATE INDEX IF NOT EXISTS idx_discount_category ON discount (category_id);
+    CREATE INDEX IF NOT EXISTS idx_discount_items ON discount (items_id);
+    """,
+    # 2: таблица замыканий иерархии категорий (предок, потомок, глубина), поддерживается триггерами
+    """
+    CREATE TABLE category_closure (
+        ancestor TEXT NOT NULL,
+        descendant TEXT NOT NULL,
+        depth INTEGER NOT NULL,
+        PRIMARY KEY (ancestor, descendant)
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_category_closure_descendant ON category_closure (descendant, ancestor);
+
+    INSERT INTO category_closure (ancestor, descendant, depth)
+        WITH RECURSIVE tree (ancestor, descendant, depth) AS (
+            SELECT category_id, category_id, 0 FROM category
+            UNION ALL
+            SELECT t.ancestor, c.category_id, t.depth + 1
+            FROM tree t
+            INNER JOIN category c ON c.parent_id = t.descendant
+        )
+        SELECT ancestor, descendant, depth FROM tree;
+
+    CREATE TRIGGER category_closure_insert AFTER INSERT ON category
+    BEGIN
+        INSERT INTO category_closure (ancestor, descendant, depth)
+            VALUES (NEW.category_id, NEW.category_id, 0);
+        INSERT INTO category_closure (ancestor, descendant, depth)
+            SELECT ancestor, NEW.category_id, depth + 1
+            FROM category_closure
+            WHERE descendant = NEW.parent_id;
+    END;
+
+    CREATE TRIGGER category_closure_delete AFTER DELETE ON category
+    BEGIN
+        DELETE FROM category_closure
+        WHERE descendant = OLD.category_id OR ancestor = OLD.category_id;
+    END;
+
+    -- Перенос поддерева: отрываем его от старых предков и подвешиваем к новым
+    CREATE TRIGGER category_closure_move AFTER UPDATE OF parent_id ON category
+    WHEN OLD.parent_id IS NOT NEW.parent_id
+    BEGIN
+        DELETE FROM category_closure
+        WHERE descendant IN (SELECT descendant FROM category_closure WHERE ancestor = NEW.category_id)
+          AND ancestor NOT IN (SELECT descendant FROM category_closure WHERE ancestor = NEW.category_id);
+        INSERT INTO category_closure (ancestor, descendant, depth)
+            SELECT super.ancestor, sub.descendant, super.depth + sub.depth + 1
+            FROM category_closure super
+            INNER JOIN category_closure sub ON sub.ancestor = NEW.category_id
+            WHERE super.descendant = NEW.parent_id;
+    END;
+    """,
+    # 3: резервирование единиц товара на время оплаты
+    """
+    ALTER TABLE goods ADD COLUMN reserved_at INTEGER;
+    """,
+    # 4: журнал продаж
+    """
+    CREATE TABLE sale (
+        sale_id TEXT PRIMARY KEY,
+        product_id TEXT NOT NULL,
+        good_id TEXT,
+        price REAL NOT NULL,
+        discount REAL NOT NULL DEFAULT 0,
+        payment_method TEXT,
+        started_at REAL,
+        payment_started_at REAL,
+        paid_at REAL NOT NULL,
+        FOREIGN KEY (product_id) REFERENCES product (guid)
+    );
+    CREATE INDEX idx_sale_paid_at ON sale (paid_at);
+    """,
+    # 5: полнотекстовый поиск товаров по названию, описанию и составу.
+    # Таблица хранит свою копию текста и связана с product по guid: неявный rowid product (ключ у него TEXT)
+    # может перенумеровать VACUUM
+    """
+    CREATE VIRTUAL TABLE product_fts USING fts5(
+        guid UNINDEXED, name, description, ingredients,
+        prefix='1 2 3'
+    );
+    INSERT INTO product_fts (guid, name, description, ingredients)
+        SELECT guid, name, description, ingredients FROM product;
+
+    CREATE TRIGGER product_fts_insert AFTER INSERT ON product
+    BEGIN
+        INSERT INTO product_fts (guid, name, description, ingredients)
+            VALUES (NEW.guid, NEW.name, NEW.description, NEW.ingredients);
+    END;
+
+    CREATE TRIGGER product_fts_delete AFTER DELETE ON product
+    BEGIN
+        DELETE FROM product_fts WHERE guid = OLD.guid;
+    END;
+
+    CREATE TRIGGER product_fts_update AFTER UPDATE OF guid, name, description, ingredients ON product
+    BEGIN
+        DELETE FROM product_fts WHERE guid = OLD.guid;
+        INSERT INTO product_fts (guid, name, description, ingredients)
+            VALUES (NEW.guid, NEW.name, NEW.description, NEW.ingredients);
+    END;
+    """,
+]
+
+# Первичные ключи, которые вводит миграция (номер -> (таблица, столбец)): из строк с одинаковым ключом
+# переносится первая, остальные перед миграцией печатаются целиком
+MIGRATION_UNIQUE_KEYS = {
+    1: (("goods", "good_id"), ("payment", "id")),
+}
+
+
 class Database:
+    # Результаты reserve_goods_unit
+    UNIT_RESERVED = "reserved"  # единица была свободна и теперь зарезервирована
+    UNIT_TAKEN = "taken"  # единицу уже зарезервировал или удалил другой писатель
+    UNIT_ERROR = "error"  # ошибка БД (например, database is locked) - о единице ничего не известно
+
+    # Товары категории строками списка: (картинка, название, guid, цена, цена со скидкой)
+    ITEMS_BY_CATEGORY_SQL = '''SELECT 
+                 p.guid||'.'||p.extension AS image, p.name AS text, p.guid, p.price, 0 as discount_price
+             FROM product p 
+             WHERE p.category = ? 
+             ORDER BY p.name
+         '''
+
     def __init__(self):
         self.conn = None
         self.connect()
@@ -10,10 +165,34 @@ class Database:
     def connect(self):
         try:
             self.conn = sqlite3.connect(Settings.DATABASE_PATH)
-            # self.create_tables()
+            self.migrate()
         except sqlite3.Error as e:
             print(f"Database error: {e}")
 
+    def migrate(self):
+        """Применяет к БД миграции, которых еще нет (по PRAGMA user_version)"""
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            try:
+                for table, column in MIGRATION_UNIQUE_KEYS.get(number, ()):
+                    self.report_duplicates(number, table, column)
+                # Каждая миграция выполняется в отдельной транзакции вместе с повышением версии
+                self.conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;")
+            except sqlite3.Error as e:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                print(f"Migration {number} failed: {e}")
+                raise
+
+    def report_duplicates(self, number, table, column):
+        """Печатает строки, которые миграция не перенесет из-за повторяющегося ключа"""
+        rows = self.conn.execute(f'''SELECT * FROM {table}
+            WHERE {column} IN (SELECT {column} FROM {table} GROUP BY {column} HAVING COUNT(*) > 1)
+              AND rowid NOT IN (SELECT MIN(rowid) FROM {table} GROUP BY {column})
+            ORDER BY rowid''').fetchall()
+        for row in rows:
+            print(f"Migration {number}: duplicate {table}.{column}, row dropped: {row}")
+
     def __del__(self):
         if self.conn:
             self.conn.close()
@@ -34,49 +213,19 @@ class Database:
         """
         try:
             self.cursor = self.conn.cursor()
-            if parent_guid is None:
-                # Корневые категории, в которых есть товары (прямо или в дочерних)
-                self.cursor.execute("""
-                    WITH RECURSIVE category_tree AS (
-                        -- Базовый случай: все категории, в которых есть товары
-                        SELECT DISTINCT c.category_id, c.name, c.parent_id, c.extension
-                        FROM category c
-                        INNER JOIN product p ON p.category = c.category_id
-
-                        UNION
-
-                        -- Рекурсивный случай: родительские категории
-                        SELECT c.category_id, c.name, c.parent_id, c.extension
-                        FROM category c
-                        INNER JOIN category_tree ct ON c.category_id = ct.parent_id
-                    )
-                    SELECT DISTINCT category_id, name, parent_id, extension
-                    FROM category_tree 
-                    WHERE parent_id IS NULL
-                    ORDER BY name
-                """)
-            else:
-                # Дочерние категории с товарами для указанного родителя
-                self.cursor.execute("""
-                    WITH RECURSIVE category_tree AS (
-                        -- Базовый случай: все категории, в которых есть товары
-                        SELECT DISTINCT c.category_id, c.name, c.parent_id, c.extension
-                        FROM category c
-                        INNER JOIN product p ON p.category = c.category_id
-                        WHERE c.parent_id = ?
-
-                        UNION
-
-                        -- Рекурсивный случай: дочерние категории с товарами
-                        SELECT c.category_id, c.name, c.parent_id, c.extension
-                        FROM category c
-                        INNER JOIN category_tree ct ON c.parent_id = ct.category_id
-                        INNER JOIN product p ON p.category = c.category_id
-                    )
-                    SELECT DISTINCT category_id, name, parent_id, extension
-                    FROM category_tree 
-                    ORDER BY name
-                """, (parent_guid,))
+            # Категории уровня parent_guid, у которых в поддереве (по таблице замыканий) есть товары
+            self.cursor.execute("""
+                SELECT c.category_id, c.name, c.parent_id, c.extension
+                FROM category c
+                WHERE c.parent_id IS ?
+                  AND EXISTS (
+                      SELECT 1
+                      FROM category_closure cc
+                      INNER JOIN product p ON p.category = cc.descendant
+                      WHERE cc.ancestor = c.category_id
+                  )
+                ORDER BY c.name
+            """, (parent_guid,))
 
             categories = []
             for row in self.cursor.fetchall():
@@ -93,16 +242,166 @@ class Database:
             print(f"Error getting categories with products hierarchy: {e}")
             return []
 
+    def get_all_categories(self):
+        """Плоский список всех категорий (category_id, parent_id, name, extension)"""
+        if not self.conn:
+            self.connect()
+        cursor = self.conn.cursor()
+        cursor.execute('''SELECT category_id, parent_id, name, extension FROM category ORDER BY name''')
+        return cursor.fetchall()
+
+    def get_products_count_by_category(self):
+        """Количество товаров, привязанных непосредственно к каждой категории"""
+        if not self.conn:
+            self.connect()
+        cursor = self.conn.cursor()
+        cursor.execute('''SELECT category, COUNT(*) FROM product GROUP BY category''')
+        return dict(cursor.fetchall())
+
+    def get_product_categories(self):
+        """Соответствие guid товара -> guid категории"""
+        if not self.conn:
+            self.connect()
+        cursor = self.conn.cursor()
+        cursor.execute('''SELECT guid, category FROM product''')
+        return dict(cursor.fetchall())
+
+    def get_goods_units(self):
+        """Свободные (не зарезервированные) единицы товара: (good_id, product_id, pack_date_time)"""
+        if not self.conn:
+            self.connect()
+        cursor = self.conn.cursor()
+        cursor.execute('''SELECT good_id, product_id, pack_date_time FROM goods WHERE reserved_at IS NULL''')
+        return cursor.fetchall()
+
+    def get_products_shelf_life(self):
+        """Срок хранения товаров в часах"""
+        if not self.conn:
+            self.connect()
+        cursor = self.conn.cursor()
+        cursor.execute('''SELECT guid, shelf_life FROM product''')
+        return dict(cursor.fetchall())
+
+    def reserve_goods_unit(self, good_id, reserved_at):
+        """
+        Атомарно резервирует единицу товара.
+        BEGIN IMMEDIATE берет блокировку записи сразу, поэтому параллельный писатель
+        (загрузка/синхронизация) не может зарезервировать или удалить ту же единицу.
+        :return: UNIT_RESERVED, UNIT_TAKEN или UNIT_ERROR
+        """
+        if not self.conn:
+            self.connect()
+        if self.conn.in_transaction:
+            self.conn.commit()
+        try:
+            self.conn.execute('BEGIN IMMEDIATE')
+            cursor = self.conn.execute('''UPDATE goods SET reserved_at = ? WHERE good_id = ? AND reserved_at IS NULL''',
+                                       (reserved_at, good_id))
+            self.conn.commit()
+            return self.UNIT_RESERVED if cursor.rowcount == 1 else self.UNIT_TAKEN
+        except sqlite3.Error as e:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            print(f"Error reserving goods unit {good_id}: {e}")
+            return self.UNIT_ERROR
+
+    def release_goods_unit(self, good_id=None, keep=()):
+        """
+        Снимает резерв с единицы товара (или со всех единиц, если good_id не указан)
+        :param keep: good_id единиц, резерв которых при снятии всех резервов сохраняется
+        """
+        if not self.conn:
+            self.connect()
+        if good_id is None:
+            keep = list(keep)
+            self.conn.execute(f'''UPDATE goods SET reserved_at = NULL
+                WHERE reserved_at IS NOT NULL AND good_id NOT IN ({", ".join("?" * len(keep))})''', keep)
+        else:
+            self.conn.execute('''UPDATE goods SET reserved_at = NULL WHERE good_id = ?''', (good_id,))
+        self.conn.commit()
+
+    def delete_goods_unit(self, good_id):
+        """Удаляет выданную единицу товара"""
+        if not self.conn:
+            self.connect()
+        self.conn.execute('''DELETE FROM goods WHERE good_id = ?''', (good_id,))
+        self.conn.commit()
+
     def get_items_by_category(self, category_id):
         if not self.conn:
             self.connect()
         cursor = self.conn.cursor()
-        cursor.execute('''SELECT 
-                 p.guid||'.'||p.extension AS image, p.name AS text, p.guid, p.price, 0 as discount_price
-             FROM product p 
-             WHERE p.category = ? 
-             ORDER BY p.name
-         ''', (category_id,))
+        cursor.execute(self.ITEMS_BY_CATEGORY_SQL, (category_id,))
+        return cursor.fetchall()
+
+    def iter_items_by_category(self, category_id, batch_size=None):
+        """
+        Товары категории (как get_items_by_category) пачками по batch_size строк.
+        Курсор читается через fetchmany - результат не собирается в памяти целиком.
+        """
+        if not self.conn:
+            self.connect()
+        cursor = self.conn.cursor()
+        cursor.execute(self.ITEMS_BY_CATEGORY_SQL, (category_id,))
+        while True:
+            rows = cursor.fetchmany(batch_size or Settings.DB_FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            yield rows
+
+    def get_discounts(self):
+        """Все правила скидок (цены со скидкой считает DiscountEngine)"""
+        if not self.conn:
+            self.connect()
+        cursor = self.conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute('''
+            SELECT guid, name, category_id, items_id, from_date, to_date, from_time, to_time,
+                discount_fixed, discount_percent, discount_sum
+            FROM discount
+        ''')
+        return [dict(row) for row in cursor.fetchall()]
+
+    def search_products(self, query, limit=50):
+        """
+        Поиск товаров по началу слов в названии, описании и составе (FTS5).
+        Каждое слово запроса ищется как префикс, все слова должны встретиться в товаре.
+        :return: строки в формате get_items_by_category
+        """
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            return []
+        if not self.conn:
+            self.connect()
+        match = " ".join(f'"{word}"*' for word in words)
+        cursor = self.conn.cursor()
+        # Сначала совпадения в названии, затем во всех полях. Без ORDER BY rank:
+        # bm25 по всем совпадениям слишком дорог для поиска на каждое нажатие клавиши, а с LIMIT FTS5 останавливается рано
+        result = {}
+        for expression in (f"{{name}} : ({match})", match):
+            cursor.execute('''
+                SELECT p.guid||'.'||p.extension AS image, p.name AS text, p.guid, p.price, 0 as discount_price
+                FROM product_fts f
+                INNER JOIN product p ON p.guid = f.guid
+                WHERE product_fts MATCH ?
+                LIMIT ?
+            ''', (expression, limit))
+            for row in cursor.fetchall():
+                result.setdefault(row[2], row)
+            if len(result) >= limit:
+                break
+        return list(result.values())[:limit]
+
+    def get_video_playlist(self, day):
+        """Ролики режима ожидания, показываемые в день day (datetime.date): (video_id, extension)"""
+        if not self.conn:
+            self.connect()
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT video_id, extension FROM video
+            WHERE (date_from IS NULL OR date(date_from) <= ?) AND (date_to IS NULL OR date(date_to) >= ?)
+            ORDER BY video_id
+        ''', (day.isoformat(), day.isoformat()))
         return cursor.fetchall()
 
     def get_payments_metods(self):
@@ -128,7 +427,7 @@ class Database:
             SELECT 
                 p.guid, p.category, p.name, p.package, p.description, p.ingredients,
                 p.weight, p.calorie, p.shelf_life, p.warm_time, p.price, p.extension,
-                pk.name as package_name, 100 as discount_price, "Описание скидки" as discount_description
+                pk.name as package_name, NULL as discount_price, NULL as discount_description
             FROM product p 
             LEFT JOIN package pk ON p.package = pk.guid 
             WHERE p.guid = ?
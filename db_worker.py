@@ -0,0 +1,169 @@
+import threading
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from database import Database
+from instrumentation import span
+
+
+class DatabaseWorker(QObject):
+    """Выполняет запросы к БД в отдельном потоке со своим соединением sqlite"""
+    finished = pyqtSignal(int, object)  # id запроса, результат
+    batch = pyqtSignal(int, object)  # id запроса, очередная пачка строк потокового запроса
+    failed = pyqtSignal(int, str)  # id запроса, текст ошибки
+
+    def __init__(self, owner):
+        super().__init__()
+        self.owner = owner
+        self.db = None
+
+    @pyqtSlot(int, str, object)
+    def execute(self, request_id, method, args):
+        # Запрос отменен, пока стоял в очереди - не тратим на него время
+        if self.owner.is_cancelled(request_id):
+            return
+        # Соединение создается в потоке воркера: sqlite не разрешает использовать его из других потоков
+        if self.db is None:
+            self.db = Database()
+        try:
+            with span("db." + method):
+                result = getattr(self.db, method)(*args)
+        except Exception as e:
+            self.failed.emit(request_id, f"{method}: {e}")
+            return
+        self.finished.emit(request_id, result)
+
+    @pyqtSlot(int, str, object)
+    def stream(self, request_id, method, args):
+        """Потоковый запрос: метод Database - генератор пачек строк, каждая пачка сразу уходит в GUI-поток"""
+        if self.owner.is_cancelled(request_id):
+            return
+        if self.db is None:
+            self.db = Database()
+        count = 0
+        try:
+            with span("db." + method):
+                for rows in getattr(self.db, method)(*args):
+                    # Отмена проверяется между пачками: недочитанный курсор просто закрывается
+                    if self.owner.is_cancelled(request_id):
+                        return
+                    count += len(rows)
+                    self.batch.emit(request_id, rows)
+        except Exception as e:
+            self.failed.emit(request_id, f"{method}: {e}")
+            return
+        self.finished.emit(request_id, count)
+
+
+class AsyncDatabase(QObject):
+    """
+    Асинхронный доступ к БД для GUI-потока.
+    Запросы выполняются в DatabaseWorker, результат передается в callback в GUI-потоке.
+    Потоковые запросы (stream) передают результат пачками в on_batch по мере чтения курсора.
+    Запросы группируются по каналам: новый запрос в канале отменяет предыдущий,
+    чтобы повторное нажатие не приводило к отрисовке устаревших данных.
+    При ошибке запроса callback все равно вызывается - с пустым результатом, чтобы экран не остался
+    с заглушкой загрузки.
+    """
+    _submit = pyqtSignal(int, str, object)
+    _stream = pyqtSignal(int, str, object)
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._cancelled = set()
+        self._pending = {}  # id запроса -> (канал, callback, on_batch, результат при ошибке)
+        self._channels = {}  # канал -> id последнего запроса
+        self._next_id = 0
+
+        self.thread = QThread()
+        self.worker = DatabaseWorker(self)
+        self.worker.moveToThread(self.thread)
+        self._submit.connect(self.worker.execute)
+        self._stream.connect(self.worker.stream)
+        self.worker.batch.connect(self.on_batch)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.failed.connect(self.on_failed)
+        self.thread.start()
+
+    def request(self, channel, method, *args, callback=None, empty=None):
+        """
+        Ставит вызов метода Database в очередь воркера, возвращает id запроса.
+        empty - результат для callback, если запрос завершился ошибкой
+        """
+        request_id = self._register(channel, callback, empty=empty)
+        self._submit.emit(request_id, method, args)
+        return request_id
+
+    def stream(self, channel, method, *args, on_batch=None, callback=None):
+        """
+        Потоковый запрос: метод Database возвращает генератор пачек строк.
+        on_batch вызывается в GUI-потоке для каждой пачки, callback - в конце с числом строк
+        (None при ошибке)
+        """
+        request_id = self._register(channel, callback, on_batch)
+        self._stream.emit(request_id, method, args)
+        return request_id
+
+    def _register(self, channel, callback, on_batch=None, empty=None):
+        self.cancel(channel)
+        self._next_id += 1
+        request_id = self._next_id
+        self._pending[request_id] = (channel, callback, on_batch, empty)
+        self._channels[channel] = request_id
+        return request_id
+
+    def cancel(self, channel=None):
+        """Отменяет незавершенный запрос канала (или всех каналов, если канал не указан)"""
+        channels = list(self._channels) if channel is None else [channel]
+        for name in channels:
+            request_id = self._channels.pop(name, None)
+            if request_id is not None and self._pending.pop(request_id, None):
+                with self._lock:
+                    self._cancelled.add(request_id)
+
+    def is_cancelled(self, request_id):
+        with self._lock:
+            if request_id in self._cancelled:
+                self._cancelled.discard(request_id)
+                return True
+            return False
+
+    def on_finished(self, request_id, result):
+        pending = self._pop_pending(request_id)
+        if pending is None:
+            return
+        callback = pending[1]
+        if callback:
+            callback(result)
+
+    def on_batch(self, request_id, rows):
+        pending = self._pending.get(request_id)
+        # Пачки отмененного запроса, уже стоявшие в очереди событий, отбрасываются
+        if pending is not None and pending[2]:
+            pending[2](rows)
+
+    def on_failed(self, request_id, message):
+        print(f"Database worker error: {message}")
+        pending = self._pop_pending(request_id)
+        if pending is None:
+            return
+        callback, empty = pending[1], pending[3]
+        if callback:
+            callback(empty)
+
+    def _pop_pending(self, request_id):
+        pending = self._pending.pop(request_id, None)
+        if pending is None:
+            # Результат отмененного запроса - сбрасываем
+            with self._lock:
+                self._cancelled.discard(request_id)
+            return None
+        channel = pending[0]
+        if self._channels.get(channel) == request_id:
+            del self._channels[channel]
+        return pending
+
+    def stop(self):
+        self.cancel()
+        self.thread.quit()
+        self.thread.wait()
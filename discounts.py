@@ -0,0 +1,168 @@
+import bisect
+from datetime import datetime, timedelta
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from scheduler import get_scheduler
+
+
+class DiscountEngine(QObject):
+    """
+    Скидки из таблицы discount.
+    Правила один раз компилируются в индекс интервалов по товару и категории на несколько суток вперед,
+    эффективная цена находится бинарным поиском по индексу и кэшируется до ближайшей границы окна скидки.
+    """
+    changed = pyqtSignal()  # пересечена граница окна скидки - цены могли измениться
+
+    # На сколько суток вперед разворачиваются ежедневные окна скидок
+    HORIZON_DAYS = 2
+
+    def __init__(self, db, catalog=None):
+        super().__init__()
+        self.db = db
+        self.catalog = catalog
+        self.index = {}  # ("product"|"category", guid) -> (границы сегментов, правила на сегментах)
+        self.boundaries = []  # все границы окон в горизонте, по возрастанию
+        self.horizon_end = 0
+        self.cache = {}  # (guid товара, guid категории, цена) -> (цена со скидкой, описание)
+
+    def rebuild(self, now=None):
+        """Перечитывает правила из БД и компилирует индекс интервалов"""
+        now = now or datetime.now()
+        day_start = datetime(now.year, now.month, now.day)
+        horizon_end = day_start + timedelta(days=self.HORIZON_DAYS)
+
+        intervals = {}
+        for rule in self.db.get_discounts():
+            for start, end in self.expand_rule(rule, day_start, horizon_end):
+                if rule["items_id"]:
+                    intervals.setdefault(("product", rule["items_id"]), []).append((start, end, rule))
+                if rule["category_id"]:
+                    intervals.setdefault(("category", rule["category_id"]), []).append((start, end, rule))
+
+        index = {}
+        boundaries = set()
+        for key, key_intervals in intervals.items():
+            index[key] = self.build_segments(key_intervals)
+            boundaries.update(index[key][0])
+
+        self.index = index
+        self.boundaries = sorted(boundaries)
+        self.horizon_end = horizon_end.timestamp()
+        self.cache = {}
+        self.schedule(now.timestamp())
+
+    @staticmethod
+    def parse_time(value, default):
+        if not value:
+            return default
+        parts = [int(part) for part in value.split(":")]
+        return timedelta(hours=parts[0], minutes=parts[1] if len(parts) > 1 else 0,
+                         seconds=parts[2] if len(parts) > 2 else 0)
+
+    def expand_rule(self, rule, day_start, horizon_end):
+        """Разворачивает ежедневное окно скидки в абсолютные интервалы (timestamp) внутри горизонта"""
+        from_date = datetime.fromisoformat(rule["from_date"]) if rule["from_date"] else None
+        to_date = datetime.fromisoformat(rule["to_date"]) if rule["to_date"] else None
+        from_time = self.parse_time(rule["from_time"], timedelta(0))
+        to_time = self.parse_time(rule["to_time"], timedelta(days=1))
+
+        # Окно, начавшееся вчера, может переходить через полночь в горизонт
+        day = day_start - timedelta(days=1)
+        while day < horizon_end:
+            if (from_date is None or day >= from_date) and (to_date is None or day <= to_date):
+                start = day + from_time
+                end = day + to_time
+                if end <= start:
+                    end += timedelta(days=1)
+                if end > day_start and start < horizon_end:
+                    yield start.timestamp(), end.timestamp()
+            day += timedelta(days=1)
+
+    @staticmethod
+    def build_segments(intervals):
+        """Разбивает (возможно пересекающиеся) интервалы на непересекающиеся сегменты с набором действующих правил"""
+        points = sorted({point for start, end, rule in intervals for point in (start, end)})
+        rules = []
+        for segment_start in points:
+            rules.append([rule for start, end, rule in intervals if start <= segment_start < end])
+        return points, rules
+
+    def active_rules(self, key, moment):
+        segments = self.index.get(key)
+        if not segments:
+            return []
+        points, rules = segments
+        position = bisect.bisect_right(points, moment) - 1
+        if position < 0:
+            return []
+        return rules[position]
+
+    @staticmethod
+    def discounted_price(rule, price):
+        result = price
+        if rule["discount_fixed"]:
+            result = min(result, price - rule["discount_fixed"])
+        if rule["discount_percent"]:
+            result = min(result, price * (1 - rule["discount_percent"] / 100))
+        return max(0.0, round(result, 2))
+
+    def resolve(self, product_guid, category_guid, price, now=None):
+        """
+        Цена товара со скидкой на момент now
+        :return: (цена со скидкой, описание скидки) или (None, None), если скидки нет
+        """
+        if now is None:
+            cache_key = (product_guid, category_guid, price)
+            if cache_key not in self.cache:
+                self.cache[cache_key] = self.resolve(product_guid, category_guid, price, datetime.now())
+            return self.cache[cache_key]
+
+        moment = now.timestamp()
+        rules = list(self.active_rules(("product", product_guid), moment))
+        category = category_guid
+        while category:
+            rules.extend(self.active_rules(("category", category), moment))
+            category = self.catalog.get_parent_category(category) if self.catalog else None
+
+        best_price, description = None, None
+        for rule in rules:
+            rule_price = self.discounted_price(rule, price)
+            if rule_price < price and (best_price is None or rule_price < best_price):
+                best_price, description = rule_price, rule["name"]
+        return best_price, description
+
+    def apply_product(self, data):
+        """Заполняет discount_price и discount_description в данных товара (Database.get_product_by_id)"""
+        if data:
+            data["discount_price"], data["discount_description"] = self.resolve(
+                data["guid"], data["category"], data["price"])
+        return data
+
+    def apply_items(self, rows, category_guid=None, product_categories=None):
+        """
+        Пакетно проставляет цены со скидкой в список товаров (Database.get_items_by_category)
+        :param category_guid: категория всех товаров списка
+        :param product_categories: guid товара -> guid категории, если товары из разных категорий (поиск)
+        """
+        result = []
+        for image, text, guid, price, discount_price in rows:
+            category = category_guid if category_guid is not None else product_categories.get(guid)
+            discount_price, description = self.resolve(guid, category, price)
+            result.append((image, text, guid, price, discount_price or 0))
+        return result
+
+    def schedule(self, moment):
+        """Ставит в планировщик ближайшую границу окна скидки (или конец горизонта)"""
+        position = bisect.bisect_right(self.boundaries, moment)
+        next_boundary = self.boundaries[position] if position < len(self.boundaries) else self.horizon_end
+        next_boundary = min(next_boundary, self.horizon_end)
+        get_scheduler().schedule("discounts", next_boundary - moment + 0.001, self.on_boundary, exact=True)
+
+    def on_boundary(self):
+        now = datetime.now()
+        if now.timestamp() >= self.horizon_end:
+            self.rebuild(now)
+        else:
+            self.cache = {}
+            self.schedule(now.timestamp())
+        self.changed.emit()
@@ -0,0 +1,201 @@
+"""
+Режим ожидания киоска.
+Включается, когда главный экран простоял Settings.INACTIVITY_TIMEOUT секунд. Вместо прокрутки галереи
+анимацией на полной частоте (QPropertyAnimation, кадры по 16 мс) показывается одно из (Settings.IDLE_ATTRACT):
+
+    "gallery"   - галерея категорий медленно прокручивается шагами Settings.IDLE_FPS раз в секунду;
+    "slideshow" - слайды из Settings.IDLE_SLIDESHOW_PATH, уменьшенные под экран через кэш миниатюр;
+    "video"     - ролики из таблицы video (Settings.VIDEO_PATH), если доступен QtMultimedia.
+
+Кадры режима ставит общий планировщик, между ними приложение не просыпается. Инерция и анимации
+галереи останавливаются. Первое касание или нажатие клавиши выключает режим сразу в фильтре событий
+приложения, до того как событие дойдет до виджета. Касание по экрану-заставке поглощается, а в режиме
+"gallery" передается галерее - прокрутку можно начать тем же касанием.
+"""
+import datetime
+import os
+import time
+
+from PyQt5.QtCore import QObject, QEvent, QSize, QUrl, pyqtSignal
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtWidgets import QApplication
+
+from settings import Settings
+from scheduler import get_scheduler
+from thumbnail_cache import get_thumbnail_cache, ThumbnailCache
+
+try:
+    # QtMultimedia есть не во всех сборках PyQt5 и требует системных кодеков
+    from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+    from PyQt5.QtMultimediaWidgets import QVideoWidget
+except ImportError:
+    QMediaPlayer = None
+
+IDLE_FRAME = "idle.frame"
+
+GALLERY = "gallery"
+SLIDESHOW = "slideshow"
+VIDEO = "video"
+
+SLIDE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# События, которые выводят из режима ожидания
+WAKE_EVENTS = (QEvent.MouseButtonPress, QEvent.TouchBegin, QEvent.KeyPress)
+
+
+def resolve_path(path):
+    return os.path.join(Settings.BASE_DIR, path.replace("\\", "/"))
+
+
+class IdleMode(QObject):
+    """Режим ожидания главного экрана: вход по бездействию, выход по первому касанию"""
+    exited = pyqtSignal()
+
+    def __init__(self, gallery, attract_panel, db):
+        """
+        :param gallery: галерея категорий (ScrollPanel)
+        :param attract_panel: экран-заставка поверх окна (AttractPanel)
+        :param db: Database - плейлист роликов
+        """
+        super().__init__()
+        self.gallery = gallery
+        self.attract_panel = attract_panel
+        self.db = db
+        self.scheduler = get_scheduler()
+        self.active = False
+        self.mode = None
+        self.slides = []
+        self.slide_index = 0
+        self.playlist = []
+        self.video_index = 0
+        self.player = None
+        self.video_widget = None
+        self.started_at = None
+        self.cpu_started = None
+        # Итоги за все время работы: секунд в режиме ожидания и процессорного времени за них
+        self.idle_seconds = 0.0
+        self.idle_cpu = 0.0
+
+    def enter(self):
+        if self.active:
+            return
+        self.active = True
+        self.started_at = time.monotonic()
+        self.cpu_started = time.process_time()
+        # Необязательные таймеры галереи: инерция и анимация прокрутки
+        self.gallery.scroller.stop()
+        self.gallery.stop_auto_scroll()
+        QApplication.instance().installEventFilter(self)
+
+        mode = Settings.IDLE_ATTRACT
+        if mode == VIDEO and not self.start_video():
+            mode = SLIDESHOW
+        if mode == SLIDESHOW and not self.start_slideshow():
+            mode = GALLERY
+        if mode == GALLERY:
+            self.schedule_gallery_frame()
+        self.mode = mode
+        print(f"Режим ожидания: {mode}")
+
+    def exit(self):
+        if not self.active:
+            return
+        self.active = False
+        QApplication.instance().removeEventFilter(self)
+        self.scheduler.cancel(IDLE_FRAME)
+        if self.player is not None:
+            self.player.stop()
+        self.attract_panel.setVisible(False)
+        self.attract_panel.clear()
+
+        wall = time.monotonic() - self.started_at
+        cpu = time.process_time() - self.cpu_started
+        self.idle_seconds += wall
+        self.idle_cpu += cpu
+        print(f"Режим ожидания ({self.mode}): {wall:.0f} с, процессор {cpu:.2f} с ({self.cpu_share(cpu, wall):.1f}%), "
+              f"всего {self.idle_seconds:.0f} с, {self.cpu_share(self.idle_cpu, self.idle_seconds):.1f}%")
+        self.mode = None
+        self.exited.emit()
+
+    @staticmethod
+    def cpu_share(cpu, wall):
+        return cpu * 100 / wall if wall > 0 else 0.0
+
+    def eventFilter(self, obj, event):
+        if event.type() in WAKE_EVENTS:
+            swallow = self.attract_panel.isVisible()
+            self.exit()
+            return swallow
+        return False
+
+    # Галерея
+
+    def schedule_gallery_frame(self):
+        self.scheduler.schedule(IDLE_FRAME, 1 / Settings.IDLE_FPS, self.on_gallery_frame)
+
+    def on_gallery_frame(self):
+        # Если прокручивать нечего, кадров больше не будет до выхода из режима
+        if self.gallery.idle_scroll_step(Settings.IDLE_SCROLL_SPEED / Settings.IDLE_FPS):
+            self.schedule_gallery_frame()
+
+    # Слайды
+
+    def start_slideshow(self):
+        folder = resolve_path(Settings.IDLE_SLIDESHOW_PATH)
+        try:
+            names = sorted(name for name in os.listdir(folder) if name.lower().endswith(SLIDE_EXTENSIONS))
+        except OSError:
+            names = []
+        self.slides = [os.path.join(folder, name) for name in names]
+        if not self.slides:
+            return False
+        self.attract_panel.show_over_parent()
+        self.slide_index = 0
+        self.on_slide()
+        return True
+
+    def on_slide(self):
+        # Слайд уменьшается под экран один раз, дальше берется готовым из дискового кэша миниатюр
+        size = self.attract_panel.size()
+        image = get_thumbnail_cache().load(self.slides[self.slide_index], QSize(size.width(), size.height()),
+                                           ThumbnailCache.MODE_FIT)
+        if not image.isNull():
+            self.attract_panel.setPixmap(QPixmap.fromImage(image))
+        self.slide_index = (self.slide_index + 1) % len(self.slides)
+        if len(self.slides) > 1:
+            self.scheduler.schedule(IDLE_FRAME, Settings.IDLE_SLIDE_INTERVAL, self.on_slide)
+
+    # Видео
+
+    def start_video(self):
+        if QMediaPlayer is None:
+            print("Режим ожидания: QtMultimedia недоступен, ролики не показываются")
+            return False
+        folder = resolve_path(Settings.VIDEO_PATH)
+        self.playlist = [path for path in (os.path.join(folder, f"{video_id}.{extension}")
+                                           for video_id, extension in self.db.get_video_playlist(datetime.date.today()))
+                         if os.path.exists(path)]
+        if not self.playlist:
+            return False
+        if self.player is None:
+            self.video_widget = QVideoWidget(self.attract_panel)
+            self.player = QMediaPlayer(self)
+            self.player.setVideoOutput(self.video_widget)
+            self.player.setMuted(True)
+            self.player.mediaStatusChanged.connect(self.on_media_status)
+        self.attract_panel.show_over_parent()
+        self.video_widget.setGeometry(self.attract_panel.rect())
+        self.video_widget.setVisible(True)
+        self.video_index = 0
+        self.play_next()
+        return True
+
+    def play_next(self):
+        path = self.playlist[self.video_index]
+        self.video_index = (self.video_index + 1) % len(self.playlist)
+        self.player.setMedia(QMediaContent(QUrl.fromLocalFile(path)))
+        self.player.play()
+
+    def on_media_status(self, status):
+        if self.active and self.mode == VIDEO and status in (QMediaPlayer.EndOfMedia, QMediaPlayer.InvalidMedia):
+            self.play_next()
@@ -0,0 +1,127 @@
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+from thumbnail_cache import ThumbnailCache, get_thumbnail_cache
+from pixmap_cache import get_pixmap_cache
+from instrumentation import span
+
+
+class ImageLoadTask(QRunnable):
+    """Декодирование картинки в пуле потоков (через дисковый кэш миниатюр)"""
+
+    def __init__(self, loader, request_id, path, size, mode):
+        super().__init__()
+        self.loader = loader
+        self.request_id = request_id
+        self.path = path
+        self.size = size
+        self.mode = mode
+
+    def run(self):
+        if not self.loader.is_actual(self.request_id):
+            return
+        with span("image.load", self.path):
+            image = get_thumbnail_cache().load(self.path, self.size, self.mode)
+        self.loader.loaded.emit(self.request_id, image)
+
+
+class ImageLoader(QObject):
+    """
+    Асинхронная загрузка картинок в QLabel.
+    При попадании в кэш картинок она ставится сразу, иначе показывается заглушка,
+    а картинка декодируется в QThreadPool сразу в нужном размере и подставляется по готовности.
+    Запросы для уже удаленных виджетов и перезапрошенных меток отбрасываются.
+    """
+    loaded = pyqtSignal(int, QImage)
+
+    def __init__(self):
+        super().__init__()
+        self.pool = QThreadPool()
+        # Один поток оставляем GUI
+        self.pool.setMaxThreadCount(max(1, QThreadPool.globalInstance().maxThreadCount() - 1))
+        self.requests = {}  # id -> (метка, ключ кэша, задача)
+        self.label_requests = {}  # id(метки) -> id последнего запроса
+        self.placeholders = {}
+        self.next_id = 0
+        self.loaded.connect(self.on_loaded)
+
+    def request(self, label, path, size, mode=ThumbnailCache.MODE_HEIGHT, placeholder_size=None):
+        """Загружает картинку path размера size в label"""
+        cache = get_pixmap_cache()
+        key = cache.make_key(path, size, mode)
+        pixmap = cache.get(key)
+        self.cancel(label)
+        if pixmap is not None:
+            label.setPixmap(pixmap)
+            return
+
+        label.setPixmap(self.placeholder(placeholder_size or size))
+        self.next_id += 1
+        request_id = self.next_id
+        task = ImageLoadTask(self, request_id, path, size, mode)
+        if id(label) not in self.label_requests:
+            # Метка удалена (например, при перестроении списка в load_gallery_data) - запрос больше не нужен
+            label.destroyed.connect(lambda obj=None, label_id=id(label): self.cancel_by_id(label_id))
+        self.requests[request_id] = (label, key, task)
+        self.label_requests[id(label)] = request_id
+        self.pool.start(task)
+
+    def placeholder(self, size):
+        key = (size.width(), size.height())
+        if key not in self.placeholders:
+            pixmap = QPixmap(QSize(max(1, size.width()), max(1, size.height())))
+            pixmap.fill(Qt.darkGray)
+            self.placeholders[key] = pixmap
+        return self.placeholders[key]
+
+    def is_actual(self, request_id):
+        return request_id in self.requests
+
+    def cancel(self, label):
+        request_id = self.label_requests.get(id(label))
+        if request_id is not None:
+            self.drop(request_id)
+
+    def cancel_by_id(self, label_id):
+        request_id = self.label_requests.pop(label_id, None)
+        if request_id is not None:
+            self.drop(request_id)
+
+    def drop(self, request_id):
+        entry = self.requests.pop(request_id, None)
+        if entry and not sip.isdeleted(entry[2]):
+            # Задача еще в очереди пула - снимаем ее, не дожидаясь декодирования.
+            # Выполненную задачу пул удаляет сам
+            try:
+                self.pool.tryTake(entry[2])
+            except RuntimeError:
+                pass
+
+    def on_loaded(self, request_id, image):
+        entry = self.requests.pop(request_id, None)
+        if entry is None:
+            return
+        label, key, task = entry
+        if sip.isdeleted(label) or self.label_requests.get(id(label)) != request_id:
+            return
+        if image.isNull():
+            print(f"Ошибка загрузки изображения {key[0]}")
+            return
+        pixmap = QPixmap.fromImage(image)
+        get_pixmap_cache().insert(key, pixmap)
+        label.setPixmap(pixmap)
+
+    def wait(self):
+        self.pool.waitForDone()
+
+
+_image_loader = None
+
+
+def get_image_loader():
+    """Общий для всего приложения загрузчик картинок"""
+    global _image_loader
+    if _image_loader is None:
+        _image_loader = ImageLoader()
+    return _image_loader
@@ -0,0 +1,221 @@
+"""
+Замеры времени отклика интерфейса.
+Включаются флагом --instrument в main.py (Settings.INSTRUMENTATION_ENABLED), при выключенных замерах
+декоратор timed возвращает функцию без изменений, а span - общий пустой контекст.
+
+События пишутся в кольцевой буфер без блокировок: номер ячейки берется из itertools.count
+(next атомарен в CPython), запись в ячейку списка - одна операция, поэтому писать можно из любого потока
+(пул картинок, воркер БД). При закрытии приложения буфер выгружается в JSONL, сводку по файлу печатает
+
+    python instrumentation.py [instrumentation.jsonl]
+"""
+import itertools
+import json
+import sys
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+from PyQt5.QtCore import QObject, QEvent
+
+from settings import Settings
+
+# Виды событий
+SPAN = "span"  # длительность этапа (загрузка данных, картинки, запрос к БД, переход workflow)
+LATENCY = "latency"  # от касания до первой отрисовки нового экрана
+FRAME = "frame"  # интервал между кадрами инерционной прокрутки
+
+# Границы столбцов гистограммы, мс
+HISTOGRAM_BOUNDS = (1, 2, 4, 8, 16, 33, 66, 133, 266, 533, 1000)
+
+
+class Span:
+    def __init__(self, instrumentation, name, detail):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.detail = detail
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(SPAN, self.name, time.perf_counter() - self.started, self.detail)
+        return False
+
+
+class Instrumentation:
+    """Кольцевой буфер событий (время, вид, имя, длительность в секундах, подробность)"""
+
+    def __init__(self, size=None):
+        self.size = size or Settings.INSTRUMENTATION_BUFFER_SIZE
+        self.buffer = [None] * self.size
+        self.counter = itertools.count()
+        self.input_time = None
+        self.input_name = None
+
+    def record(self, kind, name, value, detail=None):
+        self.buffer[next(self.counter) % self.size] = (time.perf_counter(), kind, name, value, detail)
+
+    def span(self, name, detail=None):
+        return Span(self, name, detail)
+
+    def mark_input(self, name):
+        """Касание, результат которого ждем на экране"""
+        self.input_time = time.perf_counter()
+        self.input_name = name
+
+    def on_paint(self, widget_name):
+        """Первая отрисовка после касания закрывает замер задержки"""
+        if self.input_time is not None:
+            self.record(LATENCY, self.input_name, time.perf_counter() - self.input_time, widget_name)
+            self.input_time = None
+
+    def events(self):
+        """Снимок буфера по времени"""
+        return sorted((event for event in list(self.buffer) if event is not None), key=lambda event: event[0])
+
+    def export(self, path=None):
+        """Дописывает события в JSONL-файл"""
+        path = path or Settings.INSTRUMENTATION_PATH
+        events = self.events()
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                for moment, kind, name, value, detail in events:
+                    f.write(json.dumps({"t": round(moment, 6), "kind": kind, "name": name,
+                                        "ms": round(value * 1000, 3), "detail": detail}, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Не удалось выгрузить замеры: {e}")
+            return 0
+        return len(events)
+
+    def summary(self):
+        return summarize((kind, name, value * 1000) for moment, kind, name, value, detail in self.events())
+
+
+class PaintWatcher(QObject):
+    """Фильтр событий панелей: отмечает отрисовку для замера задержки касание - экран"""
+
+    def __init__(self, instrumentation):
+        super().__init__()
+        self.instrumentation = instrumentation
+
+    def watch(self, *widgets):
+        for widget in widgets:
+            widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            self.instrumentation.on_paint(type(obj).__name__)
+        return False
+
+
+def percentile(values, fraction):
+    """values отсортированы"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def summarize(samples):
+    """
+    :param samples: (вид, имя, миллисекунды)
+    :return: (вид, имя) -> {"count", "p50", "p90", "p99", "max", "histogram"}
+    """
+    groups = {}
+    for kind, name, value in samples:
+        groups.setdefault((kind, name), []).append(value)
+    result = {}
+    for key, values in sorted(groups.items()):
+        values.sort()
+        histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        for value in values:
+            histogram[next((i for i, bound in enumerate(HISTOGRAM_BOUNDS) if value <= bound), len(HISTOGRAM_BOUNDS))] += 1
+        result[key] = {
+            "count": len(values),
+            "p50": percentile(values, 0.5),
+            "p90": percentile(values, 0.9),
+            "p99": percentile(values, 0.99),
+            "max": values[-1],
+            "histogram": histogram,
+        }
+    return result
+
+
+def format_summary(summary, bar_width=30):
+    lines = []
+    labels = [f"<={bound}" for bound in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]}"]
+    for (kind, name), stats in summary.items():
+        lines.append(f"{kind} {name}: n={stats['count']} p50={stats['p50']:.2f} p90={stats['p90']:.2f} "
+                     f"p99={stats['p99']:.2f} max={stats['max']:.2f} мс")
+        peak = max(stats["histogram"])
+        for label, count in zip(labels, stats["histogram"]):
+            if count:
+                lines.append(f"    {label:>7} мс {'#' * max(1, count * bar_width // peak)} {count}")
+    return "\n".join(lines)
+
+
+_instrumentation = None
+
+
+def get_instrumentation():
+    """Общий буфер замеров или None, если замеры выключены"""
+    global _instrumentation
+    if _instrumentation is None and Settings.INSTRUMENTATION_ENABLED:
+        _instrumentation = Instrumentation()
+    return _instrumentation
+
+
+_NO_SPAN = nullcontext()
+
+
+def span(name, detail=None):
+    """Контекст замера длительности этапа (пустой, если замеры выключены)"""
+    instrumentation = get_instrumentation()
+    return instrumentation.span(name, detail) if instrumentation else _NO_SPAN
+
+
+def record(kind, name, value, detail=None):
+    instrumentation = get_instrumentation()
+    if instrumentation:
+        instrumentation.record(kind, name, value, detail)
+
+
+def mark_input(name):
+    instrumentation = get_instrumentation()
+    if instrumentation:
+        instrumentation.mark_input(name)
+
+
+def timed(name):
+    """Декоратор замера длительности; при выключенных замерах функция не оборачивается"""
+    def decorator(func):
+        if not Settings.INSTRUMENTATION_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_instrumentation().span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else Settings.INSTRUMENTATION_PATH
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            samples.append((event["kind"], event["name"], event["ms"]))
+    print(format_summary(summarize(samples)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import bisect
+
+
+class ItemIndex:
+    """
+    Индекс элементов галереи, строится один раз при загрузке данных:
+    guid -> запись и отсортированные по смещению границы элементов вдоль оси прокрутки.
+    Элемент под точкой касания находится одним бинарным поиском.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.guid_of = None
+        self.positions = {}  # guid -> номер элемента
+        self.starts = []
+        self.ends = []
+        self.next_start = 0  # смещение следующего добавляемого элемента
+        self.spacing = 0
+
+    def rebuild(self, records, guid_of, sizes, start=0, spacing=0):
+        """
+        :param records: записи элементов по порядку
+        :param guid_of: функция, возвращающая guid записи
+        :param sizes: размеры элементов вдоль оси прокрутки (по одному на запись)
+        :param start: смещение первого элемента
+        :param spacing: промежуток между элементами
+        """
+        self.records = records
+        self.guid_of = guid_of
+        self.positions = {guid_of(record): index for index, record in enumerate(records)}
+        self.starts = []
+        self.ends = []
+        self.next_start = start
+        self.spacing = spacing
+        self.add_extents(sizes)
+
+    def extend(self, records, sizes):
+        """Добавляет записи в конец (в тот же список, что был передан в rebuild)"""
+        first = len(self.records)
+        self.records.extend(records)
+        for index in range(first, len(self.records)):
+            self.positions[self.guid_of(self.records[index])] = index
+        self.add_extents(sizes)
+
+    def add_extents(self, sizes):
+        offset = self.next_start
+        for size in sizes:
+            self.starts.append(offset)
+            self.ends.append(offset + size)
+            offset += size + self.spacing
+        self.next_start = offset
+
+    def __len__(self):
+        return len(self.records)
+
+    def at(self, offset):
+        """Номер элемента, содержащего смещение offset, или None (промежуток, поля)"""
+        index = bisect.bisect_right(self.starts, offset) - 1
+        if index >= 0 and offset < self.ends[index]:
+            return index
+        return None
+
+    def range(self, first, last):
+        """Номера элементов, пересекающих отрезок [first, last)"""
+        return range(max(0, bisect.bisect_right(self.ends, first)), bisect.bisect_left(self.starts, last))
+
+    def extent(self, index):
+        return self.starts[index], self.ends[index]
+
+    def end(self):
+        """Конец последнего элемента"""
+        return self.ends[-1] if self.ends else 0
+
+    def index_of(self, guid):
+        return self.positions.get(guid)
+
+    def get(self, guid):
+        index = self.positions.get(guid)
+        return self.records[index] if index is not None else None
@@ -0,0 +1,185 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+import instrumentation
+
+
+class KineticScroller(QObject):
+    """
+    Кинетическая прокрутка (свайп с инерцией) по одной оси для ScrollPanel и VerticalScrollPanel.
+    Скорость интегрируется по реально прошедшему времени (монотонные часы), поэтому пропущенный кадр
+    не меняет физику прокрутки. Движения пальца копятся и применяются к полосе прокрутки раз в кадр.
+    step(dt) продвигает прокрутку на dt секунд без таймеров и часов - для проверки без экрана.
+    """
+    # Параметры по умолчанию, переопределяются аргументами конструктора
+    DECELERATION = 1000  # замедление инерции, пикселей/с²
+    MIN_VELOCITY = 10  # скорость, ниже которой инерция останавливается, пикселей/с
+    BOUNCE = 0.3  # доля скорости, сохраняемая при отскоке от края
+    VELOCITY_SMOOTHING = 0.7  # вес новой мгновенной скорости при сглаживании
+    CLICK_THRESHOLD = 10  # максимальное смещение для клика, пикселей
+    MAX_CLICK_TIME = None  # максимальная длительность клика, секунд (None - не ограничена)
+    FRAME_INTERVAL = 16  # миллисекунд
+    MAX_FRAME_TIME = 0.1  # ограничение шага после долгой паузы, секунд
+
+    def __init__(self, scrollbar, orientation=Qt.Vertical, clock=time.monotonic, **params):
+        """
+        :param scrollbar: объект с value()/setValue()/minimum()/maximum() (обычно QScrollBar)
+        :param clock: источник времени в секундах
+        :param params: переопределение параметров (deceleration=..., min_velocity=..., ...)
+        """
+        super().__init__()
+        self.scrollbar = scrollbar
+        self.orientation = orientation
+        self.clock = clock
+        for name, value in params.items():
+            if not hasattr(self, name.upper()):
+                raise ValueError(f"Неизвестный параметр прокрутки {name}")
+            setattr(self, name.upper(), value)
+
+        self.start_pos = None
+        self.start_time = None
+        self.last_coord = None
+        self.last_time = None
+        self.is_swiping = False
+        self.velocity = 0.0
+        self.pending_delta = 0.0  # смещение пальца, еще не примененное к полосе прокрутки
+        self.position = None  # дробная позиция прокрутки во время инерции
+        self.inertia = False
+        self.frame_time = None
+
+        self.frame_timer = QTimer()
+        self.frame_timer.setInterval(self.FRAME_INTERVAL)
+        self.frame_timer.timeout.connect(self.on_frame)
+
+    def coord(self, pos):
+        return pos.y() if self.orientation == Qt.Vertical else pos.x()
+
+    def press(self, pos):
+        """Начало касания: останавливает инерцию"""
+        self.stop()
+        self.start_pos = pos
+        self.start_time = self.clock()
+        self.last_coord = self.coord(pos)
+        self.last_time = self.start_time
+        self.is_swiping = False
+
+    def move(self, pos):
+        """Движение пальца. :return: True, если это свайп"""
+        if self.start_pos is None:
+            return False
+        now = self.clock()
+        if not self.is_swiping:
+            delta_x = abs(pos.x() - self.start_pos.x())
+            delta_y = abs(pos.y() - self.start_pos.y())
+            if delta_x <= self.CLICK_THRESHOLD and delta_y <= self.CLICK_THRESHOLD:
+                return False
+            self.is_swiping = True
+
+        coord = self.coord(pos)
+        delta = coord - self.last_coord
+        delta_time = now - self.last_time
+        if delta_time > 0:
+            instantaneous_velocity = delta / delta_time
+            self.velocity = (instantaneous_velocity * self.VELOCITY_SMOOTHING +
+                             self.velocity * (1 - self.VELOCITY_SMOOTHING))
+        self.pending_delta += delta
+        self.last_coord = coord
+        self.last_time = now
+        self.request_frame()
+        return True
+
+    def release(self, pos=None):
+        """
+        Окончание касания: запускает инерцию после свайпа
+        :return: True, если жест был кликом
+        """
+        if self.start_pos is None:
+            return False
+        start_pos = self.start_pos
+        duration = self.clock() - self.start_time
+        self.start_pos = None
+        if self.is_swiping:
+            self.is_swiping = False
+            if abs(self.velocity) > self.MIN_VELOCITY:
+                self.inertia = True
+                self.request_frame()
+            else:
+                self.velocity = 0.0
+            return False
+
+        if pos is not None and (abs(pos.x() - start_pos.x()) > self.CLICK_THRESHOLD or
+                                abs(pos.y() - start_pos.y()) > self.CLICK_THRESHOLD):
+            return False
+        return self.MAX_CLICK_TIME is None or duration <= self.MAX_CLICK_TIME
+
+    def stop(self):
+        """Останавливает инерцию (незавершенное смещение пальца применяется)"""
+        self.flush()
+        self.inertia = False
+        self.velocity = 0.0
+        self.position = None
+        self.frame_timer.stop()
+        self.frame_time = None
+
+    def is_active(self):
+        return self.inertia or self.pending_delta != 0
+
+    def request_frame(self):
+        if not self.frame_timer.isActive():
+            self.frame_time = self.clock()
+            self.frame_timer.start()
+
+    def on_frame(self):
+        now = self.clock()
+        dt = now - self.frame_time if self.frame_time is not None else 0.0
+        self.frame_time = now
+        if self.inertia:
+            instrumentation.record(instrumentation.FRAME, "scroll.inertia_frame", dt)
+        if not self.step(dt):
+            self.frame_timer.stop()
+            self.frame_time = None
+
+    def flush(self):
+        """Применяет накопленное смещение пальца к полосе прокрутки"""
+        if self.pending_delta:
+            value = self.scrollbar.value() - self.pending_delta
+            self.pending_delta = 0.0
+            self.scrollbar.setValue(int(round(value)))
+
+    def step(self, dt):
+        """
+        Продвигает прокрутку на dt секунд
+        :return: True, если прокрутка еще продолжается
+        """
+        self.flush()
+        if not self.inertia:
+            return False
+
+        dt = min(max(dt, 0.0), self.MAX_FRAME_TIME)
+        if self.position is None:
+            self.position = float(self.scrollbar.value())
+        elif int(round(self.position)) != self.scrollbar.value():
+            # Полосу прокрутки сдвинули снаружи - продолжаем от ее значения
+            self.position = float(self.scrollbar.value())
+
+        # Равнозамедленное движение: смещение точно для любого dt
+        speed = abs(self.velocity)
+        new_speed = max(0.0, speed - self.DECELERATION * dt)
+        sign = 1 if self.velocity > 0 else -1
+        self.position -= sign * (speed + new_speed) / 2 * dt
+        self.velocity = sign * new_speed
+
+        if self.position < self.scrollbar.minimum():
+            self.position = self.scrollbar.minimum()
+            self.velocity = -self.velocity * self.BOUNCE  # Отскок от границы
+        elif self.position > self.scrollbar.maximum():
+            self.position = self.scrollbar.maximum()
+            self.velocity = -self.velocity * self.BOUNCE
+        self.scrollbar.setValue(int(round(self.position)))
+
+        if abs(self.velocity) < self.MIN_VELOCITY:
+            self.inertia = False
+            self.velocity = 0.0
+            self.position = None
+            return False
+        return True
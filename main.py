@@ -1,10 +1,27 @@
-from MainWindow import MainWindow
+import time
+STARTED = time.perf_counter()
+
 import sys
 from PyQt5.QtWidgets import (QApplication)
+from settings import Settings
+import startup_profile
 
 if __name__ == '__main__':
+    # Замеры включаются до импорта виджетов: декораторы timed применяются при импорте модулей
+    if "--instrument" in sys.argv:
+        Settings.INSTRUMENTATION_ENABLED = True
+    if "--profile-startup" in sys.argv:
+        Settings.PROFILE_STARTUP = True
+    profile = startup_profile.begin(STARTED)
+    from MainWindow import MainWindow
+    startup_profile.phase("импорт модулей")
+
     app = QApplication(sys.argv)
+    startup_profile.phase("QApplication")
     mw = MainWindow()
+    if profile:
+        watcher = startup_profile.FirstPaintWatcher(profile, mw.galery)
     mw.showFullScreen()
     mw.setFixedHeight(mw.display_height)
+    startup_profile.phase("показ окна")
     app.exec_()
@@ -0,0 +1,108 @@
+import json
+import os
+
+from settings import Settings
+
+
+class NavigationEntry:
+    """Экран в истории переходов: шаг workflow, его параметр (guid), заголовок для навигационной строки и прокрутка"""
+
+    def __init__(self, step, guid=None, title="", scroll=0):
+        self.step = step
+        self.guid = guid
+        self.title = title
+        self.scroll = scroll
+
+    def matches(self, step, guid):
+        return self.step == step and self.guid == guid
+
+    def to_dict(self):
+        return {"step": self.step, "guid": self.guid, "title": self.title, "scroll": self.scroll}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["step"], data.get("guid"), data.get("title", ""), data.get("scroll", 0))
+
+
+class NavigationStack:
+    """
+    Стек экранов от главного до текущего. Назад - снятие верхнего экрана, домой - возврат к корню;
+    родительские категории не вычисляются заново, навигационная строка строится из заголовков записей.
+    Стек сохраняется в файл после каждого перехода и восстанавливается после аварийного перезапуска.
+    """
+
+    def __init__(self, root_step, root_title, path=None):
+        self.path = path or Settings.NAVIGATION_STATE_PATH
+        self.entries = [NavigationEntry(root_step, None, root_title)]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def top(self):
+        return self.entries[-1]
+
+    def root(self):
+        return self.entries[0]
+
+    def enter(self, step, guid, title):
+        """Переход на экран: повторный вход на текущий экран (возврат назад) не добавляет запись"""
+        if self.top().matches(step, guid):
+            self.top().title = title or self.top().title
+        else:
+            self.entries.append(NavigationEntry(step, guid, title))
+        return self.top()
+
+    def pop(self):
+        """Снимает текущий экран. :return: экран, на который возвращаемся, или None для корня"""
+        if len(self.entries) == 1:
+            return None
+        self.entries.pop()
+        return self.top()
+
+    def pop_to_root(self):
+        del self.entries[1:]
+        return self.root()
+
+    def truncate(self, length):
+        """Оставляет length нижних записей (не меньше корня)"""
+        del self.entries[max(1, length):]
+
+    def breadcrumbs(self):
+        return [entry.title for entry in self.entries]
+
+    def save(self):
+        """Записывает стек атомарно (временный файл + замена)"""
+        temp_name = self.path + ".tmp"
+        try:
+            with open(temp_name, "w", encoding="utf-8") as f:
+                json.dump([entry.to_dict() for entry in self.entries], f, ensure_ascii=False)
+            os.replace(temp_name, self.path)
+        except OSError as e:
+            print(f"Не удалось сохранить историю переходов: {e}")
+
+    def load(self):
+        """
+        Читает стек, сохраненный до аварийного завершения
+        :return: True, если стек восстановлен
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = [NavigationEntry.from_dict(data) for data in json.load(f)]
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"История переходов повреждена: {e}")
+            return False
+        if not entries or not entries[0].matches(self.root().step, None):
+            return False
+        self.entries = entries
+        return True
+
+    def discard(self):
+        """Удаляет сохраненный стек (штатное завершение)"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Не удалось удалить историю переходов: {e}")
@@ -3,10 +3,10 @@ import sys
 from PyQt5.QtWidgets import (QGridLayout, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QWidget, QScrollArea, QFrame,
                              QApplication, QSizePolicy)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QSize
+from PyQt5.QtCore import Qt, pyqtSignal, QSize
 from PyQt5.QtGui import QPixmap, QFont, QIcon
 import settings
-from styles import STYLES
+from scheduler import get_scheduler, INACTIVITY
 
 
 class PaymentMetods(QWidget):
@@ -16,11 +16,8 @@ class PaymentMetods(QWidget):
         super().__init__()
         self.price = None
         self.discount_price = None
-        self.inactivity_timer = QTimer()
-        self.inactivity_timer.setSingleShot(True)
-        self.inactivity_timer.timeout.connect(self.on_inactivity_timeout)
+        self.scheduler = get_scheduler()
         self.result_value = None  # Для хранения возвращаемого значения
-        self.setStyleSheet(STYLES)
         self.data = data
         self.setup_ui()
         self.remaining_time = 0
@@ -134,20 +131,22 @@ class PaymentMetods(QWidget):
             return QIcon()
 
     def setup_inactivity_timer(self):
+        """Обратный отсчет до закрытия: срок INACTIVITY в общем планировщике каждую секунду (только у показанной панели)"""
         self.remaining_time = settings.Settings.INACTIVITY_TIMEOUT
-        self.inactivity_timer.start(1000)
+        if not self.isHidden():
+            self.scheduler.schedule(INACTIVITY, 1, self.on_inactivity_timeout)
 
     def stop_inactivity_timer(self):
-        self.inactivity_timer.stop()
+        self.scheduler.cancel(INACTIVITY, self.on_inactivity_timeout)
 
     def on_inactivity_timeout(self):
         self.remaining_time = self.remaining_time - 1
         self.remaining_time_label.setText(f"Окно закроется через {self.remaining_time} сек.")
-        self.inactivity_timer.start(1000)
         if self.remaining_time == 0:
             self.result_value = None
             self.closed_with_result.emit(None)
-            self.stop_inactivity_timer()
+        else:
+            self.scheduler.schedule(INACTIVITY, 1, self.on_inactivity_timeout)
 
     def select_payment_metod(self, metod_id):
         print(metod_id)
@@ -0,0 +1,123 @@
+from collections import OrderedDict, Counter
+from PyQt5.QtGui import QPixmap
+
+from settings import Settings
+from thumbnail_cache import ThumbnailCache, get_thumbnail_cache
+
+
+class PixmapCache:
+    """
+    Общий кэш готовых к отрисовке QPixmap в памяти.
+    Ключ - (путь к картинке, размер, режим масштабирования). Объем ограничен бюджетом в байтах,
+    при превышении вытесняются давно не использованные картинки (LRU), кроме закрепленных (иконки панелей).
+    """
+
+    def __init__(self, budget=None):
+        self.budget = budget or Settings.PIXMAP_CACHE_BUDGET
+        self.entries = OrderedDict()  # ключ -> (QPixmap, размер в байтах)
+        self.pinned = Counter()  # ключ -> число закреплений (одну картинку могут закрепить несколько виджетов)
+        self.total_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(path, size, mode):
+        width = 0 if mode == ThumbnailCache.MODE_HEIGHT else size.width()
+        return path, width, size.height(), mode
+
+    @staticmethod
+    def pixmap_cost(pixmap):
+        return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def insert(self, key, pixmap, pin=False):
+        previous = self.entries.pop(key, None)
+        if previous:
+            self.total_size -= previous[1]
+        cost = self.pixmap_cost(pixmap)
+        self.entries[key] = (pixmap, cost)
+        self.total_size += cost
+        if pin:
+            self.pinned[key] += 1
+        self.evict()
+
+    def evict(self):
+        if self.total_size <= self.budget:
+            return
+        for key in list(self.entries):
+            if self.total_size <= self.budget:
+                break
+            if key in self.pinned:
+                continue
+            pixmap, cost = self.entries.pop(key)
+            self.total_size -= cost
+            self.evictions += 1
+
+    def load(self, path, size, mode=ThumbnailCache.MODE_HEIGHT, pin=False):
+        """
+        QPixmap картинки path, уменьшенной до size (QSize).
+        При промахе берется из дискового кэша миниатюр. Пустой QPixmap, если картинку прочитать не удалось.
+        """
+        key = self.make_key(path, size, mode)
+        pixmap = self.get(key)
+        if pixmap is not None:
+            if pin:
+                self.pinned[key] += 1
+            return pixmap
+        image = get_thumbnail_cache().load(path, size, mode)
+        pixmap = QPixmap.fromImage(image)
+        if not pixmap.isNull():
+            self.insert(key, pixmap, pin)
+        return pixmap
+
+    def pin(self, path, size, mode=ThumbnailCache.MODE_HEIGHT):
+        """Закрепляет картинку в кэше (загружая ее при необходимости)"""
+        return self.load(path, size, mode, pin=True)
+
+    def unpin(self, path, size, mode=ThumbnailCache.MODE_HEIGHT):
+        """Снимает одно закрепление; картинку можно вытеснить, когда сняты все"""
+        key = self.make_key(path, size, mode)
+        if self.pinned[key] > 1:
+            self.pinned[key] -= 1
+        else:
+            self.pinned.pop(key, None)
+        self.evict()
+
+    def clear(self):
+        """Сбрасывает все картинки, кроме закрепленных"""
+        for key in list(self.entries):
+            if key not in self.pinned:
+                self.total_size -= self.entries.pop(key)[1]
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "pinned": len(self.pinned),
+            "bytes": self.total_size,
+            "budget": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
+
+
+_pixmap_cache = None
+
+
+def get_pixmap_cache():
+    """Общий для всего приложения экземпляр кэша картинок"""
+    global _pixmap_cache
+    if _pixmap_cache is None:
+        _pixmap_cache = PixmapCache()
+    return _pixmap_cache
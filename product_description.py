@@ -3,16 +3,17 @@ import sys
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QWidget, QScrollArea, QFrame,
                              QApplication, QSizePolicy)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QSize
+from PyQt5.QtCore import Qt, pyqtSignal, QSize
 from PyQt5.QtGui import QPixmap, QFont, QIcon
 import settings
-from styles import STYLES
+from scheduler import get_scheduler, INACTIVITY
+from thumbnail_cache import ThumbnailCache
+from image_loader import get_image_loader
 
 class ProductDetails(QWidget):
     def __init__(self, text: str):
         super().__init__()
         self.text = text
-        self.setStyleSheet(STYLES)
         self.setup_ui()
 
     def setup_ui(self):
@@ -34,18 +35,22 @@ class ProductDetails(QWidget):
 class ProductImage(QLabel):
     def LoadImage (self, image_path):
         if os.path.exists(image_path):
-            pixmap = QPixmap(image_path)
             # Увеличиваем размер изображения для полноэкранного режима
             screen_size = QApplication.primaryScreen().availableSize()
-            image_size = min(400, screen_size.height() // 2)
-            pixmap = pixmap.scaled(image_size, image_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            image_size = self.image_size_for_screen(screen_size.height())
             self.setFixedSize(image_size, image_size)
-            self.setPixmap(pixmap)
+            get_image_loader().request(self, image_path, QSize(image_size, image_size), ThumbnailCache.MODE_FIT)
         else:
+            get_image_loader().cancel(self)
             self.setText("Нет изображения")
             self.setAlignment(Qt.AlignCenter)
             self.setFixedSize(400, 400)
 
+    @staticmethod
+    def image_size_for_screen(screen_height):
+        """Сторона квадрата под картинку товара при высоте экрана screen_height"""
+        return min(400, screen_height // 2)
+
     def __init__(self):
         super().__init__()
         image_path = "no_foto.jpg"
@@ -58,11 +63,8 @@ class ProductDescription(QWidget):
         super().__init__()
         self.price = None
         self.discount_price = None
-        self.inactivity_timer = QTimer()
-        self.inactivity_timer.setSingleShot(True)
-        self.inactivity_timer.timeout.connect(self.on_inactivity_timeout)
+        self.scheduler = get_scheduler()
         self.result_value = None  # Для хранения возвращаемого значения
-        self.setStyleSheet(STYLES)
         self.setup_ui()
         self.setup_inactivity_timer()
     def setup_ui(self):
@@ -154,6 +156,32 @@ class ProductDescription(QWidget):
 
         self.setLayout(self.main_layout)
 
+    def show_placeholder(self):
+        """Очистка карточки на время загрузки данных товара"""
+        self.description_label.setText("Загрузка...")
+        self.ingradients_label.clear()
+        self.description_weigth.label.clear()
+        self.description_calory.label.clear()
+        self.description_shelf_life.label.clear()
+        self.description_warm_time.label.clear()
+        self.discount_label.setVisible(False)
+        self.discount_price_button.setVisible(False)
+        self.price_button.setText("")
+        self.price = None
+        self.discount_price = None
+
+    def show_sold_out(self):
+        """Нет ни одной годной единицы товара - покупка невозможна"""
+        self.discount_label.setText("К сожалению, этот товар закончился")
+        self.discount_label.setVisible(True)
+        self.discount_price_button.setVisible(False)
+        self.price_button.setVisible(False)
+
+    def show_unavailable(self):
+        """Данные товара загрузить не удалось - заглушка загрузки заменяется сообщением, покупка невозможна"""
+        self.description_label.setText("Не удалось загрузить описание товара")
+        self.price_button.setVisible(False)
+
     def load_data(self, data):
         self.description_label.setText(data['description'])
         self.ingradients_label.setText(data['ingredients'])
@@ -174,6 +202,7 @@ class ProductDescription(QWidget):
         else:
             self.discount_label.setVisible(False)
             self.discount_price_button.setVisible(False)
+        self.price_button.setVisible(True)
         self.price = data['price']
         self.discount_price = data['discount_price']
 
@@ -217,38 +246,35 @@ class ProductDescription(QWidget):
         return ""
 
     def setup_inactivity_timer(self):
-        self.inactivity_timer.start(settings.Settings.INACTIVITY_TIMEOUT * 1000)
+        self.reset_inactivity_timer()
 
     def reset_inactivity_timer(self):
-        self.inactivity_timer.stop()
-        self.inactivity_timer.start(settings.Settings.INACTIVITY_TIMEOUT * 1000)
+        # Срок бездействия в общем планировщике ставит только показанная панель
+        if not self.isHidden():
+            self.scheduler.schedule(INACTIVITY, settings.Settings.INACTIVITY_TIMEOUT, self.on_inactivity_timeout)
 
     def stop_inactivity_timer(self):
-        self.inactivity_timer.stop()
+        self.scheduler.cancel(INACTIVITY, self.on_inactivity_timeout)
 
     def on_inactivity_timeout(self):
         self.result_value = None
         self.closed_with_result.emit(self.result_value)
-        #self.reject()
 
     def buy_with_discount(self):
         self.stop_inactivity_timer()
         self.result_value = self.discount_price
         self.closed_with_result.emit(self.result_value)
-        #self.accept()
 
     def buy_normal(self):
         self.stop_inactivity_timer()
         # Возвращаем обычную цену
         self.result_value = self.price
         self.closed_with_result.emit(self.result_value)
-        #self.accept()
 
     def close_window(self):
         # При закрытии через кнопку "Вернуться в меню" возвращаем None
         self.result_value = None
         self.closed_with_result.emit(self.result_value)
-        self.reject()
 
     def get_result(self):
         """Метод для получения результата после закрытия окна"""
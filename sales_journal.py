@@ -0,0 +1,169 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from database import Database
+from settings import Settings
+
+
+class SalesJournal:
+    """
+    Журнал продаж с групповым коммитом.
+    record() только дописывает строку в spool-файл (без fsync) и ставит запись в очередь;
+    запись в БД (WAL) выполняет отдельный поток пачками не реже, чем раз в flush_interval.
+    Пачка, которую не удалось записать (например, БД заблокирована или соединение не открылось), повторяется
+    с растущей паузой до Settings.SALES_RETRY_MAX_INTERVAL; spool-файл очищается, когда все записи из него попали в БД.
+    Записи, не успевшие попасть в БД до аварийного завершения, дописываются из spool-файла при следующем запуске.
+    """
+
+    COLUMNS = ("sale_id", "product_id", "good_id", "price", "discount", "payment_method",
+               "started_at", "payment_started_at", "paid_at")
+
+    def __init__(self, spool_path=None, flush_interval=None, batch_size=None):
+        self.spool_path = spool_path or Settings.SALES_SPOOL_PATH
+        self.flush_interval = flush_interval or Settings.SALES_FLUSH_INTERVAL
+        self.batch_size = batch_size or Settings.SALES_BATCH_SIZE
+        self.queue = queue.Queue()
+        self.spool_lock = threading.Lock()
+        self.spool = None
+        self.thread = None
+        self.stopping = threading.Event()
+        self.flush_failed = False
+
+    def start(self):
+        self.replay()
+        self.spool = open(self.spool_path, "a", encoding="utf-8")
+        self.thread = threading.Thread(target=self.run, name="SalesJournal", daemon=True)
+        self.thread.start()
+
+    def replay(self):
+        """Ставит в очередь записи, оставшиеся в spool-файле после предыдущего запуска"""
+        if not os.path.exists(self.spool_path):
+            return
+        with open(self.spool_path, encoding="utf-8") as spool:
+            for line in spool:
+                try:
+                    self.queue.put(json.loads(line))
+                except ValueError:
+                    # Последняя строка могла быть записана не полностью
+                    print(f"Sales journal: skipped damaged spool entry {line!r}")
+
+    def record(self, product_id, good_id, price, discount, payment_method, started_at=None, payment_started_at=None):
+        """Регистрирует продажу, возвращает ее sale_id. Не ждет записи на диск."""
+        sale = {
+            "sale_id": str(uuid.uuid4()),
+            "product_id": product_id,
+            "good_id": good_id,
+            "price": price,
+            "discount": discount or 0,
+            "payment_method": payment_method,
+            "started_at": started_at,
+            "payment_started_at": payment_started_at,
+            "paid_at": time.time(),
+        }
+        with self.spool_lock:
+            self.spool.write(json.dumps(sale, ensure_ascii=False) + "\n")
+            self.spool.flush()
+            self.queue.put(sale)
+        return sale["sale_id"]
+
+    def run(self):
+        db = self.connect()
+        retry = []  # пачка, не записанная из-за ошибки
+        retry_interval = self.flush_interval
+        while not (self.stopping.is_set() and self.queue.empty() and not retry):
+            if retry:
+                # Пауза перед повтором (остановка ее прерывает), к пачке добавляется то, что уже в очереди
+                self.stopping.wait(retry_interval)
+                batch = retry + self.take(self.batch_size - len(retry))
+            else:
+                try:
+                    batch = [self.queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    continue
+                # Добираем пачку до batch_size, но не дольше flush_interval от первой записи
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size and not self.stopping.is_set():
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+            if db is None:
+                db = self.connect()
+            if db is not None and self.flush(db.conn, batch):
+                retry = []
+                retry_interval = self.flush_interval
+            elif self.stopping.is_set():
+                # Записи остаются в spool-файле и будут дописаны при следующем запуске
+                break
+            else:
+                retry = batch
+                retry_interval = min(retry_interval * 2, Settings.SALES_RETRY_MAX_INTERVAL)
+        if db is not None:
+            conn = db.conn
+            db.conn = None
+            conn.close()
+
+    def connect(self):
+        """Собственное соединение потока записи или None, если БД сейчас недоступна (run повторит позже)"""
+        # Database печатает ошибку открытия сама и оставляет conn пустым
+        db = Database()
+        conn = db.conn
+        if conn is not None:
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                return db
+            except sqlite3.Error as e:
+                print(f"Sales journal connect error: {e}")
+                db.conn = None
+                conn.close()
+        self.flush_failed = True
+        return None
+
+    def take(self, count):
+        """До count записей, уже стоящих в очереди (без ожидания)"""
+        batch = []
+        while len(batch) < count:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self, conn, batch):
+        """:return: True, если пачка записана в БД"""
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO sale ({', '.join(self.COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(self.COLUMNS))}) "
+                    f"ON CONFLICT (sale_id) DO NOTHING",
+                    [tuple(sale.get(column) for column in self.COLUMNS) for sale in batch])
+        except Exception as e:
+            # Пачка остается в spool-файле, run повторит ее позже
+            print(f"Sales journal flush error: {e}")
+            self.flush_failed = True
+            return False
+        self.flush_failed = False
+        with self.spool_lock:
+            # Все, что было в spool-файле, уже в БД - его можно очистить
+            if self.queue.empty():
+                self.spool.truncate(0)
+        return True
+
+    def stop(self):
+        """Сбрасывает оставшиеся записи и останавливает поток записи"""
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+        self.spool.close()
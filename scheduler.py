@@ -0,0 +1,141 @@
+import heapq
+import itertools
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+
+from settings import Settings
+import instrumentation
+
+# Срок бездействия показанного экрана - один на все приложение: ждет только экран, который сейчас виден
+INACTIVITY = "inactivity"
+
+
+class Scheduler(QObject):
+    """
+    Единый планировщик отложенных вызовов приложения (бездействие, обратный отсчет оплаты, автопрокрутка,
+    границы окон скидок).
+    Сроки хранятся в одной куче, QTimer взводится только на ближайший; сроки, наступающие в пределах
+    Settings.SCHEDULER_COALESCE секунд от него, выполняются в то же пробуждение. Точные сроки (exact=True) раньше
+    времени не выполняются: для них таймер взводится отдельно. Когда сроков нет, таймер остановлен
+    и приложение не просыпается.
+    У каждого срока есть ключ: повторный schedule с тем же ключом переносит срок, cancel - отменяет.
+    Вычеркнутые сроки остаются в куче и пропускаются при извлечении.
+    """
+    MAX_TIMER_INTERVAL = 24 * 3600 * 1000  # QTimer ограничен int32 миллисекунд - длинные сроки перевзводятся
+
+    def __init__(self, clock=time.monotonic, coalesce=None, trace=None):
+        super().__init__()
+        self.clock = clock
+        self.coalesce = Settings.SCHEDULER_COALESCE if coalesce is None else coalesce
+        self.trace = Settings.SCHEDULER_TRACE if trace is None else trace
+        self.heap = []  # (срок, номер, ключ)
+        self.entries = {}  # ключ -> (срок, номер, callback, точный срок)
+        self.counter = itertools.count()
+        self.armed_deadline = None
+        self.wakeups = 0
+        self.fired = 0
+
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timer)
+
+    def schedule(self, key, delay, callback, exact=False):
+        """
+        Вызвать callback через delay секунд (срок с тем же ключом переносится).
+        exact - не выполнять раньше срока вместе с соседними (границы, которые callback сверяет с часами)
+        """
+        deadline = self.clock() + max(0.0, delay)
+        number = next(self.counter)
+        self.entries[key] = (deadline, number, callback, exact)
+        heapq.heappush(self.heap, (deadline, number, key))
+        if self.trace:
+            print(f"Планировщик: {key} через {delay:.3f} с")
+        self.compact()
+        self.arm()
+
+    def cancel(self, key, callback=None):
+        """Отменяет срок (если указан callback - только срок с этим callback)"""
+        entry = self.entries.get(key)
+        if entry is not None and (callback is None or entry[2] == callback):
+            del self.entries[key]
+            if self.trace:
+                print(f"Планировщик: {key} отменен")
+            self.arm()
+
+    def is_scheduled(self, key):
+        return key in self.entries
+
+    def remaining(self, key):
+        """Секунд до срока или None"""
+        entry = self.entries.get(key)
+        return max(0.0, entry[0] - self.clock()) if entry else None
+
+    def is_live(self, item):
+        entry = self.entries.get(item[2])
+        return entry is not None and entry[1] == item[1]
+
+    def compact(self):
+        """Перестраивает кучу, когда вычеркнутых сроков в ней заметно больше действующих"""
+        if len(self.heap) > 2 * len(self.entries) + 16:
+            self.heap = [item for item in self.heap if self.is_live(item)]
+            heapq.heapify(self.heap)
+
+    def next_deadline(self):
+        while self.heap and not self.is_live(self.heap[0]):
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def arm(self):
+        """Взводит таймер на ближайший срок (или останавливает, если сроков нет)"""
+        deadline = self.next_deadline()
+        if deadline == self.armed_deadline and (deadline is None or self.timer.isActive()):
+            return
+        self.armed_deadline = deadline
+        if deadline is None:
+            self.timer.stop()
+            return
+        delay = int((deadline - self.clock()) * 1000) + 1
+        self.timer.start(max(0, min(delay, self.MAX_TIMER_INTERVAL)))
+
+    def on_timer(self):
+        self.wakeups += 1
+        self.armed_deadline = None
+        now = self.clock()
+        due = []
+        early = []
+        while self.heap and self.heap[0][0] <= now + self.coalesce:
+            item = heapq.heappop(self.heap)
+            deadline, number, key = item
+            entry = self.entries.get(key)
+            if entry is None or entry[1] != number:
+                continue
+            if entry[3] and deadline > now:
+                # Точный срок еще не наступил - остается в куче до своего пробуждения
+                early.append(item)
+                continue
+            del self.entries[key]
+            due.append((deadline, key, entry[2]))
+        for item in early:
+            heapq.heappush(self.heap, item)
+        try:
+            for deadline, key, callback in due:
+                # callback может заново запланировать этот или другие сроки
+                self.fired += 1
+                instrumentation.record(instrumentation.SPAN, "scheduler.lateness", max(0.0, now - deadline), key)
+                if self.trace:
+                    print(f"Планировщик: {key} выполнен, опоздание {(now - deadline) * 1000:.1f} мс")
+                callback()
+        finally:
+            self.arm()
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    """Общий для всего приложения планировщик"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler
@@ -0,0 +1,67 @@
+import sys
+from collections import OrderedDict
+
+from settings import Settings
+
+
+class ScreenState:
+    """Содержимое построенного экрана (позиция прокрутки хранится в истории переходов)"""
+
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size
+
+
+class ScreenCache:
+    """
+    LRU-кэш построенных экранов по ключу (тип экрана, guid).
+    Объем ограничен бюджетом в байтах (оценка по размеру данных экрана).
+    Сбрасывается при изменении каталога, наличия или цен.
+    """
+
+    def __init__(self, budget=None):
+        self.budget = budget or Settings.SCREEN_CACHE_BUDGET
+        self.entries = OrderedDict()  # (тип экрана, guid) -> ScreenState
+        self.total_size = 0
+
+    @staticmethod
+    def estimate_size(data):
+        """Примерный объем данных экрана (список записей, словарь с items или словарь товара)"""
+        if isinstance(data, dict) and "items" in data:
+            data = data["items"]
+        values = data.values() if isinstance(data, dict) else data
+        size = sys.getsizeof(data)
+        for value in values:
+            size += sys.getsizeof(value)
+            if isinstance(value, (tuple, list)):
+                size += sum(sys.getsizeof(field) for field in value)
+            elif isinstance(value, dict):
+                size += sum(sys.getsizeof(field) for field in value.values())
+        return size
+
+    def get(self, screen, guid):
+        state = self.entries.get((screen, guid))
+        if state is not None:
+            self.entries.move_to_end((screen, guid))
+        return state
+
+    def put(self, screen, guid, data):
+        key = (screen, guid)
+        previous = self.entries.pop(key, None)
+        if previous:
+            self.total_size -= previous.size
+        state = ScreenState(data, self.estimate_size(data))
+        self.entries[key] = state
+        self.total_size += state.size
+        while self.total_size > self.budget and len(self.entries) > 1:
+            evicted_key, evicted = self.entries.popitem(last=False)
+            self.total_size -= evicted.size
+        return state
+
+    def invalidate(self, screen=None):
+        """Сбрасывает экраны типа screen (или все)"""
+        for key in [key for key in self.entries if screen is None or key[0] == screen]:
+            self.total_size -= self.entries.pop(key).size
+
+    def clear(self):
+        self.invalidate()
@@ -1,27 +1,49 @@
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QLabel, QScrollArea,
-                             QSizePolicy, QScroller, QScrollerProperties, QMessageBox)
+                             QSizePolicy, QScroller, QScrollerProperties, QMessageBox,
+                             QGraphicsOpacityEffect)
 from PyQt5.QtGui import QPixmap, QMouseEvent, QKeyEvent, QPainter, QIcon, QFont
 from PyQt5.QtCore import Qt, QSize, pyqtSignal, QEvent, QTimer, QPropertyAnimation, QEasingCurve
 from PyQt5 import QtCore, QtWidgets
 
-from styles import STYLES
 from settings import Settings
-import time
 from visual_elements import ClickableLabel
+from thumbnail_cache import ThumbnailCache
+from image_loader import get_image_loader
+from kinetic_scroller import KineticScroller
+from item_index import ItemIndex
+from instrumentation import timed
+from scheduler import get_scheduler, INACTIVITY
+from itertools import repeat
 
 class ScrollPanel(QWidget):
+    """
+    Горизонтальная галерея категорий.
+    Элементы раскладываются по известному фиксированному размеру, создаются и загружают картинки
+    только элементы видимой области (плюс OVERSCAN с каждой стороны); ушедшие из нее элементы
+    переиспользуются (GalleryItemWidget.bind).
+    """
     gallery_data = {}
     root_menu = True
     item_clicked = pyqtSignal(str, dict)  # guid, item_data
+    idle_requested = pyqtSignal()  # бездействие в корневом меню
+
+    CONTENT_MARGIN = 10
+    ITEM_SPACING = 10
+    OVERSCAN = 1  # элементов сверх видимых
 
     def __init__(self):
         super().__init__()
         self.settings = Settings()
-        self.setStyleSheet(STYLES)
+        self.items = []
+        self.index = ItemIndex()
+        self.item_size = self.calculate_item_size()
+        self.widgets = {}  # номер элемента -> GalleryItemWidget
+        self.free_widgets = []
+        self.pending_scroll = None
+        self.idle_direction = 1  # направление прокрутки режима ожидания
         self.setup_ui()
         self.setup_swipe_gestures()
-        self.setup_animation()
         self.setup_inactivity_timer()
 
     def setup_ui(self):
@@ -36,70 +58,58 @@ class ScrollPanel(QWidget):
         self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.scroll_area.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
-        # Создаем контент для скролла
+        # Создаем контент для скролла. Элементы размещаются вручную (update_visible_items), без layout
         self.scroll_content = QWidget()
-        self.scroll_layout = QHBoxLayout(self.scroll_content)
-        self.scroll_layout.setContentsMargins(10, 10, 10, 10)
-        self.scroll_layout.setSpacing(10)
+        self.scroll_content.installEventFilter(self)
 
         # Устанавливаем контент в скролл
         self.scroll_area.setWidget(self.scroll_content)
 
         # Добавляем скролл в основной layout
         self.gallery_layout.addWidget(self.scroll_area)
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self.update_visible_items)
 
 
     def setup_inactivity_timer(self):
-        """Настройка таймера бездействия для автоматической прокрутки"""
-        self.inactivity_timer = QTimer()
-        self.inactivity_timer.setSingleShot(True)
-        self.inactivity_timer.timeout.connect(self.start_auto_scroll)
+        """Бездействие отслеживает общий планировщик (срок INACTIVITY), по нему включается режим ожидания"""
+        self.scheduler = get_scheduler()
         self.reset_inactivity_timer()
 
     def reset_inactivity_timer(self):
-        """Сброс таймера бездействия"""
+        """Сброс таймера бездействия (срок ставит только показанная панель)"""
         # if self.root_menu:  # Только для корневого меню
         #    self.inactivity_timer.start(self.settings.INACTIVITY_TIMEOUT * 1000)
-        self.inactivity_timer.start(self.settings.INACTIVITY_TIMEOUT * 1000)
+        if not self.isHidden():
+            self.scheduler.schedule(INACTIVITY, self.settings.INACTIVITY_TIMEOUT, self.on_inactivity_timeout)
 
     def stop_inactivity_timer(self):
-        self.inactivity_timer.stop()
-
-    def reset_inactivity_timer_from_scroll(self):
-        """Сброс таймера бездействия"""
-        if self.root_menu:  # Только для корневого меню
-            self.inactivity_timer.start(500)
-
-    def start_auto_scroll(self):
-        """Запуск автоматической прокрутки при бездействии"""
-        if not self.root_menu or not self.scroll_area or not self.scroll_content:
-            # Если не корневое меню - эмитируем событие клика с None
-            if not self.root_menu:
-                print("Таймер бездействия в не корневом меню - эмитируем клик с None")
-                self.item_clicked.emit(None, {})
-            return
+        self.scheduler.cancel(INACTIVITY, self.on_inactivity_timeout)
 
-        scrollbar = self.scroll_area.horizontalScrollBar()
-        if not scrollbar.isVisible() or scrollbar.maximum() <= 0:
-            # Если прокрутка не нужна, перезапускаем таймер
-            self.reset_inactivity_timer()
+    def on_inactivity_timeout(self):
+        """Бездействие: в корневом меню - режим ожидания (idle_mode.IdleMode), иначе клик с None"""
+        if not self.root_menu:
+            print("Таймер бездействия в не корневом меню - эмитируем клик с None")
+            self.item_clicked.emit(None, {})
             return
+        self.idle_requested.emit()
 
-        # Определяем направление прокрутки
-        current_value = scrollbar.value()
-        if current_value >= scrollbar.maximum():
-            # Достигли конца - прокручиваем к началу
-            target_value = scrollbar.minimum()
-        else:
-            # Прокручиваем вперед
-            #target_value = min(scrollbar.maximum(), current_value + 400)
-            target_value = scrollbar.maximum()
-
-        # Плавная прокрутка
-        self.smooth_scroll_to(target_value, 1000)  # 1 секунда на анимацию
-
-        # Перезапускаем таймер для следующей прокрутки
-        QTimer.singleShot(1200, self.reset_inactivity_timer_from_scroll)  # Ждем окончания анимации + задержка
+    def idle_scroll_step(self, distance):
+        """
+        Шаг медленной прокрутки режима ожидания: до конца галереи, затем обратно к началу.
+        :return: False, если прокручивать нечего
+        """
+        scrollbar = self.scroll_area.horizontalScrollBar()
+        if scrollbar.maximum() <= scrollbar.minimum():
+            return False
+        value = scrollbar.value() + max(1, round(distance)) * self.idle_direction
+        if value >= scrollbar.maximum():
+            value = scrollbar.maximum()
+            self.idle_direction = -1
+        elif value <= scrollbar.minimum():
+            value = scrollbar.minimum()
+            self.idle_direction = 1
+        scrollbar.setValue(value)
+        return True
 
     def setup_swipe_gestures(self):
         """Настройка жестов свайпа"""
@@ -107,25 +117,8 @@ class ScrollPanel(QWidget):
         self.scroll_content.setAttribute(Qt.WA_AcceptTouchEvents)
         self.setAttribute(Qt.WA_AcceptTouchEvents)
 
-        # Переменные для отслеживания свайпа
-        self.swipe_start_pos = None
-        self.swipe_start_time = None
-        self.last_pos = None
-        self.last_time = None
-        self.velocity = 0
-        self.is_swiping = False
-        self.click_threshold = 10  # Максимальное перемещение для определения клика
-
-        # Параметры свайпа
-        self.swipe_threshold = 30
-        self.deceleration = 1000
-        self.min_velocity = 10
-
-    def setup_animation(self):
-        """Настройка анимации инерции"""
-        self.inertia_timer = QTimer()
-        self.inertia_timer.timeout.connect(self.update_inertia)
-        self.inertia_timer.setInterval(16)
+        # Свайп и инерция по горизонтали
+        self.scroller = KineticScroller(self.scroll_area.horizontalScrollBar(), Qt.Horizontal)
 
     def event(self, event: QEvent) -> bool:
         """Обработка событий жестов с сбросом таймера бездействия"""
@@ -162,186 +155,66 @@ class ScrollPanel(QWidget):
     def handle_touch_begin(self, event: QEvent) -> bool:
         """Обработка начала касания"""
         if event.touchPoints():
-            self.stop_inertia()
             self.stop_auto_scroll()
-            self.swipe_start_pos = event.touchPoints()[0].pos()
-            self.swipe_start_time = time.time()
-            self.last_pos = self.swipe_start_pos
-            self.last_time = self.swipe_start_time
-            self.is_swiping = False  # Пока не знаем, это свайп или клик
+            self.pending_scroll = None
+            self.scroller.press(event.touchPoints()[0].pos())
             return True
         return False
 
     def handle_touch_update(self, event: QEvent) -> bool:
         """Обработка движения касания"""
-        if not self.swipe_start_pos or not event.touchPoints():
+        if self.scroller.start_pos is None or not event.touchPoints():
             return False
-
-        current_pos = event.touchPoints()[0].pos()
-        current_time = time.time()
-
-        # Проверяем, превысили ли порог для свайпа
-        delta_x = abs(current_pos.x() - self.swipe_start_pos.x())
-        delta_y = abs(current_pos.y() - self.swipe_start_pos.y())
-
-        if delta_x > self.click_threshold or delta_y > self.click_threshold:
-            # Превысили порог - это свайп
-            self.is_swiping = True
-            self.process_swipe_gesture(self.last_pos, current_pos, current_time)
-
-        self.last_pos = current_pos
-        self.last_time = current_time
+        self.scroller.move(event.touchPoints()[0].pos())
         return True
 
     def handle_touch_end(self, event: QEvent) -> bool:
         """Обработка окончания касания"""
-        if not self.swipe_start_pos:
+        start_pos = self.scroller.start_pos
+        if start_pos is None:
             return True
-
-        # Если это был свайп - запускаем инерцию
-        if self.is_swiping and self.velocity != 0:
-            self.start_inertia()
-        else:
-            # Если не было свайпа - это клик
-            self.handle_click(self.swipe_start_pos)
-
-        self.is_swiping = False
-        self.swipe_start_pos = None
+        # После свайпа запускается инерция, иначе это клик
+        if self.scroller.release():
+            self.handle_click(start_pos)
         return True
 
     def handle_mouse_press(self, event: QMouseEvent) -> bool:
         """Обработка нажатия мыши (для тестирования)"""
         if event.button() == Qt.LeftButton:
-            self.stop_inertia()
             self.stop_auto_scroll()
-            self.swipe_start_pos = event.pos()
-            self.swipe_start_time = time.time()
-            self.last_pos = self.swipe_start_pos
-            self.last_time = self.swipe_start_time
-            self.is_swiping = False
+            self.pending_scroll = None
+            self.scroller.press(event.pos())
             return True
         return False
 
     def handle_mouse_move(self, event: QMouseEvent) -> bool:
         """Обработка движения мыши с зажатой кнопкой"""
-        if self.swipe_start_pos and event.buttons() & Qt.LeftButton:
-            current_pos = event.pos()
-            current_time = time.time()
-
-            # Проверяем порог для определения свайпа
-            delta_x = abs(current_pos.x() - self.swipe_start_pos.x())
-            delta_y = abs(current_pos.y() - self.swipe_start_pos.y())
-
-            if delta_x > self.click_threshold or delta_y > self.click_threshold:
-                # Превысили порог - это свайп
-                self.is_swiping = True
-                self.process_swipe_gesture(self.last_pos, current_pos, current_time)
-
-            self.last_pos = current_pos
-            self.last_time = current_time
+        if self.scroller.start_pos is not None and event.buttons() & Qt.LeftButton:
+            self.scroller.move(event.pos())
             return True
         return False
 
     def handle_mouse_release(self, event: QMouseEvent) -> bool:
         """Обработка отпускания кнопки мыши"""
-        if not self.swipe_start_pos:
+        start_pos = self.scroller.start_pos
+        if start_pos is None:
             return False
-
-        # Если это был свайп - запускаем инерцию
-        if self.is_swiping and self.velocity != 0:
-            self.start_inertia()
-        else:
-            # Если не было свайпа - это клик
-            self.handle_click(self.swipe_start_pos)
-
-        self.is_swiping = False
-        self.swipe_start_pos = None
+        if self.scroller.release():
+            self.handle_click(start_pos)
         return False
 
     def handle_click(self, click_pos: QtCore.QPoint):
         """Обработка клика по элементу"""
         content_pos = self.scroll_content.mapFromParent(click_pos)
-        for i in range(self.scroll_layout.count()):
-            item = self.scroll_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if widget.geometry().contains(content_pos):
-                    if isinstance(widget, GalleryItemWidget):
-                        # Находим данные элемента в gallery_data
-                        item_data = self.find_item_data_by_guid(widget.guid)
-                        if item_data:
-                            # Эмитируем сигнал с данными элемента
-                            self.item_clicked.emit(widget.guid, item_data)
-                        break
+        index = self.index.at(content_pos.x() - self.content_offset())
+        widget = self.widgets.get(index)
+        if widget and widget.geometry().contains(content_pos) and widget.in_stock:
+            # Эмитируем сигнал с данными элемента
+            self.item_clicked.emit(widget.guid, self.items[index])
 
     def find_item_data_by_guid(self, guid: str) -> dict:
         """Находит данные элемента по GUID"""
-        for item in self.gallery_data.get("items", []):
-            if item.get("guid") == guid:
-                return item
-        return {}
-
-    def process_swipe_gesture(self, start_pos: QtCore.QPoint, current_pos: QtCore.QPoint, current_time: float):
-        """Обработка жеста свайпа с вычислением скорости"""
-        if not start_pos:
-            return
-
-        # Вычисляем разницу в координатах и времени
-        delta_x = current_pos.x() - start_pos.x()
-        delta_time = current_time - self.last_time
-
-        if delta_time > 0:
-            # Вычисляем мгновенную скорость
-            instantaneous_velocity = delta_x / delta_time
-            # Сглаживаем скорость
-            self.velocity = instantaneous_velocity * 0.7 + self.velocity * 0.3
-
-        # Прокручиваем содержимое
-        scrollbar = self.scroll_area.horizontalScrollBar()
-        current_value = scrollbar.value()
-        scrollbar.setValue(int(current_value - delta_x))
-
-    def start_inertia(self):
-        """Запуск анимации инерции"""
-        if abs(self.velocity) > self.min_velocity:
-            self.inertia_timer.start()
-
-    def stop_inertia(self):
-        """Остановка анимации инерции"""
-        self.inertia_timer.stop()
-        self.velocity = 0
-
-    def update_inertia(self):
-        """Обновление анимации инерции"""
-        if abs(self.velocity) < self.min_velocity:
-            self.stop_inertia()
-            return
-
-        # Применяем инерцию
-        scrollbar = self.scroll_area.horizontalScrollBar()
-        current_value = scrollbar.value()
-
-        # Вычисляем смещение на основе скорости
-        delta = self.velocity * 0.016  # 16ms = 0.016s
-
-        # Применяем замедление
-        if self.velocity > 0:
-            self.velocity = max(0, self.velocity - self.deceleration * 0.016)
-        else:
-            self.velocity = min(0, self.velocity + self.deceleration * 0.016)
-
-        # Прокручиваем с инерцией
-        new_value = current_value - delta
-
-        # Проверяем границы
-        if new_value < scrollbar.minimum():
-            new_value = scrollbar.minimum()
-            self.velocity = -self.velocity * 0.3  # Отскок от границы
-        elif new_value > scrollbar.maximum():
-            new_value = scrollbar.maximum()
-            self.velocity = -self.velocity * 0.3  # Отскок от границы
-
-        scrollbar.setValue(int(new_value))
+        return self.index.get(guid) or {}
 
     def smooth_scroll_to(self, target_value: int, duration: int = 500):
         """Плавная прокрутка к указанной позиции"""
@@ -355,17 +228,47 @@ class ScrollPanel(QWidget):
         self.animation.setEasingCurve(QEasingCurve.OutCubic)
         self.animation.start()
 
+    def scroll_position(self):
+        if self.pending_scroll is not None:
+            return self.pending_scroll
+        return self.scroll_area.horizontalScrollBar().value()
+
+    def restore_scroll_position(self, value):
+        """Позиция прокрутки сохраненного экрана (после load_gallery_data)"""
+        self.pending_scroll = value
+        self.apply_pending_scroll()
+
+    def apply_pending_scroll(self):
+        """
+        Диапазон прокрутки обновляется после изменения размера содержимого (в том числе при показе
+        панели) - позиция досдвигается, пока полоса прокрутки не сможет ее принять
+        """
+        if self.pending_scroll is None:
+            return
+        scrollbar = self.scroll_area.horizontalScrollBar()
+        scrollbar.setValue(self.pending_scroll)
+        if scrollbar.value() == self.pending_scroll and self.isVisible():
+            self.pending_scroll = None
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.pending_scroll is None:
+            self.pending_scroll = self.scroll_position()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        QTimer.singleShot(0, self.apply_pending_scroll)
+
     def update_existing_items(self):
-        """Обновляет размеры существующих элементов без пересоздания"""
+        """Обновляет размеры элементов без пересоздания (картинки перезагружаются только у видимых)"""
         item_size = self.calculate_item_size()
-        for i in range(self.scroll_layout.count()):
-            item = self.scroll_layout.itemAt(i)
-            if item and item.widget() and isinstance(item.widget(), GalleryItemWidget):
-                widget = item.widget()
-                widget.item_size = item_size
-                widget.image_label.setFixedSize(item_size)
-                widget.name_label.setFixedWidth(item_size.width())
-                widget.load_image()  # Перезагружаем изображение с новым размером
+        if item_size == self.item_size:
+            return
+        self.item_size = item_size
+        self.recycle_items()
+        self.rebuild_index()
+        self.update_content_width()
+        self.update_visible_items()
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -373,37 +276,88 @@ class ScrollPanel(QWidget):
         #self.load_gallery_data()
 
     def calculate_item_size(self):
-        gallery_height = self.height() - 40
+        return self.item_size_for_height(self.height())
+
+    @staticmethod
+    def item_size_for_height(panel_height):
+        """Размер картинки элемента галереи при высоте панели panel_height (используется и в asset_pipeline)"""
+        gallery_height = panel_height - 40
         if gallery_height <= 0:
             gallery_height = 400
 
-        image_height = int(gallery_height * self.settings.IMAGE_SIZE_PERCENT)
+        image_height = int(gallery_height * Settings.IMAGE_SIZE_PERCENT)
         image_width = image_height
 
         return QSize(image_width, image_height)
 
+    def rebuild_index(self):
+        # Ширина элемента - картинка плюс поля
+        self.index.rebuild(self.items, lambda item: item["guid"], repeat(self.item_size.width() + 10, len(self.items)),
+                           self.CONTENT_MARGIN, self.ITEM_SPACING)
+
+    def total_width(self):
+        return max(self.index.end(), self.CONTENT_MARGIN) + self.CONTENT_MARGIN
+
+    def content_offset(self):
+        """Сдвиг для центрирования, если все элементы помещаются на экране"""
+        return max(0, (self.scroll_content.width() - self.total_width()) // 2)
+
+    def update_content_width(self):
+        self.scroll_content.setMinimumWidth(self.total_width())
+
+    def eventFilter(self, obj, event):
+        if obj is self.scroll_content and event.type() == QEvent.Resize:
+            self.apply_pending_scroll()
+            self.update_visible_items(relayout=True)
+        return super().eventFilter(obj, event)
+
+    def recycle_items(self, keep=range(0)):
+        for index in [index for index in self.widgets if index not in keep]:
+            widget = self.widgets.pop(index)
+            widget.setVisible(False)
+            self.free_widgets.append(widget)
+
+    def visible_range(self):
+        """Номера элементов, пересекающих видимую область, с запасом OVERSCAN"""
+        left = self.scroll_area.horizontalScrollBar().value() - self.content_offset()
+        visible = self.index.range(left, left + self.scroll_area.viewport().width())
+        return range(max(0, visible.start - self.OVERSCAN), min(len(self.index), visible.stop + self.OVERSCAN))
+
+    def update_visible_items(self, *args, relayout=False):
+        """Создает/переиспользует элементы для видимой области и убирает ушедшие из нее"""
+        visible = self.visible_range()
+        self.recycle_items(visible)
+        offset = self.content_offset()
+        height = self.scroll_content.height() - 2 * self.CONTENT_MARGIN
+        for index in visible:
+            widget = self.widgets.get(index)
+            if widget is None:
+                widget = self.free_widgets.pop() if self.free_widgets else self.create_item()
+                item_data = self.items[index]
+                widget.bind(item_data["guid"], item_data["name"], item_data["image"], self.item_size,
+                            item_data.get("in_stock", True))
+                self.widgets[index] = widget
+            elif not relayout:
+                continue
+            start, end = self.index.extent(index)
+            widget.setGeometry(offset + start, self.CONTENT_MARGIN, end - start, height)
+            widget.setVisible(True)
+
+    def create_item(self):
+        widget = GalleryItemWidget(None, "", None, self.item_size)
+        widget.setParent(self.scroll_content)
+        return widget
+
+    @timed("gallery.load_gallery_data")
     def load_gallery_data(self):
-        while self.scroll_layout.count():
-            item = self.scroll_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
-        item_size = self.calculate_item_size()
-
-        self.scroll_layout.addStretch()
-
-        for item_data in self.gallery_data.get("items", []):
-            item_widget = GalleryItemWidget(
-                item_data["guid"],
-                item_data["name"],
-                item_data["image"],
-                item_size
-            )
-            # Подключаем сигнал клика по элементу
-            #item_widget.itemClicked.connect(self.on_gallery_item_clicked)
-            self.scroll_layout.addWidget(item_widget)
-
-        self.scroll_layout.addStretch()
+        self.recycle_items()
+        self.items = self.gallery_data.get("items", [])
+        self.item_size = self.calculate_item_size()
+        self.rebuild_index()
+        self.update_content_width()
+        self.pending_scroll = None
+        self.scroll_area.horizontalScrollBar().setValue(0)
+        self.update_visible_items(relayout=True)
         self.reset_inactivity_timer()
 
     #def on_gallery_item_clicked(self, guid: str):
@@ -414,51 +368,59 @@ class ScrollPanel(QWidget):
 class GalleryItemWidget(QWidget):
     itemClicked = pyqtSignal(str)
 
-    def __init__(self, guid: str, name: str, image_filename: str, item_size: QSize):
+    def __init__(self, guid: str, name: str, image_filename: str, item_size: QSize, in_stock: bool = True):
         super().__init__()
-        self.guid = guid
-        self.name = name
-        self.image_filename = image_filename
-        self.item_size = item_size
         self.setup_ui()
+        self.bind(guid, name, image_filename, item_size, in_stock)
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(5, 5, 5, 5)
         layout.setSpacing(5)
 
-        self.image_label = ClickableLabel(self.guid)
-        self.image_label.setFixedSize(self.item_size)
+        self.image_label = ClickableLabel()
         self.image_label.setAlignment(Qt.AlignCenter)
         #self.image_label.setStyleSheet("border: 1px solid #333333; border-radius: 5px; background-color: #1a1a1a;")
 
         self.image_label.clicked.connect(self.itemClicked.emit)
-        self.load_image()
 
-        self.name_label = ClickableLabel(self.guid)
-        self.name_label.setText(self.name)
+        self.name_label = ClickableLabel()
         self.name_label.setAlignment(Qt.AlignCenter)
         self.name_label.setWordWrap(True)
-        self.name_label.setMaximumWidth(self.item_size.width())
         self.name_label.setObjectName("GaleryLabel")
-        self.name_label.setStyleSheet(STYLES)
         self.name_label.clicked.connect(self.itemClicked.emit)
 
         layout.addWidget(self.image_label)
         layout.addWidget(self.name_label)
         layout.addStretch()
 
-    def load_image(self):
-        try:
-            original_pixmap = QPixmap(Settings.CATEGORY_IMAGE_PATH + "\\" + self.image_filename)
-            pixmap = original_pixmap.scaledToHeight(self.item_size.height(), Qt.SmoothTransformation)
-            self.image_label.setPixmap(pixmap)
-
-        except Exception as e:
-            print(f"Ошибка загрузки изображения {self.image_filename}: {e}")
-            pixmap = QPixmap(self.item_size)
-            pixmap.fill(Qt.darkGray)
-            self.image_label.setPixmap(pixmap)
-
-
+    def bind(self, guid, name, image_filename, item_size, in_stock=True):
+        """Заполняет элемент данными категории (элементы переиспользуются при прокрутке)"""
+        self.guid = guid
+        self.name = name
+        self.image_filename = image_filename
+        self.item_size = item_size
+        self.in_stock = in_stock
+        self.image_label.guid = guid
+        self.name_label.guid = guid
+        self.image_label.setFixedSize(item_size)
+        self.name_label.setMaximumWidth(item_size.width())
+        self.name_label.setText(name)
+        if image_filename:
+            self.load_image()
+        else:
+            get_image_loader().cancel(self.image_label)
+            self.image_label.clear()
+
+        if not self.in_stock:
+            # Категория распродана - показываем неактивной
+            if self.graphicsEffect() is None:
+                effect = QGraphicsOpacityEffect(self)
+                effect.setOpacity(Settings.SOLD_OUT_OPACITY)
+                self.setGraphicsEffect(effect)
+        elif self.graphicsEffect() is not None:
+            self.setGraphicsEffect(None)
 
+    def load_image(self):
+        get_image_loader().request(self.image_label, Settings.CATEGORY_IMAGE_PATH + "\\" + self.image_filename,
+                                   self.item_size, ThumbnailCache.MODE_HEIGHT)
@@ -0,0 +1,71 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton
+from PyQt5.QtCore import Qt, pyqtSignal
+
+
+class SearchPanel(QWidget):
+    """Строка поиска с экранной клавиатурой"""
+    query_changed = pyqtSignal(str)
+
+    KEYBOARD_ROWS = [
+        "1234567890",
+        "йцукенгшщзх",
+        "фывапролджэ",
+        "ячсмитьбю",
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self.query = ""
+        self.setup_ui()
+
+    def setup_ui(self):
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(20, 10, 20, 10)
+        main_layout.setSpacing(10)
+
+        self.query_label = QLabel()
+        self.query_label.setObjectName("search_query")
+        self.query_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        main_layout.addWidget(self.query_label)
+
+        keyboard_layout = QGridLayout()
+        keyboard_layout.setSpacing(6)
+        for row, keys in enumerate(self.KEYBOARD_ROWS):
+            for col, key in enumerate(keys):
+                keyboard_layout.addWidget(self.create_key(key.upper(), lambda checked, k=key: self.add_text(k)), row, col)
+        main_layout.addLayout(keyboard_layout)
+
+        controls_layout = QHBoxLayout()
+        controls_layout.setSpacing(6)
+        controls_layout.addWidget(self.create_key("Очистить", lambda checked: self.set_query("")))
+        controls_layout.addWidget(self.create_key("Пробел", lambda checked: self.add_text(" ")), 3)
+        controls_layout.addWidget(self.create_key("⌫", lambda checked: self.set_query(self.query[:-1])))
+        main_layout.addLayout(controls_layout)
+
+        self.update_label()
+
+    def create_key(self, text, handler):
+        button = QPushButton(text)
+        button.setObjectName("keyboard_button")
+        button.setFocusPolicy(Qt.NoFocus)
+        button.clicked.connect(handler)
+        return button
+
+    def add_text(self, text):
+        if text == " " and (not self.query or self.query.endswith(" ")):
+            return
+        self.set_query(self.query + text)
+
+    def set_query(self, query):
+        if query == self.query:
+            return
+        self.query = query
+        self.update_label()
+        self.query_changed.emit(self.query)
+
+    def clear(self):
+        self.query = ""
+        self.update_label()
+
+    def update_label(self):
+        self.query_label.setText(self.query if self.query else "Начните вводить название блюда")
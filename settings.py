@@ -20,10 +20,59 @@ class Settings:
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     DATABASE_PATH = os.path.join(BASE_DIR, 'database.db')
 
+    # Журнал продаж: файл для записей, еще не сброшенных в БД, и параметры группового коммита
+    SALES_SPOOL_PATH = os.path.join(BASE_DIR, 'sales.spool')
+    SALES_FLUSH_INTERVAL = 2.0  # секунд
+    SALES_BATCH_SIZE = 50
+    SALES_RETRY_MAX_INTERVAL = 60.0  # секунд, наибольшая пауза между повторами пачки после ошибки БД
+
+    # Дисковый кэш уменьшенных изображений
+    THUMBNAIL_CACHE_PATH = os.path.join(BASE_DIR, 'cache', 'thumbnails')
+    THUMBNAIL_CACHE_BUDGET = 50 * 1024 * 1024  # байт
+    # Кэш готовых картинок в памяти
+    PIXMAP_CACHE_BUDGET = 64 * 1024 * 1024  # байт
+    # Кэш построенных экранов (категории, списки товаров, карточки) для быстрого возврата назад и домой
+    SCREEN_CACHE_BUDGET = 4 * 1024 * 1024  # байт
+    # Потоковое чтение списка товаров из БД (fetchmany) и прогрессивное заполнение списка
+    DB_FETCH_BATCH_SIZE = 100  # строк
+    POPULATION_STEP_BUDGET = 0.004  # секунд на шаг заполнения
+
+    # Замеры отклика интерфейса (main.py --instrument): размер кольцевого буфера событий и файл выгрузки
+    INSTRUMENTATION_ENABLED = False
+    INSTRUMENTATION_BUFFER_SIZE = 8192  # событий
+    INSTRUMENTATION_PATH = os.path.join(BASE_DIR, 'instrumentation.jsonl')
+    # Картинки, заранее подготовленные asset_pipeline под профили экранов
+    ASSET_BUNDLE_PATH = os.path.join(BASE_DIR, 'assets')
+    # История переходов для восстановления экрана после аварийного перезапуска
+    NAVIGATION_STATE_PATH = os.path.join(BASE_DIR, 'navigation.json')
+
+    # Запуск: сначала строится только главный экран, остальные - при первом переходе на них
+    # или в простое через LAZY_SCREENS_DELAY секунд после запуска (None - только при первом переходе)
+    LAZY_SCREENS_DELAY = 3.0  # секунд
+    PROFILE_STARTUP = False  # main.py --profile-startup: время этапов запуска до первой отрисовки
+
     # Размер картинки в процентах от области галереи (0.0 - 1.0)
     IMAGE_SIZE_PERCENT = 0.8  # 80% от высоты области галереи
 
     # Таймаут бездействия в секундах
     INACTIVITY_TIMEOUT = 10
+    # Планировщик: сроки, наступающие в пределах этого окна от ближайшего, выполняются за одно пробуждение
+    SCHEDULER_COALESCE = 0.05  # секунд
+    SCHEDULER_TRACE = False  # печатать постановку и выполнение сроков
+    # Режим ожидания после бездействия на главном экране (idle_mode.py):
+    # "gallery" - медленная прокрутка категорий, "slideshow" - слайды, "video" - ролики из таблицы video
+    IDLE_ATTRACT = "gallery"
+    IDLE_FPS = 5  # кадров в секунду прокрутки галереи
+    IDLE_SCROLL_SPEED = 60  # пикселей в секунду
+    IDLE_SLIDESHOW_PATH = "images\\slideshow"
+    IDLE_SLIDE_INTERVAL = 8  # секунд на слайд
+    VIDEO_PATH = "images\\video"
 
     PAY_BUTTON_HEIGHT = 100
+
+    # Цветовая схема: "dark" или "light" (styles.THEMES)
+    THEME = "dark"
+
+    # Отображение товаров и категорий, которых нет в автомате: "hide" - скрывать, "grey" - показывать неактивными
+    SOLD_OUT_MODE = "grey"
+    SOLD_OUT_OPACITY = 0.35
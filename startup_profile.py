@@ -0,0 +1,85 @@
+"""
+Профиль запуска (main.py --profile-startup): время этапов от старта процесса до первой отрисовки главного экрана.
+Этап - интервал от предыдущей отметки phase до текущей. Запуск интерпретатора (до первой строки main.py)
+берется из /proc, где он доступен.
+"""
+import os
+import time
+
+from PyQt5.QtCore import QObject, QEvent
+
+from settings import Settings
+
+
+def process_age():
+    """Секунд с запуска процесса или None, если узнать нельзя (не Linux)"""
+    try:
+        with open("/proc/self/stat") as f:
+            # Имя процесса в скобках может содержать пробелы - поля считаем после него
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+
+
+class StartupProfile:
+    def __init__(self, started):
+        """:param started: time.perf_counter() в начале main.py"""
+        self.started = started
+        self.last = started
+        self.phases = []  # (этап, секунд)
+        age = process_age()
+        if age is not None:
+            self.phases.append(("запуск интерпретатора", max(0.0, age - (time.perf_counter() - started))))
+
+    def phase(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def format_report(self):
+        lines = ["Профиль запуска:"]
+        for name, seconds in self.phases:
+            lines.append(f"    {name:<32} {seconds * 1000:8.1f} мс")
+        lines.append(f"    {'всего':<32} {sum(seconds for name, seconds in self.phases) * 1000:8.1f} мс")
+        return "\n".join(lines)
+
+
+class FirstPaintWatcher(QObject):
+    """Отмечает первую отрисовку виджета и печатает профиль запуска"""
+
+    def __init__(self, profile, widget):
+        super().__init__()
+        self.profile = profile
+        self.widget = widget
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.widget and event.type() == QEvent.Paint:
+            self.widget.removeEventFilter(self)
+            self.profile.phase("первая отрисовка")
+            print(self.profile.format_report())
+        return False
+
+
+_profile = None
+
+
+def begin(started):
+    """Включает профиль запуска (Settings.PROFILE_STARTUP)"""
+    global _profile
+    if Settings.PROFILE_STARTUP:
+        _profile = StartupProfile(started)
+    return _profile
+
+
+def get_startup_profile():
+    return _profile
+
+
+def phase(name):
+    """Отметка конца этапа запуска (ничего не делает, если профиль выключен)"""
+    if _profile:
+        _profile.phase(name)
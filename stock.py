@@ -0,0 +1,77 @@
+from settings import Settings
+
+
+class StockCounter:
+    """
+    Счетчики единиц товара в автомате (таблица goods) по товарам и категориям.
+    Считаются только годные незарезервированные единицы - те, что может выдать UnitAllocator:
+    он строит счетчики (rebuild) и обновляет их инкрементально при закладке, резерве, выдаче
+    и истечении срока годности, без пересчета на каждом экране.
+    """
+
+    def __init__(self, db, catalog):
+        self.db = db
+        self.catalog = catalog
+        self.product_category = {}  # guid товара -> guid категории
+        self.product_stock = {}  # guid товара -> количество единиц
+        self.category_stock = {}  # guid категории -> количество единиц в категории и всех дочерних
+
+    def rebuild(self, product_stock):
+        """:param product_stock: guid товара -> количество годных свободных единиц (UnitAllocator.counted)"""
+        self.product_category = self.db.get_product_categories()
+        self.product_stock = dict(product_stock)
+        self.category_stock = {}
+        for product_guid, count in self.product_stock.items():
+            self.update_categories(self.product_category.get(product_guid), count)
+
+    def update_categories(self, category_guid, delta):
+        """Изменяет счетчик категории и всех ее родителей"""
+        while category_guid:
+            self.category_stock[category_guid] = self.category_stock.get(category_guid, 0) + delta
+            category_guid = self.catalog.get_parent_category(category_guid)
+
+    def unit_added(self, product_guid, count=1):
+        """Единица товара заложена в автомат"""
+        self.product_stock[product_guid] = self.product_stock.get(product_guid, 0) + count
+        self.update_categories(self.product_category.get(product_guid), count)
+
+    def unit_dispensed(self, product_guid, count=1):
+        """Единица товара ушла из продажи (зарезервирована, выдана, списана или просрочена)"""
+        count = min(count, self.product_stock.get(product_guid, 0))
+        if count <= 0:
+            return
+        self.product_stock[product_guid] -= count
+        self.update_categories(self.product_category.get(product_guid), -count)
+
+    def product_count(self, product_guid):
+        return self.product_stock.get(product_guid, 0)
+
+    def category_count(self, category_guid):
+        return self.category_stock.get(category_guid, 0)
+
+    def get_categories_with_products_hierarchy(self, parent_guid=None):
+        """
+        Категории с товарами (CatalogTree) с учетом наличия:
+        в режиме "hide" категории без единиц в автомате скрываются, в режиме "grey" помечаются in_stock=False
+        """
+        data = self.catalog.get_categories_with_products_hierarchy(parent_guid)
+        items = []
+        for item in data['items']:
+            in_stock = self.category_count(item["guid"]) > 0
+            if not in_stock and Settings.SOLD_OUT_MODE == "hide":
+                continue
+            items.append(dict(item, in_stock=in_stock))
+        return {'items': items}
+
+    def apply_items(self, rows):
+        """
+        Список товаров категории (Database.get_items_by_category) с учетом наличия:
+        к каждой строке добавляется признак in_stock, в режиме "hide" распроданные товары скрываются
+        """
+        result = []
+        for row in rows:
+            in_stock = self.product_count(row[2]) > 0
+            if not in_stock and Settings.SOLD_OUT_MODE == "hide":
+                continue
+            result.append(tuple(row) + (in_stock,))
+        return result
@@ -1,3 +1,5 @@
+from PyQt5.QtWidgets import QApplication
+
 # Настройки цветовой схемы для темной темы
 DARK_THEME = {
     # Основные цвета
@@ -24,16 +26,49 @@ DARK_THEME = {
 }
 
 
-STYLES = f"""
+# Светлая тема (те же ключи, что и у DARK_THEME)
+LIGHT_THEME = {
+    # Основные цвета
+    'BACKGROUND': '#ffffff',
+    'BACKGROUND_SECONDARY': '#f0f0f0',
+    'BACKGROUND_TERTIARY': '#e0e0e0',
+    'BACKGROUND_DISCOUNT_DESCRIPTION': '#FFD700',
+    'PAY_BUTTON': '#2e9d3a',
+    'PAY_DISCOUNT_BUTTON': '#e0401a',
+
+    # Цвета текста
+    'TEXT_PRIMARY': '#000000',
+    'TEXT_CONTRAST': '#ffffff',
+    'TEXT_SECONDARY': '#333333',
+    'TEXT_MUTED': '#777777',
+    'TEXT_PRICE': '#1f7a29',
+    'TEXT_DISCOUNT_PRICE': '#e0401a',
+    'TEXT_NAME_DESCRIPTION': '#b35c00',
+    'TEXT_DISCOUNT_DESCRIPTION': '#000000',
+
+    # Цвета границ
+    'BORDER_PRIMARY': '#cccccc',
+    'BORDER_SECONDARY': '#999999'
+}
+
+THEMES = {
+    'dark': DARK_THEME,
+    'light': LIGHT_THEME,
+}
+
+
+def build_styles(theme):
+    """Таблица стилей приложения для цветовой схемы theme"""
+    return f"""
 /* Основные стили приложения */
 
 QMainWindow {{
-    background-color: {DARK_THEME['BACKGROUND']};
+    background-color: {theme['BACKGROUND']};
 }}
 
 QWidget {{
-    background-color: {DARK_THEME['BACKGROUND']};
-    color: {DARK_THEME['BACKGROUND']};
+    background-color: {theme['BACKGROUND']};
+    color: {theme['BACKGROUND']};
     border: None;
 }}
 
@@ -46,43 +81,51 @@ QWidget#product_item {{
 
 /* Стили для списка */
 QPushButton {{
-    border: 1px solid {DARK_THEME['BORDER_SECONDARY']};
+    border: 1px solid {theme['BORDER_SECONDARY']};
     background-color: transparent;
     font-size: 20px;
-    color: {DARK_THEME['TEXT_PRIMARY']};
+    color: {theme['TEXT_PRIMARY']};
 }}
 
 /* Кнопка оплаты */
 QPushButton#price_button {{
-    border: 1px solid {DARK_THEME['BORDER_SECONDARY']};
+    border: 1px solid {theme['BORDER_SECONDARY']};
     border-radius: 10px;
-    background-color: {DARK_THEME['PAY_BUTTON']};
+    background-color: {theme['PAY_BUTTON']};
     font-size: 30px;
-    color: {DARK_THEME['TEXT_CONTRAST']};
+    color: {theme['TEXT_CONTRAST']};
 }}
 
 QPushButton#text_image_Button {{
-    background-color: {DARK_THEME['BACKGROUND']};
-    color: {DARK_THEME['BACKGROUND']};
+    background-color: {theme['BACKGROUND']};
+    color: {theme['BACKGROUND']};
     border: None;
 }}
 
 /* Кнопка оплаты со скидкой*/
 QPushButton#discount_price_button {{
-    border: 1px solid {DARK_THEME['BORDER_SECONDARY']};
+    border: 1px solid {theme['BORDER_SECONDARY']};
     border-radius: 10px;
-    background-color: {DARK_THEME['PAY_DISCOUNT_BUTTON']};
+    background-color: {theme['PAY_DISCOUNT_BUTTON']};
     font-size: 30px;
-    color: {DARK_THEME['TEXT_CONTRAST']};
+    color: {theme['TEXT_CONTRAST']};
 }}
 
 /* Стиль заголовка */
 QLabel#title_label {{
     font-size: 50px;
     font-weight: bold;
-    color: {DARK_THEME['TEXT_PRIMARY']};
+    color: {theme['TEXT_PRIMARY']};
     padding: 10px;
-    background-color: {DARK_THEME['BACKGROUND']};
+    background-color: {theme['BACKGROUND']};
+    border: None;
+}}
+
+/* Навигационная строка под заголовком */
+QLabel#breadcrumbs_label {{
+    font-size: 22px;
+    color: {theme['TEXT_SECONDARY']};
+    background-color: {theme['BACKGROUND']};
     border: None;
 }}
 
@@ -90,45 +133,84 @@ QLabel#title_label {{
 QLabel#product_description {{
     font-size: 30px;
     font-weight: bold;
-    color: {DARK_THEME['TEXT_PRIMARY']};
+    color: {theme['TEXT_PRIMARY']};
+    padding: 10px;
+    background-color: {theme['BACKGROUND']};
+}}
+
+
+QLabel#placeholder_label {{
+    font-size: 24pt;
+    color: {theme['TEXT_MUTED']};
+    background-color: {theme['BACKGROUND']};
+}}
+
+QLabel#attract_panel {{
+    background-color: {theme['BACKGROUND']};
+}}
+
+QLabel#search_query {{
+    font-size: 30px;
+    color: {theme['TEXT_PRIMARY']};
+    background-color: {theme['BACKGROUND_SECONDARY']};
+    border: 1px solid {theme['BORDER_SECONDARY']};
+    border-radius: 10px;
     padding: 10px;
-    background-color: {DARK_THEME['BACKGROUND']};
 }}
 
+QPushButton#keyboard_button {{
+    background-color: {theme['BACKGROUND_TERTIARY']};
+    color: {theme['TEXT_PRIMARY']};
+    border: 1px solid {theme['BORDER_PRIMARY']};
+    border-radius: 8px;
+    font-size: 26px;
+    font-weight: bold;
+    min-height: 60px;
+}}
+
+QPushButton#search_button {{
+    background-color: {theme['BACKGROUND_SECONDARY']};
+    color: {theme['TEXT_PRIMARY']};
+    border: 1px solid {theme['BORDER_SECONDARY']};
+    border-radius: 10px;
+    font-size: 30px;
+    font-weight: bold;
+    padding: 10px 30px;
+}}
 
 QLabel#remaining_time_label {{
     font-size: 30px;
     font-weight: bold;
-    color: {DARK_THEME['TEXT_PRIMARY']};
+    color: {theme['TEXT_PRIMARY']};
     padding: 10px;
-    background-color: {DARK_THEME['BACKGROUND']};
+    background-color: {theme['BACKGROUND']};
 }}
 
 /* Описание скидки */
 QLabel#discount_description {{
-    border: 1px solid {DARK_THEME['BORDER_SECONDARY']};
+    border: 1px solid {theme['BORDER_SECONDARY']};
     border-radius: 10px;
     font-size: 25px;
     font-weight: bold;
-    color: {DARK_THEME['TEXT_DISCOUNT_DESCRIPTION']};
+    color: {theme['TEXT_DISCOUNT_DESCRIPTION']};
     padding: 10px;
-    background-color: {DARK_THEME['BACKGROUND_DISCOUNT_DESCRIPTION']};
+    background-color: {theme['BACKGROUND_DISCOUNT_DESCRIPTION']};
 }}
 
 /* Наименование параметра */
 QLabel#description_name {{
     font-size: 20px;
     font-weight: bold;
-    color: {DARK_THEME['TEXT_NAME_DESCRIPTION']};
+    color: {theme['TEXT_NAME_DESCRIPTION']};
     padding: 10px;
-    background-color: {DARK_THEME['BACKGROUND_SECONDARY']};
-    border: 1px solid {DARK_THEME['BORDER_SECONDARY']};
+    background-color: {theme['BACKGROUND_SECONDARY']};
+    border: 1px solid {theme['BORDER_SECONDARY']};
 }}
 
 /* Кнопка выбора способа оплаты */
 QPushButton#payment_metod {{
-                background-color: {DARK_THEME['BACKGROUND_SECONDARY']};
-                color: {DARK_THEME['TEXT_PRIMARY']};
+                background-color: {theme['BACKGROUND_SECONDARY']};
+                color: {theme['TEXT_PRIMARY']};
                 border: none;
                 padding: 20px 15px;
                 border-radius: 10px;
@@ -142,44 +224,72 @@ QPushButton#payment_metod {{
 QLabel#description_text {{
     font-size: 20px;
     font-weight: bold;
-    color: {DARK_THEME['TEXT_PRIMARY']};
+    color: {theme['TEXT_PRIMARY']};
     padding: 10px;
-    background-color: {DARK_THEME['BACKGROUND_SECONDARY']};
-    border: 1px solid {DARK_THEME['BORDER_SECONDARY']};
+    background-color: {theme['BACKGROUND_SECONDARY']};
+    border: 1px solid {theme['BORDER_SECONDARY']};
 }}
 
 /* Стиль цены */
 QLabel#price_label {{
     font-size: 30px;
     font-weight: bold;
-    color: {DARK_THEME['TEXT_PRICE']};
+    color: {theme['TEXT_PRICE']};
     padding: 10px;
-    background-color: {DARK_THEME['BACKGROUND']};
+    background-color: {theme['BACKGROUND']};
 }}
 
 QLabel#price_label_decor {{
     font-size: 30px;
     font-weight: bold;
     text-decoration: line-through;
-    color: {DARK_THEME['TEXT_PRICE']};
+    color: {theme['TEXT_PRICE']};
     padding: 10px;
-    background-color: {DARK_THEME['BACKGROUND']};
+    background-color: {theme['BACKGROUND']};
 }}
-    
+
 QLabel#price_discount_label {{
     font-size: 30px;
     font-weight: bold;
-    color: {DARK_THEME['TEXT_DISCOUNT_PRICE']};
+    color: {theme['TEXT_DISCOUNT_PRICE']};
     padding: 10px;
-    background-color: {DARK_THEME['BACKGROUND']};
+    background-color: {theme['BACKGROUND']};
 
 }}
 
 #GaleryLabel {{
-    background-color: {DARK_THEME['BACKGROUND']};
-    color: {DARK_THEME['TEXT_PRIMARY']};
+    background-color: {theme['BACKGROUND']};
+    color: {theme['TEXT_PRIMARY']};
     border: None;
     font-weight: bold;
     font-size: 30px;
 }}
 """
+
+
+_compiled = {}
+_current_theme = None
+
+
+def apply_theme(name):
+    """
+    Устанавливает таблицу стилей темы name на уровне приложения.
+    Таблица собирается один раз на тему; виджеты свои таблицы не задают, поэтому при смене темы
+    Qt разбирает одну таблицу вместо копии на каждый виджет
+    """
+    global _current_theme
+    app = QApplication.instance()
+    if app is None or name == _current_theme:
+        return
+    if name not in _compiled:
+        _compiled[name] = build_styles(THEMES[name])
+    app.setStyleSheet(_compiled[name])
+    _current_theme = name
+
+
+def current_theme():
+    return _current_theme
+
+
+# Таблица стилей темной темы (для совместимости)
+STYLES = build_styles(DARK_THEME)
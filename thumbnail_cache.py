@@ -0,0 +1,169 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QImage, QImageReader
+
+from settings import Settings
+
+
+class ThumbnailCache:
+    """
+    Дисковый кэш уменьшенных изображений.
+    Ключ - (путь к исходнику, целевой размер, режим масштабирования, mtime исходника),
+    поэтому замена картинки в каталоге автоматически дает промах. При превышении бюджета
+    удаляются давно не использованные файлы (LRU).
+    """
+    MODE_HEIGHT = "height"  # по высоте, как QPixmap.scaledToHeight
+    MODE_FIT = "fit"  # вписать в прямоугольник с сохранением пропорций
+
+    def __init__(self, path=None, budget=None):
+        self.path = path or Settings.THUMBNAIL_CACHE_PATH
+        self.budget = budget or Settings.THUMBNAIL_CACHE_BUDGET
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # ключ -> (имя файла, размер в байтах), от давно использованных к недавним
+        self.total_size = 0
+        self.bundle = None  # готовые картинки под профиль экрана (asset_pipeline)
+        os.makedirs(self.path, exist_ok=True)
+        self.scan()
+
+    def scan(self):
+        """Восстанавливает LRU-порядок по времени последнего использования файлов"""
+        files = []
+        for name in os.listdir(self.path):
+            full_name = os.path.join(self.path, name)
+            if name.endswith(".tmp"):
+                os.remove(full_name)
+                continue
+            stat = os.stat(full_name)
+            files.append((stat.st_mtime, os.path.splitext(name)[0], name, stat.st_size))
+        for mtime, key, name, size in sorted(files):
+            self.entries[key] = (name, size)
+            self.total_size += size
+
+    @staticmethod
+    def make_key(source, width, height, mode, mtime):
+        if mode == ThumbnailCache.MODE_HEIGHT:
+            width = 0
+        raw = f"{os.path.abspath(source)}|{width}x{height}|{mode}|{mtime}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def load(self, source, size, mode=MODE_HEIGHT):
+        """
+        Изображение source, уменьшенное до size (QSize).
+        :return: QImage (пустой, если исходник не найден или не читается)
+        """
+        try:
+            mtime = os.stat(source).st_mtime_ns
+        except OSError:
+            return QImage()
+        if self.bundle:
+            prepared = self.bundle.lookup(source, size, mode, mtime)
+            if prepared:
+                image = QImage(prepared)
+                if not image.isNull():
+                    return image
+        key = self.make_key(source, size.width(), size.height(), mode, mtime)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry:
+                self.entries.move_to_end(key)
+        if entry:
+            cached_name = os.path.join(self.path, entry[0])
+            image = QImage(cached_name)
+            if not image.isNull():
+                try:
+                    os.utime(cached_name)
+                except OSError:
+                    pass
+                return image
+            self.remove(key)
+
+        image = self.render(source, size, mode)
+        if not image.isNull():
+            self.store(key, image)
+        return image
+
+    @staticmethod
+    def target_size(source_size, size, mode):
+        """Итоговый размер картинки с исходным размером source_size"""
+        if mode == ThumbnailCache.MODE_HEIGHT:
+            if source_size.height() <= 0:
+                return QSize()
+            return QSize(max(1, round(source_size.width() * size.height() / source_size.height())), size.height())
+        return source_size.scaled(size, Qt.KeepAspectRatio)
+
+    @staticmethod
+    def render(source, size, mode):
+        """Декодирует картинку сразу в целевом разрешении (для JPEG - без полного декодирования)"""
+        reader = QImageReader(source)
+        reader.setAutoTransform(True)
+        target = ThumbnailCache.target_size(reader.size(), size, mode)
+        if target.isValid() and target.width() <= reader.size().width():
+            reader.setScaledSize(target)
+            return reader.read()
+        # Размер заранее неизвестен или картинку нужно увеличить - обычный путь
+        image = reader.read()
+        if image.isNull():
+            return image
+        return image.scaled(ThumbnailCache.target_size(image.size(), size, mode), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+    @staticmethod
+    def image_format(image):
+        # Фотографии храним в JPEG, картинки с прозрачностью (иконки) - в PNG
+        return "PNG" if image.hasAlphaChannel() else "JPG"
+
+    def store(self, key, image):
+        image_format = self.image_format(image)
+        name = f"{key}.{image_format.lower()}"
+        full_name = os.path.join(self.path, name)
+        temp_name = f"{full_name}.{threading.get_ident()}.tmp"
+        if not image.save(temp_name, image_format, 90):
+            print(f"Не удалось сохранить миниатюру {full_name}")
+            return
+        os.replace(temp_name, full_name)
+        size = os.path.getsize(full_name)
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous:
+                self.total_size -= previous[1]
+            self.entries[key] = (name, size)
+            self.total_size += size
+            evicted = []
+            while self.total_size > self.budget and len(self.entries) > 1:
+                evicted_key, (evicted_name, evicted_size) = self.entries.popitem(last=False)
+                self.total_size -= evicted_size
+                evicted.append(evicted_name)
+        for evicted_name in evicted:
+            try:
+                os.remove(os.path.join(self.path, evicted_name))
+            except OSError:
+                pass
+
+    def remove(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry:
+                self.total_size -= entry[1]
+        if entry:
+            try:
+                os.remove(os.path.join(self.path, entry[0]))
+            except OSError:
+                pass
+
+    def clear(self):
+        for key in list(self.entries):
+            self.remove(key)
+
+
+_thumbnail_cache = None
+
+
+def get_thumbnail_cache():
+    """Общий для всего приложения экземпляр кэша миниатюр"""
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
@@ -1,27 +1,55 @@
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QLabel, QScrollArea,
-                             QSizePolicy, QScroller, QScrollerProperties, QMessageBox)
+                             QSizePolicy, QScroller, QScrollerProperties, QMessageBox,
+                             QGraphicsOpacityEffect)
 from PyQt5.QtGui import QPixmap, QMouseEvent, QKeyEvent, QPainter, QIcon, QFont
 from PyQt5.QtCore import Qt, QSize, pyqtSignal, QEvent, QTimer, QPropertyAnimation, QEasingCurve
 from PyQt5 import QtCore, QtWidgets
 
-from styles import STYLES
 from settings import Settings
-import time
 from visual_elements import ClickableLabel
+from thumbnail_cache import ThumbnailCache
+from image_loader import get_image_loader
+from kinetic_scroller import KineticScroller
+from item_index import ItemIndex
+from instrumentation import timed
+from scheduler import get_scheduler, INACTIVITY
+from itertools import repeat
+from collections import deque
+import time
 
 class VerticalScrollPanel(QWidget):
+    """
+    Вертикальный список товаров.
+    Строки имеют фиксированную высоту, поэтому создаются только строки, попадающие в видимую область
+    (плюс OVERSCAN сверху и снизу). При прокрутке ушедшие из видимой области строки переиспользуются
+    для новых товаров (ProductsItemWidget.bind).
+    Большой список можно заполнять прогрессивно (begin_population/append_rows/end_population): строки первого
+    экрана добавляются сразу, остальные - небольшими пачками в свободное время цикла событий.
+    """
     gallery_data = []
 
     item_clicked = pyqtSignal(str)  # guid, item_data
+    population_progress = pyqtSignal(int)  # строк в списке
+    population_finished = pyqtSignal(int, float)  # строк, секунд от начала заполнения
+
+    CONTENT_MARGIN = 10
+    ROW_SPACING = 10
+    OVERSCAN = 2  # строк сверх видимых
+    POPULATION_CHUNK = 20  # строк, добавляемых за один шаг прогрессивного заполнения
 
     def __init__(self):
         super().__init__()
         self.settings = Settings()
-        self.setStyleSheet(STYLES)
+        self.index = ItemIndex()
+        self.rows = {}  # номер строки -> ProductsItemWidget
+        self.free_rows = []
+        self.pending_scroll = None
+        self.population_queue = deque()  # строки, полученные из БД, но еще не добавленные в список
+        self.population_started = None
+        self.population_complete = False
         self.setup_ui()
         self.setup_swipe_gestures()
-        self.setup_animation()
         self.setup_inactivity_timer()  # Добавляем таймер бездействия
 
     def setup_ui(self):
@@ -35,28 +63,36 @@ class VerticalScrollPanel(QWidget):
         self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         self.scroll_area.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
+        # Строки размещаются вручную (update_visible_rows), без layout
         self.scroll_content = QWidget()
-        self.scroll_layout = QVBoxLayout(self.scroll_content)
-        self.scroll_layout.setContentsMargins(10, 10, 10, 10)
-        self.scroll_layout.setSpacing(10)
+        self.scroll_content.installEventFilter(self)
+
+        self.placeholder_label = QLabel("Загрузка...", self.scroll_content)
+        self.placeholder_label.setObjectName("placeholder_label")
+        self.placeholder_label.setAlignment(Qt.AlignCenter)
+        self.placeholder_label.setVisible(False)
 
         self.scroll_area.setWidget(self.scroll_content)
         self.gallery_layout.addWidget(self.scroll_area)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.update_visible_rows)
+
+        # Шаги прогрессивного заполнения - когда цикл событий свободен
+        self.population_timer = QTimer()
+        self.population_timer.setInterval(0)
+        self.population_timer.timeout.connect(self.populate_step)
 
     def setup_inactivity_timer(self):
-        """Настройка таймера бездействия"""
-        self.inactivity_timer = QTimer()
-        self.inactivity_timer.setSingleShot(True)
-        self.inactivity_timer.timeout.connect(self.on_inactivity_timeout)
+        """Бездействие отслеживает общий планировщик (срок INACTIVITY)"""
+        self.scheduler = get_scheduler()
         self.reset_inactivity_timer()
 
     def reset_inactivity_timer(self):
-        """Сброс таймера бездействия"""
-        if self.isVisible():
-            self.inactivity_timer.start(self.settings.INACTIVITY_TIMEOUT * 1000)
+        """Сброс таймера бездействия (срок ставит только показанная панель)"""
+        if not self.isHidden():
+            self.scheduler.schedule(INACTIVITY, self.settings.INACTIVITY_TIMEOUT, self.on_inactivity_timeout)
 
     def stop_inactivity_timer(self):
-        self.inactivity_timer.stop()
+        self.scheduler.cancel(INACTIVITY, self.on_inactivity_timeout)
 
     def on_inactivity_timeout(self):
         """Обработка таймаута бездействия - эмитируем клик с None"""
@@ -68,19 +104,8 @@ class VerticalScrollPanel(QWidget):
         self.scroll_content.setAttribute(Qt.WA_AcceptTouchEvents)
         self.setAttribute(Qt.WA_AcceptTouchEvents)
 
-        self.swipe_start_pos = None
-        self.swipe_start_time = None
-        self.last_pos = None
-        self.last_time = None
-        self.velocity = 0
-        self.is_swiping = False
-        self.click_threshold = 10
-        self.max_click_time = 0.3
-
-    def setup_animation(self):
-        self.inertia_timer = QTimer()
-        self.inertia_timer.timeout.connect(self.update_inertia)
-        self.inertia_timer.setInterval(16)
+        # Свайп и инерция по вертикали; клик - не дольше 0.3 с
+        self.scroller = KineticScroller(self.scroll_area.verticalScrollBar(), Qt.Vertical, max_click_time=0.3)
 
     def event(self, event: QEvent) -> bool:
         # Сбрасываем таймер бездействия при любом пользовательском взаимодействии
@@ -106,204 +131,72 @@ class VerticalScrollPanel(QWidget):
 
     def handle_touch_begin(self, event: QEvent) -> bool:
         if event.touchPoints():
-            self.stop_inertia()
             self.reset_inactivity_timer()  # Сбрасываем таймер
-            self.swipe_start_pos = event.touchPoints()[0].pos()
-            self.swipe_start_time = time.time()
-            self.last_pos = self.swipe_start_pos
-            self.last_time = self.swipe_start_time
-            self.is_swiping = False
-            self.velocity = 0
+            self.pending_scroll = None
+            self.scroller.press(event.touchPoints()[0].pos())
             return True
         return False
 
     def handle_touch_update(self, event: QEvent) -> bool:
-        if not self.swipe_start_pos or not event.touchPoints():
+        if self.scroller.start_pos is None or not event.touchPoints():
             return False
-
-        current_pos = event.touchPoints()[0].pos()
-        current_time = time.time()
-
-        delta_x = abs(current_pos.x() - self.swipe_start_pos.x())
-        delta_y = abs(current_pos.y() - self.swipe_start_pos.y())
-
-        if delta_y > self.click_threshold or delta_x > self.click_threshold:
-            self.is_swiping = True
+        if self.scroller.move(event.touchPoints()[0].pos()):
             self.reset_inactivity_timer()  # Сбрасываем таймер при движении
-
-        if self.is_swiping:
-            self.process_swipe_gesture(self.last_pos, current_pos, current_time)
             return True
-
-        self.last_pos = current_pos
-        self.last_time = current_time
         return False
 
     def handle_touch_end(self, event: QEvent) -> bool:
-        if not self.swipe_start_pos:
+        start_pos = self.scroller.start_pos
+        if start_pos is None:
             return True
-
-        current_time = time.time()
-        gesture_duration = current_time - self.swipe_start_time
-
-        if self.is_swiping:
-            if abs(self.velocity) > 10:
-                self.start_inertia()
-        else:
-            end_pos = event.touchPoints()[0].pos() if event.touchPoints() else self.swipe_start_pos
-            delta_x = abs(end_pos.x() - self.swipe_start_pos.x())
-            delta_y = abs(end_pos.y() - self.swipe_start_pos.y())
-
-            if (delta_x <= self.click_threshold and
-                    delta_y <= self.click_threshold and
-                    gesture_duration <= self.max_click_time):
-                self.handle_click(self.swipe_start_pos)
-
-        self.is_swiping = False
-        self.swipe_start_pos = None
+        end_pos = event.touchPoints()[0].pos() if event.touchPoints() else start_pos
+        if self.scroller.release(end_pos):
+            self.handle_click(start_pos)
         self.reset_inactivity_timer()  # Сбрасываем таймер после жеста
         return True
 
     def handle_mouse_press(self, event: QMouseEvent) -> bool:
         if event.button() == Qt.LeftButton:
-            self.stop_inertia()
             self.reset_inactivity_timer()  # Сбрасываем таймер
-            self.swipe_start_pos = event.pos()
-            self.swipe_start_time = time.time()
-            self.last_pos = self.swipe_start_pos
-            self.last_time = self.swipe_start_time
-            self.is_swiping = False
-            self.velocity = 0
+            self.pending_scroll = None
+            self.scroller.press(event.pos())
             return True
         return False
 
     def handle_mouse_move(self, event: QMouseEvent) -> bool:
-        if self.swipe_start_pos and event.buttons() & Qt.LeftButton:
-            current_pos = event.pos()
-            current_time = time.time()
-
-            delta_x = abs(current_pos.x() - self.swipe_start_pos.x())
-            delta_y = abs(current_pos.y() - self.swipe_start_pos.y())
-
-            if delta_y > self.click_threshold or delta_x > self.click_threshold:
-                self.is_swiping = True
+        if self.scroller.start_pos is not None and event.buttons() & Qt.LeftButton:
+            if self.scroller.move(event.pos()):
                 self.reset_inactivity_timer()  # Сбрасываем таймер при движении
-
-            if self.is_swiping:
-                self.process_swipe_gesture(self.last_pos, current_pos, current_time)
                 return True
-
-            self.last_pos = current_pos
-            self.last_time = current_time
-            return False
         return False
 
     def handle_mouse_release(self, event: QMouseEvent) -> bool:
-        if not self.swipe_start_pos:
+        start_pos = self.scroller.start_pos
+        if start_pos is None:
             return False
-
-        current_time = time.time()
-        gesture_duration = current_time - self.swipe_start_time
-
-        if self.is_swiping:
-            if abs(self.velocity) > 10:
-                self.start_inertia()
-        else:
-            delta_x = abs(event.pos().x() - self.swipe_start_pos.x())
-            delta_y = abs(event.pos().y() - self.swipe_start_pos.y())
-
-            if (delta_x <= self.click_threshold and
-                    delta_y <= self.click_threshold and
-                    gesture_duration <= self.max_click_time):
-                self.handle_click(self.swipe_start_pos)
-
-        self.is_swiping = False
-        self.swipe_start_pos = None
+        if self.scroller.release(event.pos()):
+            self.handle_click(start_pos)
         self.reset_inactivity_timer()  # Сбрасываем таймер после жеста
         return False
 
     def handle_click(self, click_pos: QtCore.QPoint):
         """Обработка клика по элементу"""
-        QtCore.QTimer.singleShot(50, lambda: self.process_click(click_pos))
+        self.scheduler.schedule("products.click", 0.05, lambda: self.process_click(click_pos))
 
     def process_click(self, click_pos: QtCore.QPoint):
         """Фактическая обработка клика после задержки"""
         content_pos = self.scroll_content.mapFromParent(click_pos)
 
-        for i in range(self.scroll_layout.count()):
-            item = self.scroll_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if widget.geometry().contains(content_pos):
-                    if isinstance(widget, ProductsItemWidget):
-                        self.item_clicked.emit(widget.guid)
-                        """
-                        item_data = self.find_item_data_by_guid(widget.guid)
-                        if item_data:
-                            self.item_clicked.emit(widget.guid, item_data)
-                        """
-                    break
+        index = self.index.at(content_pos.y())
+        widget = self.rows.get(index)
+        if widget and widget.geometry().contains(content_pos) and widget.in_stock:
+            self.item_clicked.emit(widget.guid)
 
         # Сбрасываем таймер после клика
         self.reset_inactivity_timer()
 
-    def find_item_data_by_guid(self, guid: str) -> dict:
-        for item in self.gallery_data.get("items", []):
-            if item.get("guid") == guid:
-                return item
-        return {}
-
-    def process_swipe_gesture(self, start_pos: QtCore.QPoint, current_pos: QtCore.QPoint, current_time: float):
-        if not start_pos:
-            return
-
-        delta_y = current_pos.y() - start_pos.y()
-        delta_time = current_time - self.last_time
-
-        if delta_time > 0:
-            instantaneous_velocity = delta_y / delta_time
-            self.velocity = instantaneous_velocity * 0.7 + self.velocity * 0.3
-
-        scrollbar = self.scroll_area.verticalScrollBar()
-        current_value = scrollbar.value()
-        scrollbar.setValue(int(current_value - delta_y))
-
-        self.last_pos = current_pos
-        self.last_time = current_time
-
-    def start_inertia(self):
-        if abs(self.velocity) > 10:
-            self.inertia_timer.start()
-
-    def stop_inertia(self):
-        self.inertia_timer.stop()
-        self.velocity = 0
-
-    def update_inertia(self):
-        if abs(self.velocity) < 10:
-            self.stop_inertia()
-            return
-
-        scrollbar = self.scroll_area.verticalScrollBar()
-        current_value = scrollbar.value()
-
-        delta = self.velocity * 0.016
-
-        if self.velocity > 0:
-            self.velocity = max(0, self.velocity - 1000 * 0.016)
-        else:
-            self.velocity = min(0, self.velocity + 1000 * 0.016)
-
-        new_value = current_value - delta
-
-        if new_value < scrollbar.minimum():
-            new_value = scrollbar.minimum()
-            self.velocity = -self.velocity * 0.3
-        elif new_value > scrollbar.maximum():
-            new_value = scrollbar.maximum()
-            self.velocity = -self.velocity * 0.3
-
-        scrollbar.setValue(int(new_value))
+    def find_item_data_by_guid(self, guid: str):
+        return self.index.get(guid)
 
     def smooth_scroll_to(self, target_value: int, duration: int = 500):
         scrollbar = self.scroll_area.verticalScrollBar()
@@ -316,6 +209,37 @@ class VerticalScrollPanel(QWidget):
         self.animation.setEasingCurve(QEasingCurve.OutCubic)
         self.animation.start()
 
+    def scroll_position(self):
+        if self.pending_scroll is not None:
+            return self.pending_scroll
+        return self.scroll_area.verticalScrollBar().value()
+
+    def restore_scroll_position(self, value):
+        """Позиция прокрутки сохраненного экрана (после load_gallery_data)"""
+        self.pending_scroll = value
+        self.apply_pending_scroll()
+
+    def apply_pending_scroll(self):
+        """
+        Диапазон прокрутки обновляется после изменения размера содержимого (в том числе при показе
+        панели) - позиция досдвигается, пока полоса прокрутки не сможет ее принять
+        """
+        if self.pending_scroll is None:
+            return
+        scrollbar = self.scroll_area.verticalScrollBar()
+        scrollbar.setValue(self.pending_scroll)
+        if scrollbar.value() == self.pending_scroll and self.isVisible():
+            self.pending_scroll = None
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.pending_scroll is None:
+            self.pending_scroll = self.scroll_position()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        QTimer.singleShot(0, self.apply_pending_scroll)
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         #self.load_gallery_data()
@@ -330,68 +254,192 @@ class VerticalScrollPanel(QWidget):
 
         return QSize(image_width, image_height)
 
+    def row_height(self):
+        # Картинка плюс поля строки
+        return self.settings.ITEMS_LINE_SIZE + 10
+
+    def eventFilter(self, obj, event):
+        if obj is self.scroll_content and event.type() == QEvent.Resize:
+            self.apply_pending_scroll()
+            self.update_visible_rows(relayout=True)
+        return super().eventFilter(obj, event)
+
+    def recycle_rows(self, keep=range(0)):
+        for index in [index for index in self.rows if index not in keep]:
+            widget = self.rows.pop(index)
+            widget.setVisible(False)
+            self.free_rows.append(widget)
+
+    def clear_gallery(self):
+        self.recycle_rows()
+        self.scroll_content.setFixedHeight(0)
+
+    def show_placeholder(self):
+        """Заглушка на время загрузки списка товаров"""
+        self.gallery_data = []
+        self.index.rebuild(self.gallery_data, None, [])
+        self.clear_gallery()
+        self.scroll_content.setFixedHeight(self.scroll_area.viewport().height())
+        self.placeholder_label.setGeometry(0, 0, self.scroll_content.width(), self.scroll_area.viewport().height())
+        self.placeholder_label.setVisible(True)
+
+    @timed("products.load_gallery_data")
     def load_gallery_data(self):
-        while self.scroll_layout.count():
-            item = self.scroll_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
-        item_size = self.settings.ITEMS_LINE_SIZE
-
-        self.scroll_layout.addStretch()
-
-        for item_data in self.gallery_data:
-
-            item_widget = ProductsItemWidget(
-                item_data[2],
-                item_data[1],
-                item_data[0],
-                item_data[3],
-                item_data[4],
-                item_size
-            )
-            self.scroll_layout.addWidget(item_widget)
-
-        self.scroll_layout.addStretch()
+        self.stop_population()
+        self.placeholder_label.setVisible(False)
+        # Индекс перестраивается до clear_gallery: изменение высоты сразу вызывает update_visible_rows
+        self.index.rebuild(self.gallery_data, lambda item_data: item_data[2],
+                           repeat(self.row_height(), len(self.gallery_data)), self.CONTENT_MARGIN, self.ROW_SPACING)
+        self.clear_gallery()
+        self.scroll_content.setFixedHeight(max(self.index.end(), self.CONTENT_MARGIN) + self.CONTENT_MARGIN)
+        self.pending_scroll = None
+        self.scroll_area.verticalScrollBar().setValue(0)
+        self.update_visible_rows()
         self.reset_inactivity_timer()  # Сбрасываем таймер после загрузки данных
 
+    def begin_population(self):
+        """Начало прогрессивного заполнения: заглушка до первой пачки строк"""
+        self.show_placeholder()
+        self.stop_population()
+        self.index.rebuild(self.gallery_data, lambda item_data: item_data[2], [],
+                           self.CONTENT_MARGIN, self.ROW_SPACING)
+        self.pending_scroll = None
+        self.scroll_area.verticalScrollBar().setValue(0)
+        self.population_started = time.perf_counter()
+
+    def append_rows(self, rows):
+        """Очередная пачка строк: первый экран строится сразу, остальное - в populate_step"""
+        if self.population_started is None:
+            return
+        self.population_queue.extend(rows)
+        if not self.gallery_data and self.population_queue:
+            self.placeholder_label.setVisible(False)
+            self.clear_gallery()
+            self.populate(self.scroll_area.viewport().height() // self.row_height() + 1)
+        if self.population_queue:
+            self.population_timer.start()
+
+    def end_population(self):
+        """Все строки получены - заполнение завершится, когда очередь опустеет"""
+        if self.population_started is None:
+            return
+        self.population_complete = True
+        if not self.population_queue:
+            self.finish_population()
+
+    def stop_population(self):
+        self.population_timer.stop()
+        self.population_queue.clear()
+        self.population_started = None
+        self.population_complete = False
+
+    @timed("products.populate_step")
+    def populate_step(self):
+        """Добавляет строки пачками по POPULATION_CHUNK, пока не исчерпан бюджет времени шага"""
+        deadline = time.perf_counter() + self.settings.POPULATION_STEP_BUDGET
+        while self.population_queue and time.perf_counter() < deadline:
+            self.populate(self.POPULATION_CHUNK)
+        if not self.population_queue:
+            self.population_timer.stop()
+            if self.population_complete:
+                self.finish_population()
+
+    def populate(self, count):
+        rows = [self.population_queue.popleft() for _ in range(min(count, len(self.population_queue)))]
+        self.index.extend(rows, repeat(self.row_height(), len(rows)))
+        self.scroll_content.setFixedHeight(max(self.index.end(), self.CONTENT_MARGIN) + self.CONTENT_MARGIN)
+        self.update_visible_rows()
+        self.population_progress.emit(len(self.gallery_data))
+
+    def finish_population(self):
+        elapsed = time.perf_counter() - self.population_started
+        self.stop_population()
+        if not self.gallery_data:
+            # Пустая категория - убираем заглушку
+            self.load_gallery_data()
+        self.reset_inactivity_timer()
+        self.population_finished.emit(len(self.gallery_data), elapsed)
+
+    def visible_range(self):
+        """Номера строк, пересекающих видимую область, с запасом OVERSCAN"""
+        top = self.scroll_area.verticalScrollBar().value()
+        visible = self.index.range(top, top + self.scroll_area.viewport().height())
+        return range(max(0, visible.start - self.OVERSCAN),
+                     min(len(self.index.records), len(self.index.starts), visible.stop + self.OVERSCAN))
+
+    def update_visible_rows(self, *args, relayout=False):
+        """Создает/переиспользует строки для видимой области и убирает ушедшие из нее"""
+        visible = self.visible_range()
+        self.recycle_rows(visible)
+        width = self.scroll_content.width() - 2 * self.CONTENT_MARGIN
+        for index in visible:
+            widget = self.rows.get(index)
+            if widget is None:
+                widget = self.free_rows.pop() if self.free_rows else self.create_row()
+                widget.bind(*self.row_data(index))
+                self.rows[index] = widget
+            elif not relayout:
+                continue
+            start, end = self.index.extent(index)
+            widget.setGeometry(self.CONTENT_MARGIN, start, width, end - start)
+            widget.setVisible(True)
+
+    def row_data(self, index):
+        # Строки берутся из индекса - из того же списка, по которому считается visible_range
+        item_data = self.index.records[index]
+        return (item_data[2], item_data[1], item_data[0], item_data[3], item_data[4],
+                item_data[5] if len(item_data) > 5 else True)
+
+    def create_row(self):
+        widget = ProductsItemWidget(None, "", None, 0, 0, self.settings.ITEMS_LINE_SIZE)
+        widget.setParent(self.scroll_content)
+        widget.setFixedHeight(self.row_height())
+        return widget
+
 
 class ItemPriceWidget(QWidget):
     itemClicked = pyqtSignal(str)
     def __init__(self, item_size, price, discount):
         super().__init__()
-        self.price = price
-        self.discount = discount
         self.item_size = item_size
         self.setup_ui()
+        self.bind(price, discount)
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(5, 5, 5, 5)
         layout.setSpacing(5)
-        self.price_label = QLabel(f"{self.price:.2f} ₽")
+        self.price_label = QLabel()
         self.price_label.setFixedWidth(300)
         layout.addWidget(self.price_label)
-        if self.discount == 0 or self.discount == None:
-            self.price_label.setObjectName("price_label")
-        else:
-            self.price_label.setObjectName("price_label_decor")
-            self.price_discount_label = QLabel(f"{self.discount:.2f} ₽")
-            self.price_discount_label.setObjectName("price_discount_label")
-            self.price_discount_label.setFixedWidth(300)
-            layout.addWidget(self.price_discount_label)
+        self.price_discount_label = QLabel()
+        self.price_discount_label.setObjectName("price_discount_label")
+        self.price_discount_label.setFixedWidth(300)
+        layout.addWidget(self.price_discount_label)
+
+    def bind(self, price, discount):
+        self.price = price
+        self.discount = discount
+        self.price_label.setText(f"{self.price:.2f} ₽")
+        object_name = "price_label" if self.discount == 0 or self.discount == None else "price_label_decor"
+        if self.price_label.objectName() != object_name:
+            # Стиль зависит от objectName - переприменяем его
+            self.price_label.setObjectName(object_name)
+            self.price_label.style().unpolish(self.price_label)
+            self.price_label.style().polish(self.price_label)
+        if object_name == "price_label_decor":
+            self.price_discount_label.setText(f"{self.discount:.2f} ₽")
+        self.price_discount_label.setVisible(object_name == "price_label_decor")
+
+
 class ProductsItemWidget(QWidget):
     itemClicked = pyqtSignal(str)
 
-    def __init__(self, guid: str, name: str, image_filename: str, price, discount, item_size):
+    def __init__(self, guid: str, name: str, image_filename: str, price, discount, item_size, in_stock=True):
         super().__init__()
-        self.guid = guid
-        self.name = name
-        self.image_filename = image_filename
-        self.price = price
-        self.discount = discount
         self.item_size = item_size
         self.setup_ui()
+        self.bind(guid, name, image_filename, price, discount, in_stock)
 
     def setup_ui(self):
 
@@ -399,42 +447,55 @@ class ProductsItemWidget(QWidget):
         layout.setContentsMargins(5, 5, 5, 5)
         layout.setSpacing(5)
 
-        self.image_label = ClickableLabel(self.guid)
+        self.image_label = ClickableLabel()
         self.image_label.setFixedHeight(self.item_size)
         self.image_label.setFixedWidth(self.item_size * 2)
         self.image_label.setAlignment(Qt.AlignCenter)
         #self.image_label.setStyleSheet("border: 1px solid #333333; border-radius: 5px; background-color: #1a1a1a;")
 
         self.image_label.clicked.connect(self.itemClicked.emit)
-        self.load_image()
 
-        self.name_label = ClickableLabel(self.guid)
-        self.name_label.setText(self.name)
+        self.name_label = ClickableLabel()
         self.name_label.setAlignment(Qt.AlignCenter)
         self.name_label.setWordWrap(False)
         #self.name_label.setMaximumWidth(self.item_size.width())
         self.name_label.setObjectName("GaleryLabel")
-        self.name_label.setStyleSheet(STYLES)
         self.name_label.clicked.connect(self.itemClicked.emit)
 
         layout.addWidget(self.image_label)
         layout.addWidget(self.name_label)
         layout.addStretch()
-        product_price = ItemPriceWidget(self.item_size, self.price, self.discount)
-        layout.addWidget(product_price)
-
-
-
+        self.product_price = ItemPriceWidget(self.item_size, 0, 0)
+        layout.addWidget(self.product_price)
 
+    def bind(self, guid, name, image_filename, price, discount, in_stock=True):
+        """Заполняет строку данными товара (строки переиспользуются при прокрутке)"""
+        self.guid = guid
+        self.name = name
+        self.image_filename = image_filename
+        self.price = price
+        self.discount = discount
+        self.in_stock = in_stock
+        self.image_label.guid = guid
+        self.name_label.guid = guid
+        self.name_label.setText(name)
+        self.product_price.bind(price, discount)
+        if image_filename:
+            self.load_image()
+        else:
+            get_image_loader().cancel(self.image_label)
+            self.image_label.clear()
+
+        if not self.in_stock:
+            # Товара нет в автомате - показываем неактивным
+            if self.graphicsEffect() is None:
+                effect = QGraphicsOpacityEffect(self)
+                effect.setOpacity(Settings.SOLD_OUT_OPACITY)
+                self.setGraphicsEffect(effect)
+        elif self.graphicsEffect() is not None:
+            self.setGraphicsEffect(None)
 
     def load_image(self):
-        try:
-            original_pixmap = QPixmap(Settings.PRODUCT_IMAGE_PATH + "\\" + self.image_filename)
-            pixmap = original_pixmap.scaledToHeight(self.item_size, Qt.SmoothTransformation)
-            self.image_label.setPixmap(pixmap)
-
-        except Exception as e:
-            print(f"Ошибка загрузки изображения {self.image_filename}: {e}")
-            pixmap = QPixmap(self.item_size, self.item_size)
-            pixmap.fill(Qt.darkGray)
-            self.image_label.setPixmap(pixmap)
+        get_image_loader().request(self.image_label, Settings.PRODUCT_IMAGE_PATH + "\\" + self.image_filename,
+                                   QSize(self.item_size * 2, self.item_size), ThumbnailCache.MODE_HEIGHT,
+                                   QSize(self.item_size, self.item_size))
@@ -1,21 +1,19 @@
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QLabel, QScrollArea,
-                             QSizePolicy, QScroller, QScrollerProperties, QMessageBox)
+                             QSizePolicy, QScroller, QScrollerProperties, QMessageBox, QStyle, QStyleOption)
 from PyQt5.QtGui import QPixmap, QMouseEvent, QKeyEvent, QPainter, QIcon, QFont
-from PyQt5.QtCore import Qt, QSize, pyqtSignal, QEvent, QTimer, QPropertyAnimation, QEasingCurve
+from PyQt5.QtCore import Qt, QSize, QRect, pyqtSignal, QEvent, QTimer, QPropertyAnimation, QEasingCurve
 from PyQt5 import QtCore, QtWidgets
 
-from styles import STYLES
 from settings import Settings
+from pixmap_cache import get_pixmap_cache
 import time
 
 class TextImageButton(QPushButton):
     def __init__(self, text: str, file_name: str, parent=None):
         super().__init__(text, parent)
         self.image_path = file_name
-        self.original_pixmap = None
-        self.setStyleSheet(STYLES)
-        self.original_pixmap = QPixmap(self.image_path)
+        self.icon_height = 0
         self.setObjectName("text_image_Button")
 
     def resizeEvent(self, event):
@@ -23,13 +21,14 @@ class TextImageButton(QPushButton):
         self.update_icon()
 
     def update_icon(self):
-        if self.original_pixmap and not self.original_pixmap.isNull():
-            target_height = self.height()
-            if target_height > 0:
-                scaled_pixmap = self.original_pixmap.scaledToHeight(
-                    target_height,
-                    Qt.SmoothTransformation
-                )
+        target_height = self.height()
+        if target_height > 0:
+            # Иконки панелей видны всегда - закрепляем их в кэше картинок
+            if self.icon_height and self.icon_height != target_height:
+                get_pixmap_cache().unpin(self.image_path, QSize(0, self.icon_height))
+            self.icon_height = target_height
+            scaled_pixmap = get_pixmap_cache().pin(self.image_path, QSize(0, target_height))
+            if not scaled_pixmap.isNull():
                 self.setIcon(QIcon(scaled_pixmap))
                 self.setIconSize(scaled_pixmap.size())
                 self.setFixedWidth(scaled_pixmap.width())
@@ -39,13 +38,11 @@ class TopPanel (QWidget):
     def __init__(self):
         super().__init__()
         self.settings = Settings()
-        self.setStyleSheet(STYLES)
         self.setup_ui()
 
     def setup_ui(self):
         self.setFixedHeight(self.settings.TOP_PANEL_HEIGHT)
         self.setObjectName("topPanel")
-        self.setStyleSheet(STYLES)
 
         top_layout = QHBoxLayout(self)
         top_layout.setContentsMargins(
@@ -66,13 +63,37 @@ class TopPanel (QWidget):
 
         self.title_label = QLabel("Заголовок окна")
         self.title_label.setObjectName("title_label")
-        self.title_label.setStyleSheet(STYLES)
+        self.title_label.setAlignment(Qt.AlignCenter)
+
+        # Навигационная строка: путь от главного экрана до текущего
+        self.breadcrumbs_label = QLabel()
+        self.breadcrumbs_label.setObjectName("breadcrumbs_label")
+        self.breadcrumbs_label.setAlignment(Qt.AlignCenter)
+        self.breadcrumbs_label.setVisible(False)
+
+        title_layout = QVBoxLayout()
+        title_layout.setContentsMargins(0, 0, 0, 0)
+        title_layout.setSpacing(0)
+        title_layout.addStretch()
+        title_layout.addWidget(self.title_label)
+        title_layout.addWidget(self.breadcrumbs_label)
+        title_layout.addStretch()
+
+        self.search_button = QPushButton("Поиск")
+        self.search_button.setObjectName("search_button")
+        self.search_button.setFixedHeight(self.settings.TOP_PANEL_HEIGHT - 50)
 
         top_layout.addWidget(self.home_button)
         top_layout.addWidget(self.back_button)
         top_layout.addStretch()
-        top_layout.addWidget(self.title_label)
+        top_layout.addLayout(title_layout)
         top_layout.addStretch()
+        top_layout.addWidget(self.search_button)
+
+    def set_breadcrumbs(self, titles):
+        """Показывает путь до текущего экрана (на главном экране строка скрыта)"""
+        self.breadcrumbs_label.setText(" › ".join(title for title in titles if title))
+        self.breadcrumbs_label.setVisible(len(titles) > 1)
 
 
 class BottomPanel (QWidget):
@@ -82,12 +103,10 @@ class BottomPanel (QWidget):
     def __init__(self):
         super().__init__()
         self.settings = Settings()
-        self.setStyleSheet(STYLES)
         self.setup_ui()
     def setup_ui(self):
         self.setFixedHeight(self.settings.BOTTOM_PANEL_HEIGHT)
         self.setObjectName("topPanel")
-        self.setStyleSheet(STYLES)
 
         top_layout = QHBoxLayout(self)
         top_layout.setContentsMargins(
@@ -139,7 +158,31 @@ class ClickableLabel(QLabel):
         super().mousePressEvent(event)
 
 
+class AttractPanel(QLabel):
+    """Экран-заставка режима ожидания поверх всего окна: слайд или видео (idle_mode.IdleMode)"""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setObjectName("attract_panel")
+        self.setAlignment(Qt.AlignCenter)
+        self.setVisible(False)
+
+    def show_over_parent(self):
+        self.setGeometry(self.parentWidget().rect())
+        self.raise_()
+        self.setVisible(True)
+
+
 class AdvancedMarqueeLabel(QLabel):
+    """
+    Бегущая строка.
+    Текст с промежутком рисуется один раз в кэшированную полосу, фон виджета (градиент из таблицы стилей) -
+    в кэшированную картинку; обе перестраиваются только при смене текста, шрифта, стиля или размера.
+    Каждый кадр перерисовывается лишь полоса текста: копированием готовых картинок со сдвигом.
+    Пока виджет скрыт, таймер анимации остановлен.
+    """
+    FRAME_INTERVAL = 30  # миллисекунд
+
     def __init__(self, text="", parent=None):
         super().__init__(text, parent)
         self._position = 0
@@ -150,6 +193,8 @@ class AdvancedMarqueeLabel(QLabel):
         self._is_animating = False
         self._direction = -1  # -1 для движения слева направо, 1 для справа налево
         self._gap = 50  # Расстояние между повторениями текста
+        self._strip = None  # текст + промежуток
+        self._background = None
 
         self.setMinimumHeight(60)
         self.setStyleSheet("""
@@ -165,6 +210,60 @@ class AdvancedMarqueeLabel(QLabel):
             }
         """)
 
+    def setText(self, text):
+        super().setText(text)
+        self._strip = None
+        self.update()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() in (QEvent.FontChange, QEvent.StyleChange, QEvent.PaletteChange):
+            self._strip = None
+            self._background = None
+            self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._background = None
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._is_animating:
+            self._timer.start(self.FRAME_INTERVAL)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def _build_strip(self):
+        """Полоса с одним повторением текста и промежутком за ним"""
+        metrics = self.fontMetrics()
+        self._text_width = metrics.horizontalAdvance(self.text())
+        strip = QPixmap(max(1, self._text_width + self._gap), metrics.height())
+        strip.fill(Qt.transparent)
+        painter = QPainter(strip)
+        painter.setPen(self.palette().color(self.foregroundRole()))
+        painter.setFont(self.font())
+        painter.drawText(0, metrics.ascent(), self.text())
+        painter.end()
+        self._strip = strip
+
+    def _build_background(self):
+        """Фон и рамка из таблицы стилей, без текста QLabel"""
+        background = QPixmap(self.size())
+        background.fill(Qt.transparent)
+        painter = QPainter(background)
+        option = QStyleOption()
+        option.initFrom(self)
+        self.style().drawPrimitive(QStyle.PE_Widget, option, painter, self)
+        painter.end()
+        self._background = background
+
+    def _text_rect(self):
+        """Полоса, в которой движется текст (только она перерисовывается каждый кадр)"""
+        text_height = self.fontMetrics().height()
+        return QRect(0, (self.height() - text_height) // 2 - 2, self.width(), text_height)
+
     def _update_position(self):
         if not self._is_animating:
             return
@@ -177,33 +276,33 @@ class AdvancedMarqueeLabel(QLabel):
         elif self._direction == 1 and self._position > self.width():
             self._position = -self._text_width
 
-        self.update()
+        self.update(self._text_rect())
 
     def paintEvent(self, event):
-        # Рисуем стандартный фон
-        super().paintEvent(event)
+        if self._background is None:
+            self._build_background()
+        if self._strip is None:
+            self._build_strip()
 
         painter = QPainter(self)
-        painter.setPen(self.palette().color(self.foregroundRole()))
-        painter.setFont(self.font())
-
-        # Получаем размеры текста
-        self._text_width = self.fontMetrics().width(self.text())
-        text_height = self.fontMetrics().height()
-
-        # Вычисляем вертикальную позицию для центрирования
-        y_pos = (self.height() - text_height) / 2 + text_height - 2
+        rect = event.rect()
+        painter.drawPixmap(rect, self._background, rect)
 
-        # Рисуем несколько копий текста для плавного перехода
+        # Копии полосы текста от текущей позиции до правого края
+        text_rect = self._text_rect()
+        painter.setClipRect(rect)
         x = self._position
-        while x < self.width() + self._text_width:
-            painter.drawText(int(x), int(y_pos), self.text())
-            x += self._text_width + self._gap
+        while x < self.width():
+            painter.drawPixmap(int(x), text_rect.top(), self._strip)
+            x += self._strip.width()
 
     def start_animation(self):
+        if self._strip is None:
+            self._build_strip()
         self._is_animating = True
         self._position = self.width() if self._direction == -1 else -self._text_width
-        self._timer.start(30)
+        if self.isVisible():
+            self._timer.start(self.FRAME_INTERVAL)
 
     def stop_animation(self):
         self._is_animating = False
@@ -217,4 +316,4 @@ class AdvancedMarqueeLabel(QLabel):
         self._direction = direction
 
     def toggle_direction(self):
-        self._direction *= -1
\ No newline at end of file
+        self._direction *= -1